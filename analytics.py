@@ -0,0 +1,358 @@
+"""Store agregat dashboard (SQLite) pengganti kueri Metabase/H2.
+
+Dashboard bisnis hanya membutuhkan agregat per kelompok: tingkat dropout per
+jenis kelamin, beasiswa, status biaya kuliah, program studi, dsb., serta
+distribusi probabilitas dropout dari model. Agregat ini disimpan sebagai
+counter aditif di SQLite (jumlah mahasiswa, dropout/graduate/enrolled aktual,
+diprediksi dropout, risiko tinggi, jumlah probabilitas) per sumber dan model,
+sehingga halaman dashboard cukup membaca beberapa ratus baris tanpa JVM.
+
+Pembaruan bersifat inkremental: untuk file CSV dicatat offset byte terakhir
+yang sudah diagregasi. Baris baru yang ditambahkan di akhir file dibaca mulai
+dari offset itu, diskor, lalu counter-nya dijumlahkan (upsert). Sumber
+dibangun ulang jika file tidak sekadar bertambah (menyusut, atau 64 KB terakhir
+sebelum offset berubah), file Parquet berubah, atau checksum model di manifest
+berubah.
+
+    python -m analytics refresh Data/students_performance.csv
+    python -m analytics show Course
+"""
+import argparse
+import datetime
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import scoring
+
+DEFAULT_PATH = os.environ.get('ANALYTICS_DB_PATH', os.path.join('Data', '.cache', 'analytics.sqlite'))
+SCHEMA_VERSION = 2
+# Jumlah kelas histogram probabilitas dropout (lebar 0.05)
+RISK_BINS = 20
+# Byte terakhir sebelum offset yang diperiksa untuk memastikan file hanya bertambah
+TAIL_CHECK_BYTES = 1 << 16
+
+AGE_BINS = [0, 20, 25, 30, 40, np.inf]
+AGE_LABELS = ['17-20', '21-25', '26-30', '31-40', '>40']
+# Kelas tertutup kiri: 0 -> '0%', 0.5 -> '50-99%', 1 -> '100%'
+APPROVAL_BINS = [-np.inf, 1e-12, 0.5, 1, np.inf]
+APPROVAL_LABELS = ['0%', '1-49%', '50-99%', '100%']
+
+# Dimensi dashboard: nama -> (judul, {kode: label}); label None = pakai kode apa adanya
+DIMENSIONS = {
+    'Gender': ("Jenis Kelamin", {'0': "Perempuan", '1': "Laki-laki"}),
+    'Scholarship_holder': ("Penerima Beasiswa", {'0': "Tidak", '1': "Ya"}),
+    'Tuition_fees_up_to_date': ("Biaya Kuliah Lunas", {'0': "Tidak", '1': "Ya"}),
+    'Debtor': ("Memiliki Hutang", {'0': "Tidak", '1': "Ya"}),
+    'Course': ("Program Studi (kode Course)", None),
+    'Age_group': ("Kelompok Usia Saat Masuk", None),
+    'Approval_2nd_sem': ("Rasio Kelulusan MK Semester 2", None)
+}
+TOTAL = '_total'
+
+COUNTERS = ['students', 'labeled', 'dropout', 'graduate', 'enrolled',
+            'predicted_dropout', 'high_risk', 'probability_sum']
+
+
+# Fungsi untuk mengubah kode kategori menjadi nilai kunci dimensi. Kolom kode yang
+# dibaca sebagai float (mis. karena ada nilai kosong) diubah ke int agar 1.0 menjadi
+# '1' dan cocok dengan label di DIMENSIONS.
+def _codes(values):
+    if values.dtype.kind != 'f':
+        return values.to_numpy()
+    values = values.to_numpy()
+    integral = ~np.isnan(values) & (values % 1 == 0)
+    codes = values.astype(object)
+    codes[integral] = [int(value) for value in values[integral]]
+    return codes
+
+
+# Fungsi untuk menghitung counter agregat dari kohort terskor.
+# Mengembalikan (baris agregat [(dimensi, nilai, *counter)], histogram risiko).
+def aggregate(cohort, probabilities):
+    probabilities = np.asarray(probabilities, dtype=float)
+    status = cohort['Status'].astype(str) if 'Status' in cohort.columns else pd.Series('', index=cohort.index)
+    frame = pd.DataFrame({
+        'students': 1,
+        'labeled': status.isin(['Dropout', 'Graduate', 'Enrolled']).to_numpy(dtype=int),
+        'dropout': (status == 'Dropout').to_numpy(dtype=int),
+        'graduate': (status == 'Graduate').to_numpy(dtype=int),
+        'enrolled': (status == 'Enrolled').to_numpy(dtype=int),
+        'predicted_dropout': (probabilities > scoring.DROPOUT_THRESHOLD).astype(int),
+        'high_risk': (probabilities > scoring.HIGH_RISK_THRESHOLD).astype(int),
+        'probability_sum': probabilities
+    })
+
+    keys = {TOTAL: pd.Series('all', index=frame.index)}
+    for column in ('Gender', 'Scholarship_holder', 'Tuition_fees_up_to_date', 'Debtor', 'Course'):
+        if column in cohort.columns:
+            keys[column] = _codes(cohort[column])
+    if 'Age_at_enrollment' in cohort.columns:
+        keys['Age_group'] = pd.cut(cohort['Age_at_enrollment'].to_numpy(), AGE_BINS, labels=AGE_LABELS)
+    if 'approval_ratio_2nd' in cohort.columns:
+        keys['Approval_2nd_sem'] = pd.cut(cohort['approval_ratio_2nd'].to_numpy(), APPROVAL_BINS,
+                                          labels=APPROVAL_LABELS, right=False)
+
+    rows = []
+    for dimension, key in keys.items():
+        grouped = frame.groupby(np.asarray(key).astype(str), observed=True)[COUNTERS].sum()
+        rows.extend((dimension, str(value), *counts) for value, counts in
+                    zip(grouped.index, grouped.itertuples(index=False, name=None)))
+
+    bins = np.minimum((probabilities * RISK_BINS).astype(int), RISK_BINS - 1)
+    histogram = np.bincount(bins, minlength=RISK_BINS)
+    return rows, [(int(b), int(n)) for b, n in enumerate(histogram) if n]
+
+
+class AnalyticsStore:
+    """Agregat dashboard yang disimpan di SQLite dan diperbarui secara inkremental.
+
+    Counter disimpan per (sumber, model) sehingga satu sumber dapat dibangun
+    ulang tanpa menyentuh sumber lain; kueri dashboard menjumlahkan semuanya.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Skema lama dibuang; agregat dibangun ulang pada refresh berikutnya
+            self._db.executescript(
+                "DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS aggregates; DROP TABLE IF EXISTS risk_bins;"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source TEXT, model TEXT, model_sha256 TEXT, rows INTEGER, offset INTEGER, "
+            "size INTEGER, mtime_ns INTEGER, tail_sha256 TEXT, updated_at TEXT, "
+            "PRIMARY KEY (source, model));"
+            "CREATE TABLE IF NOT EXISTS aggregates ("
+            "source TEXT, model TEXT, dimension TEXT, value TEXT, "
+            + ", ".join(f"{name} {'REAL' if name == 'probability_sum' else 'INTEGER'}" for name in COUNTERS)
+            + ", PRIMARY KEY (source, model, dimension, value));"
+            "CREATE TABLE IF NOT EXISTS risk_bins ("
+            "source TEXT, model TEXT, bin INTEGER, students INTEGER, "
+            "PRIMARY KEY (source, model, bin));"
+        )
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _source_state(self, source, model_name):
+        row = self._db.execute(
+            "SELECT model_sha256, rows, offset, size, mtime_ns, tail_sha256 FROM sources "
+            "WHERE source = ? AND model = ?", (source, model_name)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(['model_sha256', 'rows', 'offset', 'size', 'mtime_ns', 'tail_sha256'], row))
+
+    def _delete_source(self, source, model_name):
+        for table in ('sources', 'aggregates', 'risk_bins'):
+            self._db.execute(f"DELETE FROM {table} WHERE source = ? AND model = ?", (source, model_name))
+
+    # Jumlahkan counter kohort terskor ke sumber (upsert aditif)
+    def _add(self, source, model_name, cohort, probabilities):
+        rows, histogram = aggregate(cohort, probabilities)
+        updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in COUNTERS)
+        self._db.executemany(
+            f"INSERT INTO aggregates VALUES ({', '.join('?' * (4 + len(COUNTERS)))}) "
+            f"ON CONFLICT (source, model, dimension, value) DO UPDATE SET {updates}",
+            [(source, model_name, *row) for row in rows]
+        )
+        self._db.executemany(
+            "INSERT INTO risk_bins VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (source, model, bin) DO UPDATE SET students = students + excluded.students",
+            [(source, model_name, b, n) for b, n in histogram]
+        )
+
+    def _save_state(self, source, model_name, state):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, model_name, state['model_sha256'], state['rows'], state['offset'], state['size'],
+             state['mtime_ns'], state['tail_sha256'],
+             datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'))
+        )
+
+    # Fungsi untuk menyimpan kohort yang sudah diskor (mis. hasil upload batch) sebagai
+    # satu sumber. Sumber dengan nama yang sama diganti, sehingga aman dipanggil ulang.
+    def add_scored(self, source, cohort, probabilities, model_name=scoring.DEFAULT_MODEL):
+        from model_store import read_manifest
+
+        cohort = scoring.add_derived_features(cohort)
+        with self._lock:
+            self._delete_source(source, model_name)
+            self._add(source, model_name, cohort, probabilities)
+            self._save_state(source, model_name, {
+                'model_sha256': read_manifest()['models'][model_name]['sha256'],
+                'rows': len(cohort), 'offset': None, 'size': None, 'mtime_ns': None, 'tail_sha256': None
+            })
+            self._db.commit()
+        return len(cohort)
+
+    # Fungsi utama: perbarui agregat sebuah file kohort. Hanya baris yang belum
+    # diagregasi yang dibaca dan diskor; mengembalikan ringkasan pembaruan.
+    def refresh(self, path, model_name=scoring.DEFAULT_MODEL, model=None):
+        from model_store import read_manifest
+
+        start = time.perf_counter()
+        source = os.path.abspath(path)
+        stat = os.stat(path)
+        model_sha256 = read_manifest()['models'][model_name]['sha256']
+        is_csv = not path.lower().endswith('.parquet')
+
+        with self._lock:
+            state = self._source_state(source, model_name)
+            if state is not None and (state['size'], state['mtime_ns']) == (stat.st_size, stat.st_mtime_ns) \
+                    and state['model_sha256'] == model_sha256:
+                return {'source': source, 'rows_added': 0, 'rebuilt': False, 'rows': state['rows'],
+                        'seconds': time.perf_counter() - start}
+
+            rebuilt = (state is None or state['model_sha256'] != model_sha256 or not is_csv
+                       or not _appended_only(path, state))
+            if rebuilt:
+                self._delete_source(source, model_name)
+                state = {'rows': 0, 'offset': 0}
+
+            if is_csv:
+                cohort, offset = _read_csv_from(path, state['offset'])
+            else:
+                cohort, offset = scoring.read_cohort(path), stat.st_size
+
+            if len(cohort):
+                if model is None:
+                    model = scoring.load_model(model_name)
+                cohort = scoring.add_derived_features(cohort)
+                self._add(source, model_name, cohort, scoring.predict_proba_batch(model, cohort))
+
+            self._save_state(source, model_name, {
+                'model_sha256': model_sha256,
+                'rows': state['rows'] + len(cohort),
+                'offset': offset,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'tail_sha256': _tail_sha256(path, offset) if is_csv else None
+            })
+            self._db.commit()
+            return {'source': source, 'rows_added': len(cohort), 'rebuilt': rebuilt,
+                    'rows': state['rows'] + len(cohort), 'seconds': time.perf_counter() - start}
+
+    def sources(self, model_name=scoring.DEFAULT_MODEL):
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT source, rows, updated_at FROM sources WHERE model = ? ORDER BY source",
+                self._db, params=(model_name,)
+            )
+
+    # Fungsi untuk membaca agregat satu dimensi (dijumlahkan atas semua sumber)
+    def dimension(self, name, model_name=scoring.DEFAULT_MODEL):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT value, {', '.join(f'SUM({c})' for c in COUNTERS)} FROM aggregates "
+                "WHERE model = ? AND dimension = ? GROUP BY value", (model_name, name)
+            ).fetchall()
+        table = pd.DataFrame(rows, columns=['value'] + COUNTERS)
+        labels = DIMENSIONS.get(name, (None, None))[1]
+        table.insert(1, 'label', table['value'].map(labels) if labels else table['value'])
+        table['label'] = table['label'].fillna(table['value'])
+        table['dropout_rate'] = table['dropout'] / table['labeled'].where(table['labeled'] > 0)
+        table['predicted_rate'] = table['predicted_dropout'] / table['students']
+        table['mean_probability'] = table['probability_sum'] / table['students']
+        order = AGE_LABELS if name == 'Age_group' else APPROVAL_LABELS if name == 'Approval_2nd_sem' else None
+        if order:
+            table = table.set_index('value').reindex([v for v in order if v in set(table['value'])]).reset_index()
+        else:
+            table = table.sort_values('value', key=lambda s: pd.to_numeric(s, errors='coerce')).reset_index(drop=True)
+        return table
+
+    # Ringkasan keseluruhan: jumlah mahasiswa, tingkat dropout aktual dan prediksi
+    def overview(self, model_name=scoring.DEFAULT_MODEL):
+        total = self.dimension(TOTAL, model_name)
+        if total.empty:
+            return {name: 0 for name in COUNTERS} | {'dropout_rate': None, 'predicted_rate': None,
+                                                      'mean_probability': None}
+        row = total.iloc[0]
+        # Rasio tanpa penyebut (mis. sumber tanpa label Status) bernilai None, bukan NaN
+        return {name: None if pd.isna(row[name]) else row[name].item() if hasattr(row[name], 'item') else row[name]
+                for name in COUNTERS + ['dropout_rate', 'predicted_rate', 'mean_probability']}
+
+    # Distribusi probabilitas dropout model (histogram lebar 1/RISK_BINS)
+    def risk_distribution(self, model_name=scoring.DEFAULT_MODEL):
+        with self._lock:
+            rows = dict(self._db.execute(
+                "SELECT bin, SUM(students) FROM risk_bins WHERE model = ? GROUP BY bin", (model_name,)
+            ).fetchall())
+        bins = np.arange(RISK_BINS)
+        return pd.DataFrame({
+            'lower': bins / RISK_BINS,
+            'upper': (bins + 1) / RISK_BINS,
+            'students': [rows.get(int(b), 0) for b in bins]
+        })
+
+
+def _tail_sha256(path, offset):
+    with open(path, 'rb') as f:
+        f.seek(max(0, offset - TAIL_CHECK_BYTES))
+        return hashlib.sha256(f.read(offset - f.tell())).hexdigest()
+
+
+# File dianggap hanya bertambah jika tidak menyusut dan byte sebelum offset tidak berubah
+def _appended_only(path, state):
+    if state['offset'] is None or os.path.getsize(path) < state['offset']:
+        return False
+    return _tail_sha256(path, state['offset']) == state['tail_sha256']
+
+
+# Fungsi untuk membaca baris CSV lengkap mulai dari offset byte tertentu. Baris
+# terakhir tanpa newline (mungkin sedang ditulis) ditunda ke pembaruan berikutnya.
+def _read_csv_from(path, offset):
+    with open(path, 'rb') as f:
+        header = f.readline()
+        offset = max(offset, len(header))
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b'\n') + 1]
+    return ingest.read_csv(io.BytesIO(header + data)), offset + len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_PATH, help='File SQLite (default: %(default)s)')
+    parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    refresh_parser = subparsers.add_parser('refresh', help='Perbarui agregat dari file kohort')
+    refresh_parser.add_argument('inputs', nargs='+', help='File kohort (CSV pemisah ; atau Parquet)')
+    show_parser = subparsers.add_parser('show', help='Tampilkan agregat satu dimensi')
+    show_parser.add_argument('dimension', nargs='?', default=TOTAL, choices=[TOTAL, *DIMENSIONS])
+    args = parser.parse_args(argv)
+
+    store = AnalyticsStore(args.db)
+    if args.command == 'refresh':
+        for path in args.inputs:
+            result = store.refresh(path, args.model)
+            action = 'dibangun ulang' if result['rebuilt'] else 'inkremental'
+            print(f"{path}: {result['rows_added']:,} baris baru ({action}), total {result['rows']:,} baris, "
+                  f"{result['seconds']:.2f} s")
+    else:
+        start = time.perf_counter()
+        table = store.dimension(args.dimension, args.model)
+        elapsed = time.perf_counter() - start
+        table.to_csv(sys.stdout, sep=';', index=False, float_format='%.4f')
+        print(f"kueri {elapsed * 1e3:.1f} ms ({args.db})", file=sys.stderr)
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
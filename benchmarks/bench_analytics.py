@@ -0,0 +1,65 @@
+"""Benchmark dashboard analitik: agregat tersimpan vs agregasi ulang dari CSV.
+
+Tanpa store, setiap tampilan dashboard membaca kohort, menskornya dan
+menghitung group-by dari awal. Dengan analytics.AnalyticsStore, tampilan
+hanya membaca agregat dari SQLite; baris baru di akhir CSV ditambahkan secara
+inkremental (hanya baris baru yang dibaca dan diskor).
+
+    python benchmarks/bench_analytics.py --rows 100000 --append 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import synthetic_cohort, time_call
+
+import analytics
+import ingest
+import scoring
+
+
+def dashboard_queries(store):
+    store.overview()
+    for name in analytics.DIMENSIONS:
+        store.dimension(name)
+    store.risk_distribution()
+
+
+def recompute(model, path):
+    cohort = scoring.add_derived_features(ingest.read_csv(path))
+    return analytics.aggregate(cohort, scoring.predict_proba_batch(model, cohort))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--append', type=int, default=1000, help='Baris baru per pembaruan inkremental')
+    args = parser.parse_args(argv)
+
+    model = scoring.load_model(scoring.DEFAULT_MODEL)
+    cohort = synthetic_cohort(args.rows + args.append, with_status=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'kohort.csv')
+        cohort.iloc[:args.rows].to_csv(path, sep=';', index=False)
+        store = analytics.AnalyticsStore(os.path.join(tmp, 'analytics.sqlite'))
+
+        build = store.refresh(path, model=model)['seconds']
+        query = time_call(lambda: dashboard_queries(store), repeat=7)
+        full = time_call(lambda: recompute(model, path), repeat=3)
+
+        cohort.iloc[args.rows:].to_csv(path, sep=';', index=False, header=False, mode='a')
+        start = time.perf_counter()
+        result = store.refresh(path, model=model)
+        incremental = time.perf_counter() - start
+        store.close()
+
+    print(f"{args.rows:,} mahasiswa, {len(analytics.DIMENSIONS) + 1} dimensi + distribusi risiko")
+    print(f"agregasi ulang per tampilan   {full * 1e3:>9.1f} ms (baca CSV + skoring + group-by)")
+    print(f"kueri store (SQLite)          {query * 1e3:>9.1f} ms")
+    print(f"pembangunan awal store        {build * 1e3:>9.1f} ms")
+    print(f"pembaruan inkremental         {incremental * 1e3:>9.1f} ms ({result['rows_added']:,} baris baru)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark kueri top-K kohort: seleksi parsial vs pengurutan penuh.
+
+Kohort sintetis diskor sekali (cohort.ScoredCohort.build), lalu kueri
+"K mahasiswa berisiko tertinggi dengan filter" dijalankan dengan
+ScoredCohort.top_k dan dengan scoring.rank_risk atas seluruh seleksi.
+
+    python benchmarks/bench_cohort.py --rows 100000 500000 --top 200
+"""
+import argparse
+
+import numpy as np
+from common import synthetic_cohort, time_call
+
+import scoring
+from cohort import ScoredCohort
+
+QUERIES = {
+    'tanpa filter': {},
+    'Course=9254, Debtor=1': {'Course': [9254], 'Debtor': [1]},
+    'Scholarship_holder=0': {'Scholarship_holder': [0]}
+}
+
+
+def full_sort(scored, k, filters):
+    mask = scored.mask(filters)
+    candidates = np.arange(len(scored)) if mask is None else np.flatnonzero(mask)
+    ranked = scoring.rank_risk(scored.probabilities[candidates]).head(k)
+    return scored.table.iloc[candidates[ranked['row'].to_numpy()]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', nargs='+', type=int, default=[100000, 500000])
+    parser.add_argument('--top', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    model = scoring.load_model(scoring.DEFAULT_MODEL)
+    print(f"{'Baris':>9} {'Kueri':<24} {'top_k':>10} {'sort penuh':>12}")
+    for rows in args.rows:
+        scored = ScoredCohort.build(model, synthetic_cohort(rows))
+        for name, filters in QUERIES.items():
+            partial = time_call(lambda: scored.top_k(args.top, filters), repeat=7)
+            full = time_call(lambda: full_sort(scored, args.top, filters), repeat=7)
+            print(f"{rows:>9,} {name:<24} {partial * 1e3:>7.1f} ms {full * 1e3:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark throughput penjelasan TreeSHAP eksak (explain) per model.
+
+Untuk setiap model dilaporkan cara perhitungan (tabel per daun atau
+penelusuran jalur per level), waktu inisialisasi explainer, latensi satu
+mahasiswa, throughput batch (mahasiswa/s dan atribusi/s) serta selisih
+aditivitas (expected_value + jumlah kontribusi vs keluaran model).
+
+    python benchmarks/bench_explain.py --rows 5000 --path-rows 200
+"""
+import argparse
+import time
+
+from common import synthetic_cohort, time_call
+
+import model_store
+import scoring
+from explain import TreeExplainer, additivity_error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--path-rows', type=int, default=200,
+                        help='Jumlah baris untuk model dengan penelusuran jalur (tree dalam)')
+    parser.add_argument('--models', nargs='+', default=scoring.available_models(),
+                        choices=list(scoring.ALL_MODEL_FILES))
+    args = parser.parse_args(argv)
+
+    cohort = scoring.add_derived_features(synthetic_cohort(max(args.rows, args.path_rows)))
+    print(f"{'Model':<24} {'cara':>5} {'init':>8} {'1 mhs':>9} {'baris':>6} "
+          f"{'mhs/s':>9} {'atribusi/s':>11} {'aditivitas':>10}")
+    for name in args.models:
+        pipeline = model_store.load_model(name)
+        start = time.perf_counter()
+        explainer = TreeExplainer(pipeline)
+        init_seconds = time.perf_counter() - start
+
+        rows = args.rows if explainer.method == 'table' else args.path_rows
+        batch = cohort.iloc[:rows]
+        single = time_call(lambda: explainer.shap_values(batch.iloc[:1]), repeat=5)
+        start = time.perf_counter()
+        values = explainer.shap_values(batch)
+        batch_seconds = time.perf_counter() - start
+
+        print(f"{name:<24} {explainer.method:>5} {init_seconds * 1e3:>6.0f} ms {single * 1e3:>6.1f} ms "
+              f"{rows:>6} {rows / batch_seconds:>9,.0f} {values.size / batch_seconds:>11,.0f} "
+              f"{additivity_error(explainer, batch, values):>10.1e}")
+
+
+if __name__ == '__main__':
+    main()
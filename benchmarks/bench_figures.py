@@ -0,0 +1,75 @@
+"""Benchmark grafik halaman hasil: build per rerun vs cache grafik, Plotly vs mode ringan.
+
+Untuk setiap grafik (gauge, perbandingan model, dua feature importance,
+kontribusi fitur) diukur waktu build, waktu serialisasi dan ukuran JSON yang
+dikirim ke browser, dalam mode penuh (figure Plotly) dan mode ringan
+(spesifikasi Vega-Lite ringkas). Dengan cache grafik, rerun hanya membayar
+serialisasi.
+
+    python benchmarks/bench_figures.py
+"""
+import argparse
+import json
+
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+from common import synthetic_cohort, time_call
+
+import prediksi
+import scoring
+from explain import TreeExplainer
+
+
+def serialize(figure):
+    return json.dumps(figure) if isinstance(figure, dict) else pio.to_json(figure, validate=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    model = scoring.load_model(scoring.DEFAULT_MODEL)
+    feature_info = scoring.load_feature_info()
+    explainer = TreeExplainer(model)
+    features = scoring.add_derived_features(synthetic_cohort(1)).iloc[0].to_dict()
+    probability = float(scoring.predict_proba_batch(model, pd.DataFrame([features]))[0])
+    comparison = pd.DataFrame({'Model': list(scoring.MODEL_FILES), 'Probabilitas Dropout': [probability] * 3})
+
+    builders = {
+        'gauge': lambda: prediksi.build_dropout_gauge(probability),
+        'perbandingan_model': lambda: prediksi.build_model_comparison_chart(comparison),
+        'importance.permutation': lambda: prediksi.build_importance_chart(
+            feature_info, scoring.DEFAULT_MODEL, 'permutation', 'Permutation Importance', 10),
+        'importance.impurity': lambda: prediksi.build_importance_chart(
+            feature_info, scoring.DEFAULT_MODEL, 'impurity', 'Impurity Importance', 10),
+        'kontribusi': lambda: prediksi.build_contributions_chart(explainer, features, 10, 'log-odds')
+    }
+
+    print(f"{'Grafik':<24} {'Mode':<7} {'build':>9} {'serialisasi':>12} {'ukuran':>9}")
+    totals = {}
+    for lite in (False, True):
+        mode = 'ringan' if lite else 'penuh'
+        st.session_state['lite_mode'] = lite
+        for name, build in builders.items():
+            if lite and name == 'gauge':
+                continue  # mode ringan menampilkan angka dan progress bar
+            figure = build()
+            build_seconds = time_call(build, repeat=args.repeat)
+            serialize_seconds = time_call(lambda: serialize(figure), repeat=args.repeat)
+            size = len(serialize(figure))
+            total = totals.setdefault(mode, [0.0, 0.0, 0])
+            total[0] += build_seconds
+            total[1] += serialize_seconds
+            total[2] += size
+            print(f"{name:<24} {mode:<7} {build_seconds * 1e3:>6.1f} ms {serialize_seconds * 1e3:>9.1f} ms "
+                  f"{size / 1024:>6.1f} KB")
+
+    for mode, (build_seconds, serialize_seconds, size) in totals.items():
+        print(f"rerun mode {mode:<7} tanpa cache {(build_seconds + serialize_seconds) * 1e3:>7.1f} ms, "
+              f"dengan cache {serialize_seconds * 1e3:>6.1f} ms, {size / 1024:.1f} KB dikirim")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark Gradient Boosting (produksi) vs Hist Gradient Boosting.
+
+Kedua model dilatih pada split yang sama dengan train.py dari
+students_performance.csv. Gradient Boosting memakai hyperparameter model
+produksi (models/gradient_boosting_model.joblib), Hist Gradient Boosting memakai
+--max-iter/--learning-rate. Dilaporkan waktu latih, F1/AUC uji dan throughput
+skoring (sklearn dan tree_engine) pada kohort sintetis.
+
+    python benchmarks/bench_hist_gradient_boosting.py --rows 100000
+"""
+import argparse
+import time
+
+from common import synthetic_cohort, time_call
+
+import model_store
+import scoring
+import train
+from sklearn.model_selection import train_test_split
+from tree_engine import compile_pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Ukuran kohort untuk throughput skoring')
+    parser.add_argument('--max-iter', type=int, default=100)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    X, y = train.load_training_data()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=train.RANDOM_STATE, stratify=y
+    )
+    production = model_store.load_model('Gradient Boosting').named_steps['classifier']
+    params = {
+        'Gradient Boosting': {k: v for k, v in production.get_params().items()
+                              if k in ('n_estimators', 'learning_rate', 'max_depth', 'subsample')},
+        'Hist Gradient Boosting': {'max_iter': args.max_iter, 'learning_rate': args.learning_rate}
+    }
+    cohort = scoring.add_derived_features(synthetic_cohort(args.rows))
+
+    print(f"{'Model':<24} {'latih':>8} {'F1 uji':>7} {'AUC uji':>8} "
+          f"{'sklearn':>13} {'compiled':>13}")
+    for name, classifier_params in params.items():
+        pipeline = train.build_pipeline(name, list(X.columns))
+        pipeline.named_steps['classifier'].set_params(**classifier_params)
+
+        start = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        metrics = train.evaluate(pipeline, X_test, y_test)
+        compiled = compile_pipeline(pipeline)
+        sk_batch = time_call(lambda: scoring.predict_proba_batch(pipeline, cohort), repeat=3)
+        c_batch = time_call(lambda: compiled.predict_dropout_proba(cohort), repeat=3)
+        print(f"{name:<24} {fit_seconds:>6.2f} s {metrics['f1']:>7.3f} {metrics['roc_auc']:>8.3f} "
+              f"{args.rows / sk_batch:>9.0f} r/s {args.rows / c_batch:>9.0f} r/s")
+
+
+if __name__ == '__main__':
+    main()
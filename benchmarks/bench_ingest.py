@@ -0,0 +1,45 @@
+"""Benchmark pembacaan kohort: read_csv bawaan vs skema ingest vs cache Parquet.
+
+Kohort sintetis multi-tahun (bootstrap dari data asli, termasuk Status) ditulis
+ke CSV sementara lalu dibaca dengan ketiga cara tersebut.
+
+    python benchmarks/bench_ingest.py --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from common import synthetic_cohort, time_call
+
+import ingest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cohort.csv')
+        synthetic_cohort(args.rows, with_status=True).to_csv(path, sep=';', index=False)
+        ingest.build_cache(path)
+
+        readers = {
+            'pd.read_csv (bawaan)': lambda: pd.read_csv(path, sep=';', encoding='utf-8-sig'),
+            'ingest.read_csv (skema)': lambda: ingest.read_csv(path),
+            'ingest.load_cohort (Parquet)': lambda: ingest.load_cohort(path)
+        }
+
+        print(f"{args.rows:,} baris, CSV {os.path.getsize(path) / 1e6:.0f} MB, "
+              f"Parquet {os.path.getsize(ingest.cache_path(path)) / 1e6:.0f} MB")
+        for name, reader in readers.items():
+            seconds = time_call(reader, repeat=args.repeat)
+            memory = reader().memory_usage(deep=True).sum() / 1e6
+            print(f"{name:<30} {seconds:>7.3f} s {memory:>9.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
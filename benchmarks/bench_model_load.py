@@ -0,0 +1,53 @@
+"""Benchmark cold start pemuatan ketiga model (proses Python baru per run).
+
+Membandingkan joblib.load biasa, model_store.load_model (checksum + validasi
+manifest), ModelRegistry (hanya model utama, waktu sampai prediksi pertama)
+dan model terkompilasi yang di-memory-map dari file .npy. Jalankan
+`python -m tree_engine export` terlebih dahulu untuk skenario terakhir.
+
+    python benchmarks/bench_model_load.py --repeat 5
+"""
+import argparse
+import statistics
+
+from common import run_probe
+
+SCENARIOS = {
+    'joblib.load (tanpa validasi)': """
+import joblib, scoring
+models = {name: joblib.load(path) for name, path in scoring.MODEL_FILES.items()}
+""",
+    'model_store.load_model': """
+import model_store, scoring
+models = {name: model_store.load_model(name) for name in scoring.MODEL_FILES}
+""",
+    'ModelRegistry (model utama saja)': """
+import model_store
+models = model_store.ModelRegistry()
+""",
+    'model_store.load_compiled (mmap)': """
+import model_store, scoring
+models = {name: model_store.load_compiled(name) for name in scoring.MODEL_FILES}
+"""
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, body in SCENARIOS.items():
+        runs = [run_probe(body) for _ in range(args.repeat)]
+        results[name] = {
+            'median_seconds': statistics.median(r['seconds'] for r in runs),
+            'max_rss_mb': max(r['max_rss_kb'] for r in runs) / 1024
+        }
+
+    for name, res in results.items():
+        print(f"{name:<36} {res['median_seconds']:.3f} s   {res['max_rss_mb']:.0f} MB")
+    return results
+
+
+if __name__ == '__main__':
+    main()
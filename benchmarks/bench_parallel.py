@@ -0,0 +1,48 @@
+"""Benchmark skala skoring paralel (parallel_scoring) dari 1 hingga N proses.
+
+Waktu diukur setelah pool worker siap (start-up pool tidak dihitung), dan
+hasil setiap konfigurasi dibandingkan dengan skoring satu proses.
+
+    python benchmarks/bench_parallel.py --rows 1000000 --jobs 1 2 4 8
+"""
+import argparse
+import os
+
+import numpy as np
+
+from common import synthetic_cohort, time_call
+
+import scoring
+from parallel_scoring import ParallelScorer
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--jobs', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.MODEL_FILES))
+    parser.add_argument('--engine', default='sklearn', choices=['sklearn', 'compiled'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cohort = scoring.add_derived_features(synthetic_cohort(args.rows))
+    print(f"{args.rows:,} baris, {args.model} ({args.engine}), {cpus} CPU")
+    print(f"{'Proses':>6} {'Durasi':>9} {'Speedup':>8} {'Efisiensi':>10} {'selisih maks':>13}")
+
+    baseline = reference = None
+    for n_jobs in args.jobs:
+        with ParallelScorer(args.model, n_jobs=n_jobs, engine=args.engine) as scorer:
+            probabilities = scoring.predict_proba_batch(scorer, cohort)  # warm-up pool
+            seconds = time_call(lambda: scoring.predict_proba_batch(scorer, cohort), repeat=args.repeat)
+
+        if baseline is None:
+            baseline, reference = seconds, probabilities
+        speedup = baseline / seconds
+        max_diff = np.max(np.abs(probabilities - reference))
+        print(f"{n_jobs:>6} {seconds:>7.2f} s {speedup:>7.2f}x {speedup / n_jobs:>9.0%} {max_diff:>13.1e}")
+
+
+if __name__ == '__main__':
+    main()
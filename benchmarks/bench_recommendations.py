@@ -0,0 +1,45 @@
+"""Benchmark rekomendasi intervensi: per mahasiswa vs tabel aturan tervektorisasi.
+
+Membandingkan pemanggilan get_recommendations untuk setiap mahasiswa (teks
+Markdown per baris) dengan assign_interventions + intervention_counts untuk
+seluruh kohort sekaligus.
+
+    python benchmarks/bench_recommendations.py --rows 100000
+"""
+import argparse
+
+from common import synthetic_cohort, time_call
+
+import model_store
+import scoring
+from recommendations import assign_interventions, get_recommendations, intervention_counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    cohort = scoring.add_derived_features(synthetic_cohort(args.rows))
+    model = model_store.load_model(scoring.DEFAULT_MODEL)
+    probabilities = scoring.predict_proba_batch(model, cohort)
+    predictions = scoring.labels_from_proba(probabilities)
+    records = cohort.to_dict('records')
+
+    def per_student():
+        return [get_recommendations(p, prob, features)
+                for p, prob, features in zip(predictions, probabilities, records)]
+
+    def vectorized():
+        return intervention_counts(assign_interventions(cohort, predictions))
+
+    loop_seconds = time_call(per_student, repeat=1)
+    vector_seconds = time_call(vectorized, repeat=5)
+    print(f"{args.rows:,} mahasiswa")
+    print(f"get_recommendations per mahasiswa  {loop_seconds * 1e3:>10.1f} ms")
+    print(f"assign_interventions + counts      {vector_seconds * 1e3:>10.1f} ms")
+    print(f"Jumlah per intervensi: {vectorized()}")
+
+
+if __name__ == '__main__':
+    main()
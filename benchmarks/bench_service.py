@@ -0,0 +1,117 @@
+"""Benchmark latensi (p50/p99) dan throughput layanan HTTP prediksi.
+
+Secara default benchmark menjalankan instance lokal `python -m service` di
+port acak, lalu mengirim permintaan satu mahasiswa dari beberapa klien
+bersamaan. Gunakan --url untuk mengukur instance yang sudah berjalan.
+
+    python benchmarks/bench_service.py --clients 16 --requests 200
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from common import ROOT, synthetic_cohort
+
+
+def load_payloads(n, seed=42):
+    cohort = synthetic_cohort(n, seed=seed)
+    return [json.dumps({'students': [row]}).encode('utf-8') for row in cohort.to_dict('records')]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/health', timeout=1) as resp:
+                return json.loads(resp.read())
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Service di {url} tidak merespons")
+
+
+def post(url, body):
+    request = urllib.request.Request(url + '/predict', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as resp:
+        resp.read()
+
+
+def run_load(url, payloads, n_clients):
+    latencies = [[] for _ in range(n_clients)]
+    chunks = [payloads[i::n_clients] for i in range(n_clients)]
+
+    def client(i):
+        for body in chunks[i]:
+            start = time.perf_counter()
+            post(url, body)
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    return {
+        'requests': len(all_latencies),
+        'clients': n_clients,
+        'p50_ms': float(np.percentile(all_latencies, 50)),
+        'p99_ms': float(np.percentile(all_latencies, 99)),
+        'throughput_rps': len(all_latencies) / elapsed
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help='URL instance yang sudah berjalan')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='Permintaan per klien')
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f'http://127.0.0.1:{port}'
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'service', '--port', str(port),
+             '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms)],
+            cwd=ROOT, stdout=subprocess.DEVNULL
+        )
+
+    try:
+        wait_until_ready(url)
+        payloads = load_payloads(args.clients * args.requests)
+        run_load(url, payloads[:args.clients * 5], args.clients)  # warm-up
+        result = run_load(url, payloads, args.clients)
+        health = wait_until_ready(url)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    result['avg_batch_size'] = health['students'] / max(health['batches'], 1)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark waktu start-up dan memori: skoring headless vs stack UI lama.
+
+Setiap skenario dijalankan di proses Python baru agar cache import tidak
+terbawa. Jalankan dari root repositori:
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import yang dulu dijalankan prediksi.py saat modul dimuat
+UI_IMPORTS = """
+import streamlit
+import matplotlib.pyplot
+import seaborn
+import PIL.Image
+import plotly.express
+import plotly.graph_objects
+"""
+
+HEADLESS = """
+import scoring
+scoring.load_model(scoring.DEFAULT_MODEL)
+"""
+
+SCENARIOS = {
+    'headless (python -m scoring)': HEADLESS,
+    'UI stack + model': UI_IMPORTS + HEADLESS
+}
+
+# Dicetak oleh proses anak: durasi dan RSS puncak
+PROBE = """
+import resource, sys, time
+_start = time.perf_counter()
+{body}
+_elapsed = time.perf_counter() - _start
+_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    _rss //= 1024
+print('{{"seconds": %f, "max_rss_kb": %d}}' % (_elapsed, _rss))
+"""
+
+
+def run_scenario(body):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(body=body)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, body in SCENARIOS.items():
+        runs = [run_scenario(body) for _ in range(args.repeat)]
+        results[name] = {
+            'median_seconds': statistics.median(r['seconds'] for r in runs),
+            'max_rss_mb': max(r['max_rss_kb'] for r in runs) / 1024
+        }
+
+    for name, res in results.items():
+        print(f"{name:<32} {res['median_seconds']:.3f} s   {res['max_rss_mb']:.0f} MB")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark memori puncak skoring penuh vs streaming (--chunksize).
+
+Kohort sintetis beberapa ukuran ditulis ke CSV sementara, lalu
+`python -m scoring` dijalankan di proses baru dengan dan tanpa --chunksize.
+Pada mode streaming RSS puncak seharusnya hampir konstan terhadap ukuran file.
+
+    python benchmarks/bench_streaming.py --rows 100000 1000000 --chunksize 50000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import ROOT, synthetic_cohort
+
+PROBE = """
+import resource, sys, time
+import scoring
+_start = time.perf_counter()
+scoring.main({argv!r})
+_elapsed = time.perf_counter() - _start
+_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    _rss //= 1024
+print('{{"seconds": %f, "max_rss_kb": %d}}' % (_elapsed, _rss))
+"""
+
+
+def run_scoring(argv):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(argv=argv)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--chunksize', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    print(f"{'Baris':>10} {'Mode':<22} {'Durasi':>9} {'RSS puncak':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f'cohort_{n_rows}.csv')
+            synthetic_cohort(n_rows).to_csv(path, sep=';', index=False)
+            output = os.path.join(tmp, 'out.csv')
+
+            modes = {
+                'penuh': [path, '-o', output],
+                f'streaming ({args.chunksize:,})': [path, '-o', output, '--chunksize', str(args.chunksize)]
+            }
+            for mode, scoring_argv in modes.items():
+                result = run_scoring(scoring_argv)
+                print(f"{n_rows:>10,} {mode:<22} {result['seconds']:>7.2f} s "
+                      f"{result['max_rss_kb'] / 1024:>8.0f} MB")
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
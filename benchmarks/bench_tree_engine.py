@@ -0,0 +1,45 @@
+"""Benchmark mesin tree NumPy (tree_engine) vs pipeline sklearn.
+
+Mengukur latensi satu mahasiswa (dict fitur dari form) dan throughput batch,
+serta selisih maksimum probabilitas terhadap predict_proba sklearn.
+
+    python benchmarks/bench_tree_engine.py --rows 100000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import synthetic_cohort, time_call
+
+import scoring
+from tree_engine import compile_pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    cohort = scoring.add_derived_features(synthetic_cohort(args.rows))
+    single = cohort.iloc[0].to_dict()
+
+    print(f"{'Model':<18} {'sklearn 1 baris':>16} {'compiled 1 baris':>17} "
+          f"{'sklearn batch':>14} {'compiled batch':>15} {'selisih maks':>13}")
+    for name in scoring.MODEL_FILES:
+        pipeline = scoring.load_model(name)
+        compiled = compile_pipeline(pipeline)
+
+        sk_single = time_call(lambda: scoring.predict_proba_batch(pipeline, pd.DataFrame([single])), number=20)
+        c_single = time_call(lambda: compiled.predict_dropout_proba(single), number=20)
+        sk_batch = time_call(lambda: scoring.predict_proba_batch(pipeline, cohort), repeat=3)
+        c_batch = time_call(lambda: compiled.predict_dropout_proba(cohort), repeat=3)
+
+        max_diff = np.max(np.abs(scoring.predict_proba_batch(pipeline, cohort)
+                                 - compiled.predict_dropout_proba(cohort)))
+        print(f"{name:<18} {sk_single * 1e3:>13.2f} ms {c_single * 1e3:>14.3f} ms "
+              f"{args.rows / sk_batch:>10.0f} r/s {args.rows / c_batch:>11.0f} r/s {max_diff:>13.1e}")
+
+
+if __name__ == '__main__':
+    main()
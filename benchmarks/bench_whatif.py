@@ -0,0 +1,43 @@
+"""Benchmark analisis what-if: satu panggilan batch vs satu panggilan per skenario.
+
+Skenario dibuat dari satu profil mahasiswa dengan whatif.build_scenarios, lalu
+diskor sekaligus (whatif.sweep) atau satu per satu seperti form aplikasi
+dikirim ulang untuk setiap nilai.
+
+    python benchmarks/bench_whatif.py --mode grid
+"""
+import argparse
+
+from common import synthetic_cohort, time_call
+
+import model_store
+import pandas as pd
+import scoring
+import whatif
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=['oneway', 'grid'], default='oneway')
+    parser.add_argument('--fields', nargs='+', default=whatif.DEFAULT_WHATIF_FIELDS,
+                        choices=list(whatif.WHATIF_FIELDS))
+    args = parser.parse_args(argv)
+
+    features = synthetic_cohort(1).iloc[0].to_dict()
+    model = model_store.load_model(scoring.DEFAULT_MODEL)
+    grid = whatif.default_grid(features, args.fields)
+    scenarios = whatif.build_scenarios(features, grid, args.mode)
+    records = scenarios.drop(columns='field').to_dict('records')
+
+    def per_scenario():
+        return [scoring.predict_proba_batch(model, pd.DataFrame([record]))[0] for record in records]
+
+    loop_seconds = time_call(per_scenario, repeat=1)
+    batch_seconds = time_call(lambda: whatif.sweep(model, features, grid, args.mode), repeat=5)
+    print(f"{len(scenarios):,} skenario ({args.mode}: {', '.join(args.fields)})")
+    print(f"predict_proba per skenario  {loop_seconds * 1e3:>10.1f} ms")
+    print(f"whatif.sweep (satu batch)   {batch_seconds * 1e3:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Utilitas bersama untuk skrip benchmark."""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ROOT, 'Data', 'students_performance.csv')
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import scoring  # noqa: E402
+
+
+# Fungsi untuk membuat kohort sintetis dengan bootstrap dari data asli
+def synthetic_cohort(n, seed=42, with_status=False):
+    cohort = scoring.read_cohort(DATA_PATH)
+    if not with_status:
+        cohort = cohort.drop(columns=['Status'])
+    return cohort.sample(n, replace=True, random_state=seed).reset_index(drop=True)
+
+
+# Fungsi untuk mengukur median durasi sebuah fungsi (detik)
+def time_call(func, repeat=5, number=1):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+# Dicetak oleh proses anak: durasi (termasuk import) dan RSS puncak
+PROBE = """
+import resource, sys, time
+_start = time.perf_counter()
+{body}
+_elapsed = time.perf_counter() - _start
+_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    _rss //= 1024
+print('{{"seconds": %f, "max_rss_kb": %d}}' % (_elapsed, _rss))
+"""
+
+
+# Fungsi untuk menjalankan potongan kode di proses Python baru (cold start)
+def run_probe(body):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(body=body)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
@@ -0,0 +1,246 @@
+"""Suite benchmark inferensi dan pelatihan dengan perbandingan terhadap baseline.
+
+Mengukur untuk setiap model: cold start (proses baru sampai prediksi pertama),
+latensi satu baris (jalur predict_dropout di aplikasi), throughput batch dan
+memori puncak pada kohort sintetis 1k/100k/1M baris (bootstrap dengan seed
+tetap dari students_performance.csv), serta waktu latih dengan hyperparameter
+model produksi. Hasil ditulis sebagai JSON dan dibandingkan dengan
+benchmarks/baseline.json; kode keluar 1 jika ada regresi di atas toleransi.
+
+    python benchmarks/run.py -o hasil.json
+    python benchmarks/run.py --sizes 1000 100000 --save-baseline
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from common import ROOT, run_probe, synthetic_cohort, time_call
+
+import model_store
+import scoring
+import train
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = [1000, 100000, 1000000]
+SUITES = ['cold_start', 'single_row', 'batch', 'training']
+# Regresi jika lebih buruk dari baseline lebih dari toleransi (relatif)
+DEFAULT_TOLERANCE = 0.25
+
+# Arah metrik: 1 = makin besar makin baik, -1 = makin kecil makin baik.
+# p95_ms hanya dilaporkan (terlalu berisik untuk dijadikan gerbang regresi).
+DIRECTIONS = {
+    'seconds': -1,
+    'p50_ms': -1,
+    'rows_per_second': 1,
+    'peak_mb': -1,
+    'max_rss_mb': -1,
+    'f1': 1
+}
+
+COLD_START = """
+import pandas as pd
+import model_store, scoring
+model = model_store.load_model({name!r})
+cohort = scoring.add_derived_features(scoring.read_cohort('Data/students_performance.csv').head(1))
+scoring.predict_proba_batch(model, cohort)
+"""
+
+
+def environment():
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def bench_cold_start(models, repeat):
+    results = {}
+    for name in models:
+        runs = [run_probe(COLD_START.format(name=name)) for _ in range(repeat)]
+        results[name] = {
+            'seconds': statistics.median(r['seconds'] for r in runs),
+            'max_rss_mb': max(r['max_rss_kb'] for r in runs) / 1024
+        }
+    return results
+
+
+def bench_single_row(models, n_calls):
+    features = scoring.add_derived_features(synthetic_cohort(1)).iloc[0].to_dict()
+    results = {}
+    for name in models:
+        model = model_store.load_model(name)
+        timings = []
+        for _ in range(n_calls):
+            start = time.perf_counter()
+            scoring.predict_proba_batch(model, pd.DataFrame([features]))
+            timings.append(time.perf_counter() - start)
+        p50, p95 = np.percentile(timings, [50, 95]) * 1e3
+        results[name] = {'p50_ms': float(p50), 'p95_ms': float(p95)}
+    return results
+
+
+# Memori puncak yang dialokasikan selama skoring (tracemalloc, diukur terpisah dari waktu)
+def _peak_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_batch(models, sizes, repeat, seed):
+    loaded = {name: model_store.load_model(name) for name in models}
+    results = {}
+    for size in sizes:
+        cohort = scoring.add_derived_features(synthetic_cohort(size, seed=seed))
+        results[str(size)] = {}
+        for name, model in loaded.items():
+            # Kohort kecil diskor berulang agar setiap pengukuran >= ~0.1 detik
+            seconds = time_call(lambda: scoring.predict_proba_batch(model, cohort), repeat=repeat,
+                                number=max(1, 100000 // size))
+            results[str(size)][name] = {
+                'rows_per_second': size / seconds,
+                'peak_mb': _peak_mb(lambda: scoring.predict_proba_batch(model, cohort))
+            }
+    return results
+
+
+def bench_training(models, repeat):
+    X, y = train.load_training_data()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=train.RANDOM_STATE, stratify=y
+    )
+    results = {}
+    for name in models:
+        production = model_store.load_model(name)
+        timings = []
+        for _ in range(repeat):
+            pipeline = clone(production)
+            start = time.perf_counter()
+            pipeline.fit(X_train, y_train)
+            timings.append(time.perf_counter() - start)
+        results[name] = {
+            'seconds': statistics.median(timings),
+            'f1': train.evaluate(pipeline, X_test, y_test)['f1']
+        }
+    return results
+
+
+# Fungsi untuk meratakan hasil menjadi {'suite/.../metrik': nilai} untuk perbandingan
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}/{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+# Fungsi untuk membandingkan hasil dengan baseline; mengembalikan daftar baris perbandingan
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    current = flatten(current['results'])
+    baseline = flatten(baseline['results'])
+    rows = []
+    for key in sorted(current.keys() & baseline.keys()):
+        direction = DIRECTIONS.get(key.rsplit('/', 1)[-1])
+        if direction is None or not baseline[key]:
+            continue
+        change = (current[key] - baseline[key]) / baseline[key]
+        rows.append({
+            'metric': key,
+            'baseline': baseline[key],
+            'current': current[key],
+            'change': change,
+            'regression': change * direction < -tolerance
+        })
+    return rows
+
+
+def run(models, sizes, suites, repeat, seed, single_calls):
+    results = {}
+    if 'cold_start' in suites:
+        results['cold_start'] = bench_cold_start(models, repeat)
+    if 'single_row' in suites:
+        results['single_row'] = bench_single_row(models, single_calls)
+    if 'batch' in suites:
+        results['batch'] = bench_batch(models, sizes, repeat, seed)
+    if 'training' in suites:
+        results['training'] = bench_training(models, repeat)
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': {'models': models, 'sizes': sizes, 'suites': suites, 'repeat': repeat, 'seed': seed,
+                   'single_calls': single_calls},
+        'results': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', nargs='+', default=list(scoring.MODEL_FILES),
+                        choices=list(scoring.ALL_MODEL_FILES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--suites', nargs='+', default=SUITES, choices=SUITES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--single-calls', type=int, default=200, help='Jumlah panggilan untuk latensi satu baris')
+    parser.add_argument('-o', '--output', help='Tulis hasil sebagai JSON')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='Simpan hasil sebagai baseline baru')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Perubahan relatif yang dianggap regresi (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    report = run(args.models, args.sizes, args.suites, args.repeat, args.seed, args.single_calls)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for key, value in flatten(report['results']).items():
+        print(f"{key:<60} {value:>14.4g}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline disimpan ke {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} tidak ditemukan; jalankan dengan --save-baseline", file=sys.stderr)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.tolerance)
+    regressions = [row for row in rows if row['regression']]
+
+    print(f"\nPerbandingan dengan {os.path.relpath(args.baseline)} "
+          f"({baseline['created']}, toleransi {args.tolerance:.0%})")
+    for row in rows:
+        flag = 'REGRESI' if row['regression'] else ''
+        print(f"{row['metric']:<60} {row['baseline']:>12.4g} {row['current']:>12.4g} {row['change']:>+8.1%} {flag}")
+    print(f"{len(regressions)} regresi dari {len(rows)} metrik")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Cache spesifikasi grafik dan grafik ringkas untuk mode ringan.
+
+Grafik halaman hasil dibangun ulang pada setiap rerun Streamlit (mis. setiap
+kali panel what-if diubah), padahal isinya hanya bergantung pada data yang
+digambar. ``FigureCache`` menyimpan grafik yang sudah dibangun dengan kunci
+hash isi (``content_key``): jenis grafik, versi model, dan data/parameternya.
+Grafik global seperti feature importance hanya bergantung pada versi model,
+sehingga dibangun sekali per model.
+
+Mode ringan memakai spesifikasi Vega-Lite ringkas (``bar_spec``,
+``line_spec``, ``heatmap_spec``): data dibulatkan, tanpa template Plotly, dan
+browser tidak perlu memuat Plotly.js.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Digit signifikan untuk nilai numerik di spesifikasi ringkas
+COMPACT_DIGITS = 4
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='split')
+    if isinstance(value, pd.Series):
+        return value.to_dict()
+    return str(value)
+
+
+# Fungsi untuk membuat kunci cache dari isi grafik (urutan bagian diperhitungkan)
+def content_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FigureCache:
+    """Cache LRU untuk grafik yang sudah dibangun (figure Plotly atau spesifikasi dict).
+
+    Objek grafik disimpan apa adanya dan dipakai bersama oleh semua sesi,
+    sehingga pemanggil tidak boleh mengubahnya setelah disimpan.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return figure
+
+    def put(self, key, figure):
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+def _compact(value):
+    if isinstance(value, (float, np.floating)):
+        return float(f'{value:.{COMPACT_DIGITS}g}')
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# Fungsi untuk membuat spesifikasi Vega-Lite ringkas untuk grafik batang.
+# `color_map` ({nilai: warna}) mewarnai batang menurut kolom `color`.
+def bar_spec(data, x, y, title, horizontal=False, color=None, color_map=None, labels=None,
+             height=300, value_format=None):
+    labels = labels or {}
+    columns = [col for col in dict.fromkeys([x, y, color]) if col is not None]
+    values = [{col: _compact(row[col]) for col in columns} for _, row in data.iterrows()]
+
+    category, value = (y, x) if horizontal else (x, y)
+    value_axis = {'field': value, 'type': 'quantitative', 'title': labels.get(value, value)}
+    if value_format:
+        value_axis['axis'] = {'format': value_format}
+    category_axis = {'field': category, 'type': 'nominal', 'title': labels.get(category, category),
+                     'sort': None}
+    encoding = {'x': value_axis, 'y': category_axis} if horizontal else {'x': category_axis, 'y': value_axis}
+    encoding['tooltip'] = [{'field': col, 'title': labels.get(col, col)} for col in columns]
+    if color is not None:
+        encoding['color'] = {'field': color, 'title': labels.get(color, color)}
+        if color_map:
+            encoding['color']['scale'] = {'domain': list(color_map), 'range': list(color_map.values())}
+        if color == value:
+            encoding['color'].update(type='quantitative', scale={'scheme': 'viridis'}, legend=None)
+        else:
+            encoding['color']['type'] = 'nominal'
+
+    return {
+        'title': title,
+        'height': height,
+        'data': {'values': values},
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': encoding
+    }
+
+
+# Fungsi untuk membuat spesifikasi Vega-Lite ringkas untuk grafik garis dengan
+# garis bantu vertikal (`rule_x`, mis. nilai saat ini) dan horizontal (`rule_y`, mis. ambang)
+def line_spec(data, x, y, title, labels=None, height=300, rule_x=None, rule_y=None, y_domain=None):
+    labels = labels or {}
+    values = [{x: _compact(row[x]), y: _compact(row[y])} for _, row in data.iterrows()]
+    value_axis = {'field': y, 'type': 'quantitative', 'title': labels.get(y, y)}
+    if y_domain is not None:
+        value_axis['scale'] = {'domain': list(y_domain)}
+
+    layers = [{
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'encoding': {
+            'x': {'field': x, 'type': 'quantitative', 'title': labels.get(x, x)},
+            'y': value_axis
+        }
+    }]
+    if rule_x is not None:
+        layers.append({'mark': {'type': 'rule', 'color': 'gray', 'strokeDash': [6, 4]},
+                       'encoding': {'x': {'datum': _compact(rule_x), 'type': 'quantitative'}}})
+    if rule_y is not None:
+        layers.append({'mark': {'type': 'rule', 'color': 'red', 'strokeDash': [2, 2]},
+                       'encoding': {'y': {'datum': _compact(rule_y), 'type': 'quantitative'}}})
+
+    return {
+        'title': title,
+        'height': height,
+        'data': {'values': values},
+        'layer': layers
+    }
+
+
+# Fungsi untuk membuat spesifikasi Vega-Lite ringkas untuk heatmap dari tabel pivot
+# (indeks sebagai sumbu y, kolom sebagai sumbu x)
+def heatmap_spec(table, x_title, y_title, value_title, title=None, height=400, domain=None):
+    values = [
+        {'y': _compact(index), 'x': _compact(column), 'value': _compact(value)}
+        for index, row in table.iterrows()
+        for column, value in row.items()
+        if not pd.isna(value)
+    ]
+    color = {'field': 'value', 'type': 'quantitative', 'title': value_title,
+             'scale': {'scheme': 'redyellowgreen', 'reverse': True}}
+    if domain is not None:
+        color['scale']['domain'] = list(domain)
+
+    spec = {
+        'height': height,
+        'data': {'values': values},
+        'mark': {'type': 'rect', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'x', 'type': 'ordinal', 'title': x_title},
+            'y': {'field': 'y', 'type': 'ordinal', 'title': y_title},
+            'color': color
+        }
+    }
+    if title:
+        spec['title'] = title
+    return spec
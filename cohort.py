@@ -0,0 +1,242 @@
+"""Tabel kohort terskor untuk kueri top-K mahasiswa berisiko.
+
+Kohort diskor sekali lalu disimpan sebagai Parquet di samping sumbernya
+(.cache/<nama>.scored-<model>.parquet). Cache dipakai ulang selama file sumber
+(ukuran, mtime) dan checksum model di manifest tidak berubah.
+
+Kueri tidak mengurutkan seluruh kohort:
+- filter kategori memakai lookup table boolean per kolom (satu indeks array
+  per kolom, tanpa np.isin);
+- top-K memakai seleksi parsial np.partition (introselect, O(n)) untuk
+  mencari nilai ke-K; hanya K hasil yang diurutkan. Urutan dan penanganan nilai sama persis dengan
+  scoring.rank_risk (probabilitas menurun, nomor baris menaik).
+
+    python -m cohort Data/students_performance.csv --filter Course=9254 --filter Debtor=1 --top 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import scoring
+
+SCHEMA_VERSION = 1
+# Kode terbesar yang masih difilter dengan tabel lookup (lihat _isin)
+LOOKUP_LIMIT = 1 << 16
+
+# Kolom yang dapat difilter (kode bilangan bulat)
+FILTER_COLUMNS = [
+    'Course', 'Debtor', 'Scholarship_holder', 'Tuition_fees_up_to_date', 'Gender',
+    'Displaced', 'International', 'Daytime_evening_attendance', 'Marital_status', 'Application_mode'
+]
+
+# Kolom tambahan yang ikut disimpan untuk ditampilkan di tabel hasil
+DISPLAY_COLUMNS = [
+    'Age_at_enrollment', 'Curricular_units_1st_sem_approved', 'Curricular_units_2nd_sem_enrolled',
+    'Curricular_units_2nd_sem_approved', 'Curricular_units_2nd_sem_grade'
+]
+
+
+# Fungsi untuk menandai baris yang kodenya ada di `values`. Kode bilangan bulat
+# non-negatif memakai tabel lookup (satu indeks per baris); kode lain (float/NaN,
+# negatif, kohort kosong atau kode sangat besar) memakai np.isin.
+def _isin(codes, values):
+    if (codes.dtype.kind in 'iu' and values.dtype.kind in 'iu' and len(codes)
+            and codes.min() >= 0 and codes.max() < LOOKUP_LIMIT):
+        lookup = np.zeros(int(codes.max()) + 1, dtype=bool)
+        lookup[values[(values >= 0) & (values < len(lookup))]] = True
+        return lookup[codes]
+    return np.isin(codes, values)
+
+
+class ScoredCohort:
+    """Kohort yang sudah diskor: probabilitas dropout dan kolom filter per mahasiswa.
+
+    Kolom filter disimpan sebagai array NumPy sehingga setiap kueri cukup
+    beberapa operasi vektor atas seluruh kohort.
+    """
+
+    def __init__(self, table, model_name=None):
+        self.table = table.reset_index(drop=True)
+        self.model_name = model_name
+        self.probabilities = self.table['dropout_probability'].to_numpy(dtype=float)
+        self.rows = self.table['row'].to_numpy()
+        self._codes = {
+            col: self.table[col].to_numpy() for col in FILTER_COLUMNS if col in self.table.columns
+        }
+
+    def __len__(self):
+        return len(self.table)
+
+    # Fungsi untuk menskor kohort dan menyusun tabel (kolom filter + tampilan)
+    @classmethod
+    def build(cls, model, cohort, model_name=None):
+        cohort = scoring.add_derived_features(cohort)
+        probabilities = scoring.predict_proba_batch(model, cohort)
+        columns = [col for col in FILTER_COLUMNS + DISPLAY_COLUMNS + ['Status'] if col in cohort.columns]
+        table = cohort[columns].reset_index(drop=True)
+        table.insert(0, 'row', np.arange(len(cohort)))
+        table.insert(1, 'dropout_probability', probabilities)
+        return cls(table, model_name)
+
+    # Fungsi untuk memuat tabel terskor dari cache Parquet, atau menskor dan menyimpannya
+    @classmethod
+    def load(cls, path, model_name=scoring.DEFAULT_MODEL, model=None, use_cache=True):
+        target = scored_cache_path(path, model_name)
+        signature = _signature(path, model_name)
+        if use_cache and os.path.exists(target):
+            try:
+                if _cached_signature(target) == signature:
+                    return cls(pd.read_parquet(target), model_name)
+            except Exception:
+                pass  # cache rusak dibangun ulang
+
+        if model is None:
+            model = scoring.load_model(model_name)
+        scored = cls.build(model, scoring.read_cohort(path), model_name)
+        if use_cache:
+            try:
+                _write_cache(scored.table, target, signature)
+            except OSError:
+                pass  # direktori cache tidak dapat ditulis
+        return scored
+
+    # Nilai unik sebuah kolom filter (untuk pilihan di UI)
+    def values(self, column):
+        return np.unique(self._codes[column]).tolist()
+
+    # Fungsi untuk membuat mask baris. `filters` berupa {kolom: daftar nilai};
+    # kolom dengan daftar kosong/None tidak difilter.
+    def mask(self, filters=None, min_probability=None):
+        mask = None
+        for column, values in (filters or {}).items():
+            if values is None or (not np.isscalar(values) and len(values) == 0):
+                continue
+            selected = _isin(self._codes[column], np.atleast_1d(np.asarray(values)))
+            mask = selected if mask is None else mask & selected
+        if min_probability is not None and min_probability > 0:
+            selected = self.probabilities >= min_probability
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    # Fungsi utama: K mahasiswa dengan risiko tertinggi yang memenuhi filter
+    def top_k(self, k, filters=None, min_probability=None):
+        mask = self.mask(filters, min_probability)
+        candidates = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        probabilities = self.probabilities[candidates]
+
+        if 0 < k < len(candidates):
+            # Nilai ke-K; yang lebih besar pasti masuk, yang sama diambil dari baris terkecil
+            kth = -np.partition(-probabilities, k - 1)[k - 1]
+            above = np.flatnonzero(probabilities > kth)
+            ties = np.flatnonzero(probabilities == kth)[:k - len(above)]
+            keep = np.concatenate([above, ties])
+            candidates, probabilities = candidates[keep], probabilities[keep]
+        elif k <= 0:
+            candidates, probabilities = candidates[:0], probabilities[:0]
+
+        order = np.lexsort((self.rows[candidates], -probabilities))
+        result = self.table.iloc[candidates[order]].reset_index(drop=True)
+        result.insert(0, 'rank', np.arange(1, len(result) + 1))
+        result.insert(3, 'risk_level', scoring.risk_levels_from_proba(result['dropout_probability'].to_numpy()))
+        return result
+
+    # Ringkasan seleksi: jumlah mahasiswa, diprediksi dropout, risiko tinggi
+    def summary(self, filters=None, min_probability=None):
+        mask = self.mask(filters, min_probability)
+        probabilities = self.probabilities if mask is None else self.probabilities[mask]
+        return {
+            'students': len(probabilities),
+            'dropout': int(np.count_nonzero(probabilities > scoring.DROPOUT_THRESHOLD)),
+            'high_risk': int(np.count_nonzero(probabilities > scoring.HIGH_RISK_THRESHOLD))
+        }
+
+
+# Lokasi cache tabel terskor: <direktori sumber>/.cache/<nama>.scored-<model>.parquet
+def scored_cache_path(path, model_name):
+    base = os.path.splitext(ingest.cache_path(path))[0]
+    return f"{base}.scored-{model_name.lower().replace(' ', '_')}.parquet"
+
+
+def _signature(path, model_name):
+    from model_store import read_manifest
+
+    stat = os.stat(path)
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'model_sha256': read_manifest()['models'][model_name]['sha256']
+    }
+
+
+def _cached_signature(parquet_path):
+    import pyarrow.parquet as pq
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    raw = metadata.get(b'cohort')
+    return json.loads(raw) if raw else None
+
+
+def _write_cache(table, target, signature):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+    metadata = dict(arrow_table.schema.metadata or {})
+    metadata[b'cohort'] = json.dumps(signature).encode('utf-8')
+    arrow_table = arrow_table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + '.tmp'
+    pq.write_table(arrow_table, tmp)
+    os.replace(tmp, target)
+
+
+# Fungsi untuk membaca argumen --filter KOLOM=NILAI[,NILAI...]
+def parse_filters(items):
+    filters = {}
+    for item in items or []:
+        column, _, values = item.partition('=')
+        if column not in FILTER_COLUMNS or not values:
+            raise ValueError(f"Filter tidak valid: {item} (kolom: {', '.join(FILTER_COLUMNS)})")
+        filters.setdefault(column, []).extend(int(value) for value in values.split(','))
+    return filters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='File kohort (CSV pemisah ; atau Parquet)')
+    parser.add_argument('-o', '--output', help='File CSV hasil (default: stdout)')
+    parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    parser.add_argument('--filter', action='append', metavar='KOLOM=NILAI[,NILAI]',
+                        help='Filter kolom, dapat diulang (mis. Course=9254 Debtor=1)')
+    parser.add_argument('--min-probability', type=float, default=None)
+    parser.add_argument('--top', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    try:
+        filters = parse_filters(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    scored = ScoredCohort.load(args.input, args.model)
+    loaded = time.perf_counter()
+    result = scored.top_k(args.top, filters, args.min_probability)
+    summary = scored.summary(filters, args.min_probability)
+    queried = time.perf_counter()
+
+    result.to_csv(args.output or sys.stdout, sep=';', index=False)
+    print(f"{summary['students']:,} dari {len(scored):,} mahasiswa sesuai filter "
+          f"({summary['dropout']:,} diprediksi dropout), {len(result):,} ditampilkan; "
+          f"tabel dimuat {loaded - start:.2f} s, kueri {(queried - loaded) * 1e3:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Pencarian counterfactual: perubahan minimal agar risiko dropout turun.
+
+Untuk setiap mahasiswa yang diprediksi dropout dicari kombinasi perubahan
+fitur yang dapat diintervensi (ACTIONABLE_FEATURES) dengan biaya terkecil yang
+membuat probabilitas dropout di bawah target. Semua kandidat (lattice langkah
+per fitur) diurutkan menurut biaya dan dievaluasi per tingkat biaya untuk
+seluruh kohort sekaligus: setiap batch berisi pasangan (mahasiswa, kandidat)
+dan diskor dengan satu kali predict_proba.
+
+Pemangkasan:
+- kandidat yang tidak mungkin atau tidak mengubah apa pun untuk mahasiswa
+  tersebut (unit melebihi unit yang diambil, flag sudah bernilai target)
+  tidak diskor;
+- mahasiswa yang sudah ditemukan solusinya keluar dari pencarian, kandidat
+  berbiaya lebih tinggi tidak dievaluasi lagi;
+- pencarian berhenti saat batas waktu habis (ukuran batch disesuaikan dengan
+  throughput yang terukur agar batch terakhir tidak melewati batas). Karena
+  tingkat biaya diproses dari yang termurah untuk semua mahasiswa, solusi murah
+  ditemukan lebih dulu dan sisa mahasiswa ditandai 'waktu_habis'.
+
+    python -m counterfactual Data/students_performance.csv -o counterfactual.csv --target 0.3
+"""
+import argparse
+import itertools
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import scoring
+
+# Fitur yang dapat diintervensi. kind:
+# - 'increase': dinaikkan `step` per langkah, maksimal `max_steps` langkah dan
+#   tidak melebihi `upper` atau nilai kolom `upper_field`
+# - 'set': diubah ke `target` (satu langkah)
+# cost adalah biaya per langkah; biaya kandidat = jumlah biaya semua langkah.
+ACTIONABLE_FEATURES = {
+    'Curricular_units_2nd_sem_approved': {
+        'label': 'Unit Disetujui Semester 2', 'kind': 'increase', 'step': 1, 'max_steps': 6, 'cost': 1.0,
+        'upper_field': 'Curricular_units_2nd_sem_enrolled'
+    },
+    'Curricular_units_2nd_sem_grade': {
+        'label': 'Nilai Rata-rata Semester 2', 'kind': 'increase', 'step': 1.0, 'max_steps': 5, 'cost': 0.5,
+        'upper': 20.0
+    },
+    'Tuition_fees_up_to_date': {'label': 'Biaya Kuliah Lunas', 'kind': 'set', 'target': 1, 'cost': 1.0},
+    'Debtor': {'label': 'Memiliki Hutang', 'kind': 'set', 'target': 0, 'cost': 1.0},
+    'Scholarship_holder': {'label': 'Penerima Beasiswa', 'kind': 'set', 'target': 1, 'cost': 2.0}
+}
+
+DEFAULT_TARGET = scoring.DROPOUT_THRESHOLD
+DEFAULT_BUDGET = 10.0
+# Jumlah baris (mahasiswa x kandidat) per panggilan predict_proba
+DEFAULT_BATCH_ROWS = 50000
+
+RESULT_COLUMNS = ['row', 'dropout_probability', 'status', 'cost', 'counterfactual_probability', 'changes']
+
+
+# Fungsi untuk membuat lattice kandidat: matriks langkah (kandidat x fitur) dan
+# biayanya, diurutkan dari biaya terkecil (lalu jumlah fitur yang diubah)
+def candidate_lattice(features=None):
+    features = list(ACTIONABLE_FEATURES) if features is None else list(features)
+    levels = [
+        range(ACTIONABLE_FEATURES[f]['max_steps'] + 1) if ACTIONABLE_FEATURES[f]['kind'] == 'increase' else range(2)
+        for f in features
+    ]
+    steps = np.array(list(itertools.product(*levels)), dtype=np.int64)[1:]
+    unit_costs = np.array([ACTIONABLE_FEATURES[f]['cost'] for f in features])
+    costs = steps @ unit_costs
+    order = np.lexsort(((steps > 0).sum(axis=1), costs))
+    return steps[order], costs[order]
+
+
+# Jumlah langkah maksimum per mahasiswa per fitur (0 = fitur tidak dapat diubah)
+def _max_steps(X, features):
+    limits = np.zeros((len(X), len(features)), dtype=np.int64)
+    for j, feature in enumerate(features):
+        spec = ACTIONABLE_FEATURES[feature]
+        values = X[feature].to_numpy(dtype=float)
+        if spec['kind'] == 'set':
+            limits[:, j] = values != spec['target']
+            continue
+        upper = X[spec['upper_field']].to_numpy(dtype=float) if 'upper_field' in spec else spec['upper']
+        room = np.floor((upper - values) / spec['step'] + 1e-9)
+        limits[:, j] = np.clip(room, 0, spec['max_steps'])
+    return limits
+
+
+# Fungsi untuk menerapkan langkah kandidat ke baris mahasiswa (fitur turunan dihitung ulang)
+def apply_steps(X, steps, features):
+    X = X.copy()
+    for j, feature in enumerate(features):
+        spec = ACTIONABLE_FEATURES[feature]
+        if spec['kind'] == 'increase':
+            X[feature] = X[feature].to_numpy(dtype=float) + steps[:, j] * spec['step']
+        else:
+            X[feature] = np.where(steps[:, j] > 0, spec['target'], X[feature].to_numpy())
+    return scoring.add_derived_features(X)
+
+
+# Fungsi untuk menuliskan perubahan, mis. 'Unit Disetujui Semester 2: 3 → 5'
+def describe_changes(values, steps, features):
+    changes = []
+    for value, n_steps, feature in zip(values, steps, features):
+        if n_steps == 0:
+            continue
+        spec = ACTIONABLE_FEATURES[feature]
+        new_value = value + n_steps * spec['step'] if spec['kind'] == 'increase' else spec['target']
+        changes.append(f"{spec['label']}: {value:g} → {new_value:g}")
+    return '; '.join(changes)
+
+
+# Fungsi untuk membagi lattice menjadi tingkat biaya (indeks awal dan akhir)
+def _cost_tiers(costs):
+    bounds = np.flatnonzero(np.diff(costs)) + 1
+    return list(zip(np.r_[0, bounds], np.r_[bounds, len(costs)]))
+
+
+# Fungsi utama: pencarian counterfactual untuk mahasiswa dengan probabilitas
+# > threshold (sama dengan scoring.labels_from_proba). Probabilitas yang sudah
+# dihitung dapat diberikan lewat `probabilities`. Mengembalikan (DataFrame hasil per mahasiswa, ringkasan).
+def search(model, cohort, target=DEFAULT_TARGET, budget=DEFAULT_BUDGET, threshold=scoring.DROPOUT_THRESHOLD,
+           features=None, batch_rows=DEFAULT_BATCH_ROWS, probabilities=None):
+    start = time.perf_counter()
+    deadline = start + budget
+    features = list(ACTIONABLE_FEATURES) if features is None else list(features)
+    if target > threshold:
+        raise ValueError(f"Target {target} harus <= ambang prediksi dropout {threshold}")
+
+    cohort = scoring.add_derived_features(cohort)
+    if probabilities is None:
+        probabilities = scoring.predict_proba_batch(model, cohort)
+    probabilities = np.asarray(probabilities, dtype=float)
+    flagged = np.flatnonzero(probabilities > threshold)
+    X = scoring.select_model_features(model, cohort).iloc[flagged].reset_index(drop=True)
+    missing = [f for f in features if f not in X.columns]
+    if missing:
+        raise ValueError(f"Fitur counterfactual tidak dipakai model: {', '.join(missing)}")
+
+    steps, costs = candidate_lattice(features)
+    limits = _max_steps(X, features)
+    n = len(X)
+    best_candidate = np.full(n, -1)
+    best_probability = np.full(n, np.nan)
+    active = np.arange(n)
+    tiers = _cost_tiers(costs)
+    scored = batches = 0
+
+    # Batch pertama kecil untuk mengukur throughput; batch berikutnya dibatasi
+    # agar selesai sebelum batas waktu
+    limit = max(batch_rows // 10, 1)
+    t = 0
+    while t < len(tiers) and len(active) and time.perf_counter() < deadline:
+        # Kumpulkan tingkat biaya sampai batch cukup besar (pasangan yang tidak mungkin dipangkas)
+        pairs_student, pairs_candidate = [], []
+        rows = 0
+        while t < len(tiers) and rows < limit:
+            lo, hi = tiers[t]
+            feasible = (steps[None, lo:hi] <= limits[active, None]).all(axis=2)
+            s, c = np.nonzero(feasible)
+            pairs_student.append(active[s])
+            pairs_candidate.append(c + lo)
+            rows += len(s)
+            t += 1
+        student = np.concatenate(pairs_student)
+        candidate = np.concatenate(pairs_candidate)
+        if not len(student):
+            continue
+
+        batch_start = time.perf_counter()
+        batch = apply_steps(X.iloc[student].reset_index(drop=True), steps[candidate], features)
+        batch_probability = scoring.predict_proba_batch(model, batch)
+        scored += len(student)
+        batches += 1
+        now = time.perf_counter()
+        rate = len(student) / max(now - batch_start, 1e-9)
+        limit = int(min(batch_rows, max(rate * (deadline - now), 1)))
+
+        # Per mahasiswa: kandidat berhasil dengan biaya terkecil, lalu probabilitas terkecil
+        success = np.flatnonzero(batch_probability < target)
+        order = success[np.lexsort((batch_probability[success], costs[candidate[success]], student[success]))]
+        resolved, first = np.unique(student[order], return_index=True)
+        best_candidate[resolved] = candidate[order[first]]
+        best_probability[resolved] = batch_probability[order[first]]
+        active = active[~np.isin(active, resolved)]
+
+    found = best_candidate >= 0
+    status = np.where(found, 'ditemukan', 'tidak_ditemukan').astype(object)
+    if t < len(tiers):
+        status[active] = 'waktu_habis'
+
+    values = X[features].to_numpy(dtype=float)
+    result = pd.DataFrame({
+        'row': flagged,
+        'dropout_probability': probabilities[flagged],
+        'status': status,
+        'cost': np.where(found, costs[best_candidate], np.nan),
+        'counterfactual_probability': best_probability,
+        'changes': [
+            describe_changes(values[i], steps[best_candidate[i]], features) if found[i] else ''
+            for i in range(n)
+        ]
+    }, columns=RESULT_COLUMNS)
+    result = result.sort_values('dropout_probability', ascending=False, kind='stable').reset_index(drop=True)
+
+    summary = {
+        'students': len(cohort),
+        'flagged': n,
+        'found': int(found.sum()),
+        'not_found': int((status == 'tidak_ditemukan').sum()),
+        'timeout': int((status == 'waktu_habis').sum()),
+        'candidates_scored': scored,
+        'batches': batches,
+        'seconds': time.perf_counter() - start
+    }
+    return result, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m counterfactual', description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='CSV kohort (pemisah ;)')
+    parser.add_argument('-o', '--output', help='File CSV hasil (default: stdout)')
+    parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    parser.add_argument('--engine', default='sklearn', choices=['sklearn', 'compiled'])
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET,
+                        help='Probabilitas dropout yang harus dicapai (default: %(default)s)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help='Batas waktu pencarian dalam detik (default: %(default)s)')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.engine == 'compiled':
+        from model_store import load_compiled
+        model = load_compiled(args.model)
+    else:
+        model = scoring.load_model(args.model)
+    cohort = scoring.read_cohort(args.input)
+    result, summary = search(model, cohort, target=args.target, budget=args.budget, batch_rows=args.batch_rows)
+    result.to_csv(args.output or sys.stdout, sep=';', index=False)
+
+    print(f"{summary['flagged']:,} dari {summary['students']:,} mahasiswa berisiko: "
+          f"{summary['found']:,} ditemukan, {summary['not_found']:,} tidak ditemukan, "
+          f"{summary['timeout']:,} waktu habis ({summary['candidates_scored']:,} kandidat, "
+          f"{summary['batches']} batch, {summary['seconds']:.2f} s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
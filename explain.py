@@ -0,0 +1,454 @@
+"""Penjelasan prediksi per mahasiswa dengan TreeSHAP eksak.
+
+Kontribusi setiap fitur dihitung langsung dari struktur tree yang sudah
+dilatih (Decision Tree, Random Forest, Gradient Boosting, Hist Gradient
+Boosting) dengan algoritma TreeSHAP (Lundberg dkk.) dalam waktu polinomial
+O(tree x daun x kedalaman^2), tanpa sampling.
+
+Tree dikompilasi lewat tree_engine (skala StandardScaler dilipat ke threshold).
+Dua cara perhitungan, hasilnya identik:
+- tree dangkal (Decision Tree, Gradient Boosting): untuk setiap daun, kontribusi
+  semua kombinasi "mahasiswa memenuhi/tidak memenuhi" fitur di jalurnya
+  dihitung sekali saat inisialisasi (Fast TreeSHAP v2), sehingga menjelaskan
+  satu mahasiswa cukup berupa perbandingan split dan lookup tabel;
+- tree dalam (Random Forest): seluruh tree ditelusuri per level sekaligus dan
+  setiap operasi jalur (extend/unwind) divektorisasi untuk seluruh mahasiswa
+  dalam satu batch.
+
+Satuan kontribusi mengikuti keluaran model:
+- Decision Tree/Random Forest: probabilitas dropout;
+- Gradient Boosting/Hist Gradient Boosting: log-odds dropout.
+Untuk setiap mahasiswa berlaku expected_value + jumlah kontribusi = keluaran
+model tersebut.
+
+    python -m explain Data/students_performance.csv -o kontribusi.csv
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import scoring
+from tree_engine import compile_pipeline
+
+# Batas elemen array jalur (posisi x node x mahasiswa) per potongan mahasiswa
+_CHUNK_ELEMENTS = 1 << 22
+
+# Batas ukuran tabel kontribusi per daun (daun x 2^panjang jalur x panjang jalur);
+# model yang lebih besar memakai penelusuran per level
+TABLE_MAX_ELEMENTS = 1 << 23
+
+
+# Fungsi untuk mengambil bobot (cover) setiap node, urutannya sama dengan
+# array node datar hasil compile_pipeline
+def _node_cover(classifier):
+    classifier_name = type(classifier).__name__
+    if classifier_name == 'DecisionTreeClassifier':
+        estimators = [classifier]
+    elif classifier_name == 'RandomForestClassifier':
+        estimators = list(classifier.estimators_)
+    elif classifier_name == 'GradientBoostingClassifier':
+        estimators = list(classifier.estimators_[:, 0])
+    elif classifier_name == 'HistGradientBoostingClassifier':
+        return np.concatenate([predictor.nodes['count'] for (predictor,) in classifier._predictors]).astype(np.float64)
+    else:
+        raise ValueError(f"Model '{classifier_name}' belum didukung oleh explain")
+    return np.concatenate([estimator.tree_.weighted_n_node_samples for estimator in estimators])
+
+
+class TreeExplainer:
+    """Kontribusi fitur (nilai SHAP) eksak untuk pipeline tree sklearn."""
+
+    def __init__(self, pipeline):
+        self.model = compile_pipeline(pipeline)
+        self.cover = _node_cover(pipeline.named_steps['classifier'])
+        if len(self.cover) != len(self.model.left):
+            raise ValueError("Jumlah node cover tidak sama dengan model terkompilasi")
+
+        model = self.model
+        self.columns = model.columns
+        self.output = 'probability' if model.kind == 'mean' else 'log_odds'
+        # Random Forest merata-ratakan tree, boosting menjumlahkannya
+        self._tree_scale = 1.0 / model.n_trees if model.kind == 'mean' else 1.0
+        self._capacity = model.max_depth + 1
+        self._max_width = int(np.bincount(model.depth).max())
+
+        # Nilai harapan: rata-rata daun berbobot cover, dijumlahkan per tree
+        tree_of_node = np.searchsorted(model.roots, np.arange(len(model.left)), side='right') - 1
+        leaves = np.flatnonzero(model.is_leaf)
+        root_cover = self.cover[model.roots[tree_of_node[leaves]]]
+        expected = np.sum(model.leaf_value[leaves] * self.cover[leaves] / root_cover)
+        self.expected_value = float(model.init_raw + expected * self._tree_scale)
+
+        self._tables = self._build_tables()
+        self.method = 'table' if self._tables is not None else 'path'
+
+    # Keluaran model dalam satuan kontribusi (probabilitas atau log-odds)
+    def model_output(self, X):
+        values = self.model.leaf_values(X)
+        if self.model.kind == 'mean':
+            return values.mean(axis=1)
+        return self.model.init_raw + values.sum(axis=1)
+
+    # Fungsi untuk menghitung kontribusi fitur, hasil berukuran (baris, fitur)
+    def shap_values(self, X):
+        X = self.model.to_matrix(X)
+        if self._tables is not None:
+            tables = self._tables
+            explain_chunk = self._table_chunk
+            rows_per_chunk = _CHUNK_ELEMENTS // max(len(tables['edge_feature']), tables['table'].shape[1] * len(tables['leaf']))
+        else:
+            explain_chunk = self._shap_chunk
+            rows_per_chunk = _CHUNK_ELEMENTS // (self._max_width * self._capacity)
+        rows_per_chunk = max(1, rows_per_chunk)
+
+        values = np.empty((len(X), len(self.columns)))
+        for start in range(0, len(X), rows_per_chunk):
+            values[start:start + rows_per_chunk] = explain_chunk(X[start:start + rows_per_chunk])
+        return values
+
+    # Jalur unik setiap daun: fitur (urutan kemunculan pertama), zero fraction
+    # gabungan per fitur dan daftar split (edge) beserta posisi fiturnya
+    def _leaf_paths(self):
+        model = self.model
+        paths = []
+        for root in model.roots:
+            stack = [(root, [], [], [])]
+            while stack:
+                node, features, zeros, edges = stack.pop()
+                if model.is_leaf[node]:
+                    if features:
+                        paths.append((node, features, zeros, edges))
+                    continue
+                split = model.feature[node]
+                for child, go_left in ((model.left[node], True), (model.right[node], False)):
+                    ratio = self.cover[child] / self.cover[node]
+                    if split in features:
+                        position = features.index(split)
+                        child_features, child_zeros = features, list(zeros)
+                        child_zeros[position] *= ratio
+                    else:
+                        position = len(features)
+                        child_features, child_zeros = features + [split], zeros + [ratio]
+                    stack.append((child, child_features, child_zeros, edges + [(node, go_left, position)]))
+        return paths
+
+    # Tabel kontribusi per daun untuk semua pola "memenuhi split" (bit ke-p
+    # untuk fitur ke-p di jalur). None jika tabel melebihi TABLE_MAX_ELEMENTS.
+    def _build_tables(self):
+        model = self.model
+        # Panjang jalur unik tidak melebihi kedalaman tree
+        if model.max_depth > 16:
+            return None
+        paths = self._leaf_paths()
+        if not paths:
+            return None
+        max_length = max(len(features) for _, features, _, _ in paths)
+        n_patterns = 1 << max_length
+        if len(paths) * n_patterns * max_length > TABLE_MAX_ELEMENTS:
+            return None
+
+        table = np.zeros((len(paths), n_patterns, max_length))
+        table_feature = np.zeros((len(paths), max_length), dtype=np.intp)
+        lengths = np.array([len(features) for _, features, _, _ in paths])
+        leaf_value = model.leaf_value[[node for node, _, _, _ in paths]] * self._tree_scale
+
+        for length in np.unique(lengths):
+            group = np.flatnonzero(lengths == length)
+            patterns = np.arange(1 << length)
+            rows_per_chunk = max(1, _CHUNK_ELEMENTS // ((length + 1) * len(patterns)))
+            for start in range(0, len(group), rows_per_chunk):
+                leaves = group[start:start + rows_per_chunk]
+                n_items = len(leaves)
+                depth = np.zeros(n_items, dtype=np.intp)
+                feature = np.full((length + 1, n_items), -1, dtype=np.intp)
+                zero = np.zeros((length + 1, n_items))
+                one = np.zeros((length + 1, n_items, len(patterns)))
+                weight = np.zeros((length + 1, n_items, len(patterns)))
+                zero[0] = one[0] = weight[0] = 1.0
+
+                for p in range(length):
+                    split = np.array([paths[i][1][p] for i in leaves])
+                    new_zero = np.array([paths[i][2][p] for i in leaves])
+                    new_one = np.broadcast_to(((patterns >> p) & 1).astype(np.float64), (n_items, len(patterns)))
+                    depth, feature, zero, one, weight = _extend(
+                        depth, feature, zero, one, weight, split, new_zero, new_one
+                    )
+
+                position, item, contribution = _leaf_contributions(depth, zero, one, weight)
+                contribution *= leaf_value[leaves][item][:, None]
+                table[leaves[item], :len(patterns), position - 1] = contribution
+                table_feature[leaves[item], position - 1] = feature[position, item]
+
+        edges = [(leaf, node, go_left, position)
+                 for leaf, (_, _, _, leaf_edges) in enumerate(paths)
+                 for node, go_left, position in leaf_edges]
+        edge_leaf, edge_node, edge_go_left, edge_position = (np.array(column) for column in zip(*edges))
+
+        # Urutan kolom tabel (daun x posisi) dikelompokkan per fitur untuk reduceat
+        valid = np.arange(max_length)[None, :] < lengths[:, None]
+        flat_index = np.flatnonzero(valid.ravel())
+        order = flat_index[np.argsort(table_feature.ravel()[flat_index], kind='stable')]
+        sorted_feature = table_feature.ravel()[order]
+        starts = np.flatnonzero(np.r_[True, sorted_feature[1:] != sorted_feature[:-1]])
+
+        return {
+            'leaf': np.arange(len(paths)),
+            'table': table.reshape(len(paths) * n_patterns, max_length),
+            'n_patterns': n_patterns,
+            'full_pattern': (1 << lengths) - 1,
+            'edge_start': np.flatnonzero(np.r_[True, edge_leaf[1:] != edge_leaf[:-1]]),
+            'edge_feature': model.feature[edge_node],
+            'edge_threshold': model.threshold[edge_node],
+            'edge_missing_left': model.missing_left[edge_node],
+            'edge_go_left': edge_go_left.astype(bool),
+            'edge_bit': np.left_shift(1, edge_position).astype(np.int64),
+            'column_order': order,
+            'column_starts': starts,
+            'column_feature': sorted_feature[starts]
+        }
+
+    # Kontribusi lewat tabel: pola setiap daun dari hasil perbandingan split,
+    # lalu nilai tabel dijumlahkan per fitur
+    def _table_chunk(self, X):
+        tables = self._tables
+        value = X[:, tables['edge_feature']]
+        go_left = value <= tables['edge_threshold']
+        if np.isnan(value).any():
+            go_left = np.where(np.isnan(value), tables['edge_missing_left'], go_left)
+        failed = np.where(go_left != tables['edge_go_left'], tables['edge_bit'], 0)
+        pattern = tables['full_pattern'] & ~np.bitwise_or.reduceat(failed, tables['edge_start'], axis=1)
+
+        rows = tables['table'][tables['leaf'] * tables['n_patterns'] + pattern]
+        rows = rows.reshape(len(X), -1)[:, tables['column_order']]
+        phi = np.zeros((len(X), len(self.columns)))
+        phi[:, tables['column_feature']] = np.add.reduceat(rows, tables['column_starts'], axis=1)
+        return phi
+
+    # Kontribusi sebagai DataFrame dengan nama kolom fitur
+    def explain(self, X):
+        index = X.index if hasattr(X, 'index') else None
+        return pd.DataFrame(self.shap_values(X), columns=self.columns, index=index)
+
+    # TreeSHAP per level. Setiap item frontier adalah satu node beserta jalur
+    # unik dari akar: fitur, zero fraction (rasio cover) dan one fraction
+    # (apakah mahasiswa melewati cabang ini). Array jalur berbentuk
+    # (posisi, item) atau (posisi, item, mahasiswa).
+    def _shap_chunk(self, X):
+        model = self.model
+        n_rows = len(X)
+        has_nan = bool(np.isnan(X).any())
+        phi = np.zeros((len(self.columns), n_rows))
+
+        node = model.roots.copy()
+        n_items = len(node)
+        depth = np.zeros(n_items, dtype=np.intp)
+        feature = np.full((1, n_items), -1, dtype=np.intp)
+        zero = np.zeros((1, n_items))
+        one = np.zeros((1, n_items, n_rows))
+        weight = np.zeros((1, n_items, n_rows))
+        # Elemen awal jalur (tanpa fitur)
+        zero[0] = 1.0
+        one[0] = 1.0
+        weight[0] = 1.0
+
+        while len(node):
+            leaf = model.is_leaf[node]
+            if leaf.any():
+                self._add_leaf_contributions(
+                    phi, node[leaf], depth[leaf], feature[:, leaf], zero[:, leaf],
+                    one[:, leaf], weight[:, leaf]
+                )
+                internal = ~leaf
+                node, depth = node[internal], depth[internal]
+                feature, zero = feature[:, internal], zero[:, internal]
+                one, weight = one[:, internal], weight[:, internal]
+            if not len(node):
+                break
+
+            items = np.arange(len(node))
+            split = model.feature[node]
+
+            # Fitur yang sudah ada di jalur dikeluarkan dulu (unwind), fraksinya
+            # digabung ke cabang berikutnya
+            match = feature == split
+            duplicate = match.any(axis=0)
+            position = match.argmax(axis=0)
+            incoming_zero = np.where(duplicate, zero[position, items], 1.0)
+            incoming_one = np.where(duplicate[:, None], one[position, items], 1.0)
+            if duplicate.any():
+                dup = np.flatnonzero(duplicate)
+                (depth[dup], feature[:, dup], zero[:, dup],
+                 one[:, dup], weight[:, dup]) = _unwind(
+                    depth[dup], feature[:, dup], zero[:, dup], one[:, dup],
+                    weight[:, dup], position[dup]
+                )
+
+            value = X[:, split].T
+            go_left = value <= model.threshold[node][:, None]
+            if has_nan:
+                missing = np.isnan(value)
+                go_left = np.where(missing, model.missing_left[node][:, None], go_left)
+
+            left, right = model.left[node], model.right[node]
+            parent_cover = self.cover[node]
+            node = np.concatenate([left, right])
+            depth, split = np.tile(depth, 2), np.tile(split, 2)
+            feature, zero = np.tile(feature, 2), np.tile(zero, 2)
+            one, weight = np.tile(one, (1, 2, 1)), np.tile(weight, (1, 2, 1))
+            new_zero = np.concatenate([incoming_zero * self.cover[left] / parent_cover,
+                                       incoming_zero * self.cover[right] / parent_cover])
+            new_one = np.concatenate([incoming_one * go_left, incoming_one * ~go_left])
+            depth, feature, zero, one, weight = _extend(
+                depth, feature, zero, one, weight, split, new_zero, new_one
+            )
+
+        return phi.T
+
+    # Kontribusi daun dijumlahkan per fitur
+    def _add_leaf_contributions(self, phi, node, depth, feature, zero, one, weight):
+        position, item, contribution = _leaf_contributions(depth, zero, one, weight)
+        contribution *= (self.model.leaf_value[node] * self._tree_scale)[item][:, None]
+
+        feature_ids = feature[position, item]
+        order = np.argsort(feature_ids, kind='stable')
+        feature_ids = feature_ids[order]
+        starts = np.flatnonzero(np.r_[True, feature_ids[1:] != feature_ids[:-1]])
+        phi[feature_ids[starts]] += np.add.reduceat(contribution[order], starts, axis=0)
+
+
+# Kontribusi daun (sebelum dikali nilai daun): untuk setiap elemen jalur, jumlah
+# bobot jalur setelah elemen itu dikeluarkan (unwound sum) dikali (one - zero).
+# Mengembalikan (posisi, item, kontribusi per mahasiswa) untuk posisi 1..l.
+def _leaf_contributions(depth, zero, one, weight):
+    size = int(depth.max()) + 1
+    zero, one, weight = zero[:size], one[:size], weight[:size]
+    items = np.arange(len(depth))
+    length = depth.astype(np.float64)
+
+    # Elemen dengan one = 0: bentuk tertutup sum_j w_j (l+1) / (z (l-j))
+    zero_sum = np.zeros(weight.shape[1:])
+    # Elemen dengan one = 1: rekurensi dari posisi terakhir ke posisi 0
+    one_sum = np.zeros(weight.shape)
+    carry = np.broadcast_to(weight[depth, items], weight.shape).copy()
+    for j in range(int(depth.max()) - 1, -1, -1):
+        active = (j < depth)[:, None]
+        w_j = weight[j]
+        zero_sum += np.where(active, w_j * ((length + 1) / np.maximum(length - j, 1))[:, None], 0.0)
+        term = carry * ((length + 1) / (j + 1))[None, :, None]
+        one_sum += np.where(active, term, 0.0)
+        next_carry = w_j - term * (zero * ((length - j) / (length + 1)))[:, :, None]
+        carry = np.where(active, next_carry, carry)
+
+    # Hanya posisi 1..l yang berisi fitur (posisi 0 adalah elemen awal)
+    positions = np.arange(weight.shape[0])[:, None]
+    position, item = np.nonzero((positions >= 1) & (positions <= depth))
+    one_valid = one[position, item]
+    zero_valid = zero[position, item][:, None]
+    unwound = np.where(one_valid > 0, one_sum[position, item], zero_sum[item] / zero_valid)
+    return position, item, unwound * (one_valid - zero_valid)
+
+
+# Extend: tambahkan elemen (fitur, zero, one) di akhir jalur setiap item dan
+# perbarui bobot permutasi semua posisi sekaligus
+def _extend(depth, feature, zero, one, weight, split, new_zero, new_one):
+    items = np.arange(len(depth))
+    length = depth + 1
+    # Array jalur hanya sepanjang jalur terpanjang saat ini
+    if length.max() >= feature.shape[0]:
+        feature = np.concatenate([feature, np.full((1,) + feature.shape[1:], -1, dtype=feature.dtype)])
+        zero, one, weight = (np.concatenate([array, np.zeros((1,) + array.shape[1:])])
+                             for array in (zero, one, weight))
+    feature[length, items] = split
+    zero[length, items] = new_zero
+    one[length, items] = new_one
+
+    positions = np.arange(weight.shape[0])[:, None]
+    lf = length.astype(np.float64)
+    shifted = np.zeros_like(weight)
+    shifted[1:] = weight[:-1]
+    weight = (weight * (new_zero * (lf - positions) / (lf + 1))[:, :, None]
+              + shifted * new_one[None] * (positions / (lf + 1))[:, :, None])
+    return length, feature, zero, one, weight
+
+
+# Unwind: keluarkan elemen di `position` dari jalur setiap item (kebalikan extend)
+def _unwind(depth, feature, zero, one, weight, position):
+    items = np.arange(len(depth))
+    length = depth.astype(np.float64)
+    z = zero[position, items]
+    o = one[position, items]
+    carry = weight[depth, items]
+
+    for j in range(int(depth.max()) - 1, -1, -1):
+        active = (j < depth)[:, None]
+        w_j = weight[j].copy()
+        from_one = carry * ((length + 1) / (j + 1))[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            from_zero = w_j * ((length + 1) / (z * np.maximum(length - j, 1)))[:, None]
+        weight[j] = np.where(active, np.where(o > 0, from_one, from_zero), w_j)
+        next_carry = w_j - from_one * (z * (length - j) / (length + 1))[:, None]
+        carry = np.where(active, next_carry, carry)
+    weight[depth, items] = 0.0
+
+    # Geser elemen setelah `position` satu posisi ke depan
+    positions = np.arange(feature.shape[0])[:, None]
+    source = np.minimum(positions + (positions >= position), feature.shape[0] - 1)
+    feature = np.take_along_axis(feature, source, axis=0)
+    zero = np.take_along_axis(zero, source, axis=0)
+    one = np.take_along_axis(one, source[:, :, None], axis=0)
+    feature[depth, items] = -1
+    zero[depth, items] = 0.0
+    one[depth, items] = 0.0
+    return depth - 1, feature, zero, one, weight
+
+
+# Fungsi untuk mengambil fitur dengan kontribusi terbesar (absolut) untuk satu mahasiswa
+def top_contributions(explainer, features, top=10):
+    contributions = explainer.shap_values(features)[0]
+    frame = pd.DataFrame({
+        'Fitur': explainer.columns,
+        'Nilai': [features[col] for col in explainer.columns],
+        'Kontribusi': contributions
+    })
+    order = np.argsort(-np.abs(contributions), kind='stable')[:top]
+    return frame.iloc[order].reset_index(drop=True)
+
+
+# Selisih maksimum expected_value + jumlah kontribusi terhadap keluaran model
+def additivity_error(explainer, X, values=None):
+    values = explainer.shap_values(X) if values is None else values
+    return float(np.max(np.abs(explainer.expected_value + values.sum(axis=1) - explainer.model_output(X))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m explain', description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='CSV kohort (pemisah ;)')
+    parser.add_argument('-o', '--output', help='File CSV hasil (default: stdout)')
+    parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    explainer = TreeExplainer(scoring.load_model(args.model))
+    cohort = scoring.add_derived_features(scoring.read_cohort(args.input))
+    missing = scoring.missing_input_columns(explainer.model, cohort)
+    if missing:
+        parser.error(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    values = explainer.shap_values(cohort)
+    result = pd.DataFrame(values, columns=explainer.columns)
+    result.insert(0, 'row', np.arange(len(cohort)))
+    result.insert(1, 'expected_value', explainer.expected_value)
+    result.to_csv(args.output or sys.stdout, sep=';', index=False)
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(cohort):,} mahasiswa dijelaskan ({args.model}, {explainer.output}) "
+          f"dalam {elapsed:.2f} s, selisih aditivitas maks "
+          f"{additivity_error(explainer, cohort, values):.1e}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,507 @@
+"""Antrian job latar belakang (SQLite) untuk skoring kohort dan pelatihan ulang.
+
+Aplikasi hanya menambahkan job ke tabel SQLite; skoring dan pelatihan
+dijalankan oleh proses worker terpisah, sehingga script Streamlit tidak
+terblokir. Worker melaporkan progres, hasil sementara (ringkasan dan
+pratinjau mahasiswa berisiko tertinggi) dan checkpoint ke tabel yang sama.
+
+Job tetap tersimpan saat aplikasi atau worker di-restart. Job berstatus
+'berjalan' yang heartbeat-nya berhenti (worker mati) dikembalikan ke antrian;
+job skoring dilanjutkan dari checkpoint terakhir (baris yang sudah ditulis
+tidak diskor ulang).
+
+    python -m jobs worker --workers 2
+    python -m jobs submit skoring Data/students_performance.csv
+    python -m jobs submit latih --search halving
+    python -m jobs status
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+import numpy as np
+
+import model_store
+import scoring
+
+DEFAULT_PATH = os.environ.get('JOBS_DB_PATH', os.path.join('Data', '.cache', 'jobs.sqlite'))
+SCHEMA_VERSION = 1
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+STATUSES = ['antri', 'berjalan', 'selesai', 'gagal', 'dibatalkan']
+ACTIVE_STATUSES = ('antri', 'berjalan')
+# Detik antar heartbeat worker; job/worker tanpa heartbeat selama STALE_AFTER dianggap mati
+HEARTBEAT_INTERVAL = 5
+STALE_AFTER = 60
+POLL_INTERVAL = 1.0
+# Job yang sudah dicoba sebanyak ini (worker mati berulang kali) ditandai gagal
+MAX_ATTEMPTS = 3
+# Jumlah mahasiswa berisiko tertinggi yang ditampilkan sebagai hasil sementara
+PREVIEW_ROWS = 20
+
+JOB_COLUMNS = ['id', 'kind', 'params', 'status', 'progress', 'message', 'partial', 'checkpoint', 'result',
+               'error', 'worker', 'attempts', 'heartbeat', 'created_at', 'started_at', 'finished_at']
+JSON_COLUMNS = ('params', 'partial', 'checkpoint', 'result')
+
+
+class JobCancelled(Exception):
+    """Job dibatalkan dari aplikasi saat sedang berjalan."""
+
+
+class JobQueue:
+    """Antrian job di file SQLite yang dipakai bersama oleh aplikasi dan worker.
+
+    Setiap proses membuka koneksinya sendiri; mode WAL membuat pembacaan status
+    dari aplikasi tidak menunggu worker yang sedang menulis progres.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.jobs_dir = os.path.join(os.path.dirname(os.path.abspath(path)), 'jobs')
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, params TEXT, "
+                "status TEXT NOT NULL DEFAULT 'antri', progress REAL NOT NULL DEFAULT 0, message TEXT, "
+                "partial TEXT, checkpoint TEXT, result TEXT, error TEXT, worker TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, heartbeat REAL, "
+                "created_at REAL, started_at REAL, finished_at REAL);"
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);"
+                "CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, pid INTEGER, "
+                "heartbeat REAL, started_at REAL);"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, str(job_id))
+
+    def submit(self, kind, params=None):
+        if kind not in HANDLERS:
+            raise ValueError(f"Jenis job tidak dikenal: {kind} (pilihan: {', '.join(HANDLERS)})")
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO jobs (kind, params, created_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(params or {}), time.time())
+            )
+            return cursor.lastrowid
+
+    # Ambil job tertua yang menunggu dan tandai berjalan (atomik antar proses)
+    def claim(self, worker):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_stale()
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'antri' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'berjalan', worker = ?, attempts = attempts + 1, "
+                        "heartbeat = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                        (worker, now, now, row[0])
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return None if row is None else self.get(row[0])
+
+    # Job berjalan tanpa heartbeat dikembalikan ke antrian (checkpoint tetap disimpan)
+    def _requeue_stale(self):
+        deadline = time.time() - STALE_AFTER
+        self._db.execute(
+            "UPDATE jobs SET status = 'gagal', finished_at = ?, "
+            "error = 'Worker berhenti saat menjalankan job ' || attempts || ' kali' "
+            "WHERE status = 'berjalan' AND heartbeat < ? AND attempts >= ?",
+            (time.time(), deadline, MAX_ATTEMPTS)
+        )
+        self._db.execute(
+            "UPDATE jobs SET status = 'antri', worker = NULL, message = 'Dilanjutkan setelah worker berhenti' "
+            "WHERE status = 'berjalan' AND heartbeat < ?", (deadline,)
+        )
+
+    # Laporkan progres; mengembalikan status job terkini (untuk deteksi pembatalan)
+    def report(self, job_id, progress, message=None, partial=None, checkpoint=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET progress = ?, message = COALESCE(?, message), "
+                "partial = COALESCE(?, partial), checkpoint = COALESCE(?, checkpoint), heartbeat = ? "
+                "WHERE id = ?",
+                (float(progress), message, _dumps(partial), _dumps(checkpoint), time.time(), job_id)
+            )
+            return self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def heartbeat(self, job_id=None, worker=None):
+        now = time.time()
+        with self._lock:
+            if job_id is not None:
+                self._db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'berjalan'",
+                                 (now, job_id))
+            if worker is not None:
+                self._db.execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (now, worker))
+
+    def finish(self, job_id, result):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'selesai', progress = 1, result = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'berjalan'", (_dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'gagal', error = ?, finished_at = ? WHERE id = ? AND status = 'berjalan'",
+                (error, time.time(), job_id)
+            )
+
+    # Job yang menunggu langsung dibatalkan; job berjalan berhenti pada laporan progres berikutnya
+    def cancel(self, job_id):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'dibatalkan', finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (time.time(), job_id, *ACTIVE_STATUSES)
+            )
+            return cursor.rowcount > 0
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?",
+                                   (job_id,)).fetchone()
+        return None if row is None else _job_from_row(row)
+
+    def list(self, limit=50):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_job_from_row(row) for row in rows]
+
+    def register_worker(self, worker, pid):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO workers VALUES (?, ?, ?, ?)", (worker, pid, now, now))
+
+    def unregister_worker(self, worker):
+        with self._lock:
+            self._db.execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+    # Worker dengan heartbeat dalam STALE_AFTER detik terakhir; worker di host ini
+    # yang prosesnya sudah tidak ada langsung dihapus
+    def live_workers(self):
+        with self._lock:
+            self._db.execute("DELETE FROM workers WHERE heartbeat < ?", (time.time() - STALE_AFTER,))
+            rows = self._db.execute("SELECT id, pid, heartbeat, started_at FROM workers ORDER BY id").fetchall()
+            dead = [row[0] for row in rows if row[0] == worker_id(row[1]) and not _pid_alive(row[1])]
+            self._db.executemany("DELETE FROM workers WHERE id = ?", [(worker,) for worker in dead])
+        return [dict(zip(['id', 'pid', 'heartbeat', 'started_at'], row)) for row in rows if row[0] not in dead]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _dumps(value):
+    return None if value is None else json.dumps(value, default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _job_from_row(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    for column in JSON_COLUMNS:
+        if job[column] is not None:
+            job[column] = json.loads(job[column])
+    return job
+
+
+class Reporter:
+    """Penghubung handler dengan antrian: progres, hasil sementara dan checkpoint."""
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job = job
+
+    def __call__(self, progress, message=None, partial=None, checkpoint=None):
+        status = self.queue.report(self.job['id'], progress, message, partial, checkpoint)
+        if status == 'dibatalkan':
+            raise JobCancelled(self.job['id'])
+
+
+# Fungsi untuk menghitung jumlah baris data CSV (untuk persentase progres)
+def count_rows(path):
+    newlines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines += block.count(b'\n')
+            last = block[-1:]
+    return max(newlines + (last != b'\n') - 1, 0)
+
+
+# Job skoring: scoring.score_stream per chunk ke file CSV, dengan checkpoint setiap chunk
+def run_scoring(queue, job, report):
+    params = job['params']
+    model_name = params.get('model', scoring.DEFAULT_MODEL)
+    chunksize = int(params.get('chunksize', scoring.DEFAULT_CHUNKSIZE))
+    output = params.get('output') or os.path.join(queue.job_dir(job['id']), 'hasil_skoring.csv')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    checkpoint = job['checkpoint'] or {}
+    total = checkpoint.get('total') or count_rows(params['input'])
+    top_rows = np.asarray(checkpoint.get('top_rows', []), dtype=np.int64)
+    top_probabilities = np.asarray(checkpoint.get('top_probabilities', []), dtype=float)
+    model = scoring.load_model(model_name)
+
+    # Lanjutkan dari checkpoint: buang baris yang ditulis setelah checkpoint terakhir
+    mode = 'r+' if checkpoint and os.path.exists(output) else 'w'
+    with open(output, mode, newline='') as out:
+        if mode == 'r+':
+            out.truncate(checkpoint['output_bytes'])
+            out.seek(checkpoint['output_bytes'])
+        else:
+            checkpoint = {}
+
+        def progress(summary, rows, probabilities):
+            nonlocal top_rows, top_probabilities
+            top_rows, top_probabilities = scoring._merge_top(
+                np.concatenate([top_rows, rows]), np.concatenate([top_probabilities, probabilities]),
+                PREVIEW_ROWS
+            )
+            out.flush()
+            preview = [{'row': int(r), 'dropout_probability': float(p)}
+                       for r, p in zip(top_rows, top_probabilities)]
+            report(
+                summary['students'] / max(total, 1),
+                f"{summary['students']:,} dari {total:,} baris diskor",
+                partial={'summary': dict(summary), 'top': preview},
+                checkpoint={'summary': dict(summary), 'output_bytes': out.tell(), 'total': total,
+                            'top_rows': top_rows.tolist(), 'top_probabilities': top_probabilities.tolist()}
+            )
+
+        summary = scoring.score_stream(model, params['input'], out, chunksize=chunksize,
+                                       progress=progress, resume=checkpoint.get('summary'))
+    return {'output': os.path.abspath(output), 'model': model_name, 'summary': summary}
+
+
+# Fungsi untuk menyalin model, feature_info dan manifest saat ini ke direktori job
+# sebagai titik awal pelatihan inkremental (manifest ditulis ulang ke salinannya)
+def _seed_model_dir(train, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = model_store.read_manifest()
+    paths = [entry['path'] for entry in manifest['models'].values()] + [manifest['feature_info']['path']]
+    for path in paths:
+        shutil.copy2(path, os.path.join(output_dir, os.path.basename(path)))
+    train.write_manifest(output_dir)
+
+
+# Job pelatihan ulang: train.train (penuh) atau train.retrain_incremental. Model
+# hasil pelatihan disimpan di direktori job, bukan models/, agar dapat ditinjau dulu.
+def run_training(queue, job, report):
+    import train
+
+    params = job['params']
+    names = params.get('models')
+    if params.get('incremental'):
+        output_dir = params.get('output_dir')
+        if not output_dir:
+            output_dir = os.path.join(queue.job_dir(job['id']), 'models')
+            _seed_model_dir(train, output_dir)
+        report(0.0, f"Pelatihan inkremental dari {params['incremental']}")
+        result = train.retrain_incremental(params['incremental'], names, int(params.get('add_estimators', 20)),
+                                           output_dir=output_dir)
+    else:
+        output_dir = params.get('output_dir') or os.path.join(queue.job_dir(job['id']), 'models')
+
+        def progress(done, total, stage):
+            label = 'Menghitung importance' if stage == 'importance' else f"Melatih {stage}"
+            report(done / (total + 1), f"{label} ({done + 1}/{total + 1})")
+
+        result = train.train(names, params.get('search', 'grid'), params.get('data', train.DATA_FILE), output_dir,
+                             n_jobs=int(params.get('n_jobs', -1)), progress=progress)
+    return {'output_dir': os.path.abspath(output_dir), 'report': json.loads(_dumps(result))}
+
+
+HANDLERS = {
+    'skoring': run_scoring,
+    'latih': run_training
+}
+
+
+def worker_id(pid=None):
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+# Fungsi untuk menjalankan satu job; heartbeat dikirim dari thread terpisah
+# agar langkah panjang tanpa laporan progres (mis. fit model) tidak dianggap macet
+def run_job(queue, job, worker=None):
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            queue.heartbeat(job['id'], worker)
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        result = HANDLERS[job['kind']](queue, job, Reporter(queue, job))
+        queue.finish(job['id'], result)
+    except JobCancelled:
+        pass
+    except Exception as e:
+        queue.fail(job['id'], f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+    finally:
+        stop.set()
+        thread.join()
+
+
+# Loop worker: ambil job dari antrian sampai dihentikan (atau antrian kosong jika once=True)
+def run_worker(path=DEFAULT_PATH, poll_interval=POLL_INTERVAL, once=False):
+    queue = JobQueue(path)
+    worker = worker_id()
+    queue.register_worker(worker, os.getpid())
+    try:
+        while True:
+            queue.heartbeat(worker=worker)
+            job = queue.claim(worker)
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+            run_job(queue, job, worker)
+    finally:
+        queue.unregister_worker(worker)
+        queue.close()
+
+
+# Fungsi untuk menjalankan worker sebagai proses terpisah yang tetap hidup
+# walaupun aplikasi Streamlit di-restart
+def start_workers(n, path=DEFAULT_PATH):
+    queue = JobQueue(path)
+    log_path = os.path.join(queue.jobs_dir, 'worker.log')
+    os.makedirs(queue.jobs_dir, exist_ok=True)
+    pids = []
+    for _ in range(n):
+        with open(log_path, 'a') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'jobs', '--db', os.path.abspath(path), 'worker'],
+                cwd=ROOT, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        # Didaftarkan segera agar tidak dijalankan dua kali selama worker masih mengimpor modul
+        queue.register_worker(worker_id(process.pid), process.pid)
+        pids.append(process.pid)
+    queue.close()
+    return pids
+
+
+# Pastikan minimal n worker hidup; mengembalikan pid worker yang baru dijalankan
+def ensure_workers(n, path=DEFAULT_PATH):
+    queue = JobQueue(path)
+    missing = n - len(queue.live_workers())
+    queue.close()
+    return start_workers(missing, path) if missing > 0 else []
+
+
+def _print_job(job):
+    elapsed = (job['finished_at'] or time.time()) - job['started_at'] if job['started_at'] else 0.0
+    print(f"#{job['id']:<5} {job['kind']:<8} {job['status']:<11} {job['progress']:>6.1%} "
+          f"{elapsed:>8.1f} s  {job['message'] or ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DEFAULT_PATH, help='File SQLite antrian (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker_parser = subparsers.add_parser('worker', help='Jalankan worker')
+    worker_parser.add_argument('--workers', type=int, default=1, help='Jumlah proses worker')
+    worker_parser.add_argument('--once', action='store_true', help='Berhenti saat antrian kosong')
+
+    submit_parser = subparsers.add_parser('submit', help='Tambahkan job ke antrian')
+    submit_subparsers = submit_parser.add_subparsers(dest='kind', required=True)
+    scoring_parser = submit_subparsers.add_parser('skoring', help='Skor file kohort')
+    scoring_parser.add_argument('input', help='File kohort (CSV pemisah ;)')
+    scoring_parser.add_argument('-o', '--output', help='File CSV hasil (default: direktori job)')
+    scoring_parser.add_argument('--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    scoring_parser.add_argument('--chunksize', type=int, default=scoring.DEFAULT_CHUNKSIZE)
+    training_parser = submit_subparsers.add_parser('latih', help='Latih ulang model')
+    training_parser.add_argument('--models', nargs='+', default=None, choices=list(scoring.ALL_MODEL_FILES))
+    training_parser.add_argument('--search', default='grid', choices=['grid', 'halving', 'random'])
+    training_parser.add_argument('--data', default=None)
+    training_parser.add_argument('--incremental', metavar='CSV', default=None)
+    training_parser.add_argument('--output-dir', default=None)
+
+    status_parser = subparsers.add_parser('status', help='Tampilkan status job')
+    status_parser.add_argument('job_id', nargs='?', type=int)
+    cancel_parser = subparsers.add_parser('cancel', help='Batalkan job')
+    cancel_parser.add_argument('job_id', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        if args.workers == 1:
+            run_worker(args.db, once=args.once)
+            return 0
+        processes = [multiprocessing.Process(target=run_worker, args=(args.db, POLL_INTERVAL, args.once))
+                     for _ in range(args.workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return 0
+
+    queue = JobQueue(args.db)
+    if args.command == 'submit':
+        params = {key: value for key, value in vars(args).items()
+                  if key not in ('db', 'command', 'kind') and value is not None}
+        job_id = queue.submit(args.kind, params)
+        print(f"Job #{job_id} ({args.kind}) ditambahkan ke {args.db}")
+    elif args.command == 'status':
+        if args.job_id is None:
+            for job in queue.list():
+                _print_job(job)
+        else:
+            job = queue.get(args.job_id)
+            if job is None:
+                parser.error(f"Job #{args.job_id} tidak ditemukan")
+            job.pop('checkpoint')
+            print(json.dumps(job, indent=2, default=_json_default))
+    elif args.command == 'cancel':
+        if not queue.cancel(args.job_id):
+            print(f"Job #{args.job_id} tidak sedang menunggu atau berjalan", file=sys.stderr)
+            return 1
+        print(f"Job #{args.job_id} dibatalkan")
+    queue.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Instrumentasi hot path: timer per tahap, counter dan durasi pemuatan model.
+
+Setiap permintaan prediksi dibungkus ``request('prediksi')``; tahap di
+dalamnya diukur dengan ``timer('nama_tahap')``. Durasi dikumpulkan per tahap
+(jumlah, total, min, maks, dan sampel terakhir untuk persentil), dan rincian
+permintaan terakhir disimpan untuk panel debug di sidebar.
+
+Ekspor:
+- ``snapshot()`` / ``export(path)``: ringkasan metrik sebagai JSON;
+- log terstruktur: jika ``METRICS_LOG_PATH`` diset, setiap permintaan yang
+  selesai ditulis sebagai satu baris JSON (JSON Lines).
+
+Ringkasan log untuk membandingkan rilis:
+
+    python -m metrics summary metrics.jsonl -o metrics.json
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Jumlah sampel terakhir per tahap untuk menghitung persentil
+SAMPLE_SIZE = 1000
+SCHEMA_VERSION = 1
+
+
+class Metrics:
+    """Registry timer dan counter yang aman dipakai dari beberapa thread.
+
+    Permintaan aktif disimpan per thread (Streamlit menjalankan setiap sesi
+    di thread sendiri), sehingga tahap dari sesi lain tidak tercampur.
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE, log_path=None):
+        self.sample_size = sample_size
+        self.log_path = log_path
+        self.started_at = time.time()
+        self._timers = {}  # nama -> [count, total, min, max, deque sampel]
+        self._counters = {}
+        self._last_requests = {}  # nama permintaan -> rincian terakhir
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # Catat satu durasi (detik) untuk sebuah tahap
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = [0, 0.0, float('inf'), 0.0, deque(maxlen=self.sample_size)]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = min(stats[2], seconds)
+            stats[3] = max(stats[3], seconds)
+            stats[4].append(seconds)
+
+        request = getattr(self._local, 'request', None)
+        if request is not None:
+            request['stages'][name] = request['stages'].get(name, 0.0) + seconds
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+        request = getattr(self._local, 'request', None)
+        if request is not None:
+            request['counters'][name] = request['counters'].get(name, 0) + value
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    # Bungkus satu permintaan; tahap dan counter di dalamnya dicatat sebagai rinciannya
+    @contextmanager
+    def request(self, name):
+        outer = getattr(self._local, 'request', None)
+        request = {'name': name, 'stages': {}, 'counters': {}}
+        self._local.request = request
+        start = time.perf_counter()
+        try:
+            yield request
+        finally:
+            self._local.request = outer
+            request['total'] = time.perf_counter() - start
+            # Permintaan tanpa tahap (mis. halaman tanpa input) tidak dicatat
+            if request['stages'] or request['counters']:
+                self._finish(request)
+
+    def _finish(self, request):
+        request['timestamp'] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds')
+        self.record(f"{request['name']}.total", request['total'])
+        with self._lock:
+            self._last_requests[request['name']] = request
+        if self.log_path:
+            self._write_log(request)
+
+    def _write_log(self, request):
+        line = json.dumps(request, sort_keys=True)
+        with self._lock, open(self.log_path, 'a') as f:
+            f.write(line + '\n')
+
+    def last_request(self, name):
+        with self._lock:
+            return self._last_requests.get(name)
+
+    # Ringkasan semua timer, counter dan durasi pemuatan model (dict siap JSON)
+    def snapshot(self):
+        from model_store import LOAD_TIMES
+
+        with self._lock:
+            timers = {name: _timer_summary(stats[0], stats[1], stats[2], stats[3], stats[4])
+                      for name, stats in self._timers.items()}
+            counters = dict(self._counters)
+            last_requests = {name: dict(request) for name, request in self._last_requests.items()}
+        return {
+            'schema_version': SCHEMA_VERSION,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            'uptime_seconds': time.time() - self.started_at,
+            'timers': timers,
+            'counters': counters,
+            'model_load_seconds': dict(LOAD_TIMES),
+            'last_requests': last_requests
+        }
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._last_requests.clear()
+            self.started_at = time.time()
+
+
+def _timer_summary(count, total, minimum, maximum, samples):
+    samples = np.fromiter(samples, dtype=float)
+    p50, p95 = np.percentile(samples, [50, 95]) if len(samples) else (0.0, 0.0)
+    return {
+        'count': count,
+        'total': total,
+        'mean': total / count if count else 0.0,
+        'min': minimum if count else 0.0,
+        'max': maximum,
+        'p50': float(p50),
+        'p95': float(p95)
+    }
+
+
+# Registry bawaan untuk aplikasi; log terstruktur aktif jika METRICS_LOG_PATH diset
+METRICS = Metrics(log_path=os.environ.get('METRICS_LOG_PATH'))
+timer = METRICS.timer
+request = METRICS.request
+increment = METRICS.increment
+snapshot = METRICS.snapshot
+
+
+# Fungsi untuk meringkas log JSON Lines per tahap (untuk dibandingkan antar rilis)
+def summarize_log(path):
+    stages = {}
+    counters = {}
+    n_requests = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            n_requests += 1
+            name = entry['name']
+            stages.setdefault(f'{name}.total', []).append(entry['total'])
+            for stage, seconds in entry['stages'].items():
+                stages.setdefault(stage, []).append(seconds)
+            for counter, value in entry['counters'].items():
+                counters[counter] = counters.get(counter, 0) + value
+
+    timers = {}
+    for name, values in stages.items():
+        values = np.asarray(values)
+        timers[name] = _timer_summary(len(values), values.sum(), values.min(), values.max(), values)
+    return {'schema_version': SCHEMA_VERSION, 'source': path, 'requests': n_requests,
+            'timers': timers, 'counters': counters}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary_parser = subparsers.add_parser('summary', help='Ringkas log JSON Lines per tahap')
+    summary_parser.add_argument('log', help='File log (METRICS_LOG_PATH)')
+    summary_parser.add_argument('-o', '--output', help='Tulis ringkasan sebagai JSON')
+    args = parser.parse_args(argv)
+
+    summary = summarize_log(args.log)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+
+    print(f"{summary['requests']:,} permintaan dari {args.log}")
+    print(f"{'Tahap':<36} {'n':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'maks':>9}")
+    for name, stats in sorted(summary['timers'].items(), key=lambda item: -item[1]['total']):
+        print(f"{name:<36} {stats['count']:>6} {stats['mean'] * 1e3:>7.1f}ms {stats['p50'] * 1e3:>7.1f}ms "
+              f"{stats['p95'] * 1e3:>7.1f}ms {stats['max'] * 1e3:>7.1f}ms")
+    for name, value in sorted(summary['counters'].items()):
+        print(f"{name:<36} {value:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""Penyimpanan artefak model dengan manifest dan validasi saat dimuat.
+
+Manifest (models/manifest.json) mencatat checksum SHA-256, versi scikit-learn
+dan skema fitur setiap model. Model yang tidak cocok dengan manifest ditolak
+dengan ModelStoreError, bukan diganti model dummy. Perintah:
+
+    python -m model_store build    # tulis ulang manifest dari artefak saat ini
+    python -m model_store verify   # periksa semua artefak terhadap manifest
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+import joblib
+
+import scoring
+
+MANIFEST_FILE = 'models/manifest.json'
+MANIFEST_VERSION = 1
+
+# Durasi pemuatan terakhir per model (detik), untuk pengukuran cold start
+LOAD_TIMES = {}
+
+
+class ModelStoreError(RuntimeError):
+    """Artefak model hilang, rusak, atau tidak cocok dengan manifest."""
+
+
+# Fungsi untuk menghitung checksum SHA-256 sebuah file
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sklearn_version():
+    import sklearn
+    return sklearn.__version__
+
+
+def _major_minor(version):
+    return tuple(version.split('.')[:2])
+
+
+def read_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        raise ModelStoreError(f"Manifest {path} tidak ditemukan. Jalankan 'python -m model_store build'.")
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != MANIFEST_VERSION:
+        raise ModelStoreError(f"Versi format manifest tidak didukung: {manifest.get('format_version')}")
+    return manifest
+
+
+# Fungsi untuk membuat manifest dari artefak yang ada di models/
+def build_manifest(path=MANIFEST_FILE, model_files=None, feature_info_file=scoring.FEATURE_INFO_FILE):
+    if model_files is None:
+        model_files = {name: scoring.ALL_MODEL_FILES[name] for name in scoring.available_models()}
+    models = {}
+    for name, model_path in model_files.items():
+        model = joblib.load(model_path)
+        models[name] = {
+            'path': model_path,
+            'sha256': file_sha256(model_path),
+            'bytes': os.path.getsize(model_path),
+            'classifier': type(model.named_steps['classifier']).__name__,
+            'feature_schema': scoring.feature_schema(model)
+        }
+
+    manifest = {
+        'format_version': MANIFEST_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'sklearn_version': _sklearn_version(),
+        'models': models,
+        'feature_info': {
+            'path': feature_info_file,
+            'sha256': file_sha256(feature_info_file)
+        }
+    }
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _verify_file(entry):
+    model_path = entry['path']
+    if not os.path.exists(model_path):
+        raise ModelStoreError(f"File model {model_path} tidak ditemukan")
+    checksum = file_sha256(model_path)
+    if checksum != entry['sha256']:
+        raise ModelStoreError(f"Checksum {model_path} tidak cocok dengan manifest "
+                              f"({checksum[:12]} != {entry['sha256'][:12]})")
+
+
+# Fungsi untuk memuat satu model dan memvalidasinya terhadap manifest.
+# mmap_mode diteruskan apa adanya ke joblib.load; untuk pipeline scikit-learn ini
+# tidak mempercepat pemuatan karena Tree menyalin array node saat unpickle.
+# Untuk berbagi memori antar-worker gunakan load_compiled.
+def load_model(name, mmap_mode=None, verify=True, manifest=None):
+    start = time.perf_counter()
+    manifest = read_manifest() if manifest is None else manifest
+    entry = manifest['models'].get(name)
+    if entry is None:
+        raise ModelStoreError(f"Model '{name}' tidak terdaftar di manifest")
+
+    if verify:
+        _verify_file(entry)
+        current = _sklearn_version()
+        if _major_minor(current) != _major_minor(manifest['sklearn_version']):
+            raise ModelStoreError(f"Model dibuat dengan scikit-learn {manifest['sklearn_version']}, "
+                                  f"terpasang {current}")
+
+    try:
+        model = joblib.load(entry['path'], mmap_mode=mmap_mode)
+    except Exception as e:
+        raise ModelStoreError(f"Gagal memuat {entry['path']}: {str(e)}") from e
+
+    if verify:
+        columns = list(getattr(model, 'feature_names_in_', []))
+        if columns != entry['feature_schema']['columns']:
+            raise ModelStoreError(f"Skema fitur '{name}' tidak cocok dengan manifest")
+
+    LOAD_TIMES[name] = time.perf_counter() - start
+    return model
+
+
+def load_feature_info(verify=True, manifest=None):
+    manifest = read_manifest() if manifest is None else manifest
+    entry = manifest['feature_info']
+    if verify:
+        _verify_file(entry)
+    feature_info = joblib.load(entry['path'])
+    if not isinstance(feature_info, dict) or feature_info.get('schema_version') != scoring.FEATURE_INFO_VERSION:
+        raise ModelStoreError(
+            f"Skema {entry['path']} bukan versi {scoring.FEATURE_INFO_VERSION}. "
+            "Jalankan 'python -m train --importances'."
+        )
+    return feature_info
+
+
+# Fungsi untuk memuat model terkompilasi (tree_engine). Array disimpan sebagai
+# .npy mentah sehingga dengan mmap_mode='r' beberapa worker berbagi satu salinan
+# di page cache. Dikompilasi ulang jika belum diekspor atau sumbernya berubah.
+def load_compiled(name, mmap_mode='r', manifest=None):
+    from tree_engine import CompiledTreeModel, compile_pipeline, compiled_path
+
+    start = time.perf_counter()
+    manifest = read_manifest() if manifest is None else manifest
+    entry = manifest['models'].get(name)
+    if entry is None:
+        raise ModelStoreError(f"Model '{name}' tidak terdaftar di manifest")
+
+    path = compiled_path(name)
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            source_sha256 = json.load(f).get('source_sha256')
+        if source_sha256 == entry['sha256']:
+            model = CompiledTreeModel.load(path, mmap_mode=mmap_mode)
+            LOAD_TIMES[f'{name} (compiled)'] = time.perf_counter() - start
+            return model
+
+    model = compile_pipeline(load_model(name, manifest=manifest))
+    LOAD_TIMES[f'{name} (compiled)'] = time.perf_counter() - start
+    return model
+
+
+class ModelRegistry(Mapping):
+    """Kumpulan model yang dimuat saat pertama kali dibutuhkan.
+
+    Berperilaku seperti dict ``{nama: pipeline}``. Model utama dimuat saat
+    registry dibuat; model lain dimuat ketika diakses atau di background
+    lewat ``preload()``. Error pemuatan disimpan dan dilempar ulang saat
+    model tersebut diakses.
+    """
+
+    def __init__(self, names=None, primary=scoring.DEFAULT_MODEL, loader=load_model):
+        self.names = scoring.available_models() if names is None else list(names)
+        self.primary = primary
+        self._loader = loader
+        self._models = {}
+        self._errors = {}
+        self._locks = {name: threading.Lock() for name in self.names}
+        self._thread = None
+
+        if primary is not None:
+            self[primary]
+
+    def __getitem__(self, name):
+        if name not in self._locks:
+            raise KeyError(name)
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._locks[name]:
+            if name not in self._models:
+                if name in self._errors:
+                    raise self._errors[name]
+                try:
+                    self._models[name] = self._loader(name)
+                except Exception as e:
+                    self._errors[name] = e
+                    raise
+            return self._models[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    # Muat model yang belum dimuat di thread background
+    def preload(self, background=True):
+        def run():
+            for name in self.names:
+                try:
+                    self[name]
+                except Exception:
+                    pass  # dilempar ulang saat model diakses
+
+        if not background:
+            run()
+            return None
+        if self._thread is None:
+            self._thread = threading.Thread(target=run, name='model-preload', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# Fungsi untuk memeriksa semua artefak; mengembalikan daftar masalah
+def verify_all():
+    problems = []
+    try:
+        manifest = read_manifest()
+    except ModelStoreError as e:
+        return [str(e)]
+
+    for name in manifest['models']:
+        try:
+            load_model(name, manifest=manifest)
+        except ModelStoreError as e:
+            problems.append(str(e))
+    try:
+        load_feature_info(manifest=manifest)
+    except ModelStoreError as e:
+        problems.append(str(e))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m model_store', description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['build', 'verify'])
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest = build_manifest()
+        for name, entry in manifest['models'].items():
+            print(f"{name}: {entry['sha256'][:12]} ({entry['bytes']:,} byte)")
+        print(f"Manifest ditulis ke {MANIFEST_FILE} (scikit-learn {manifest['sklearn_version']})")
+        return 0
+
+    problems = verify_all()
+    for problem in problems:
+        print(f"GAGAL: {problem}", file=sys.stderr)
+    if not problems:
+        print("Semua artefak cocok dengan manifest")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Skoring batch paralel dengan pool proses.
+
+Input dipecah menjadi potongan baris (shard) yang diskor oleh beberapa proses
+worker, lalu probabilitasnya disusun kembali sesuai urutan masukan.
+ParallelScorer memiliki predict_proba dan feature_names_in_ sehingga dapat
+dipakai di mana pun pipeline biasa dipakai (score_cohort, score_stream).
+
+Model tidak di-unpickle ulang oleh setiap worker:
+- start method 'fork' (Linux): model yang sudah dimuat di proses induk diwarisi
+  worker secara copy-on-write;
+- start method lain: setiap worker memuat model terkompilasi dengan
+  mmap_mode='r' sehingga array node berbagi satu salinan di page cache
+  (engine='sklearn' tetap memuat pipeline per worker).
+"""
+import multiprocessing
+import os
+
+import numpy as np
+
+import model_store
+import scoring
+
+# Model di proses worker (diisi oleh ParallelScorer sebelum fork atau oleh _init_worker)
+_worker_model = None
+
+
+def _load(model_name, engine):
+    if engine == 'compiled':
+        return model_store.load_compiled(model_name, mmap_mode='r')
+    return model_store.load_model(model_name)
+
+
+def _init_worker(model_name, engine):
+    global _worker_model
+    if _worker_model is None:
+        _worker_model = _load(model_name, engine)
+
+
+def _score_shard(task):
+    index, shard = task
+    return index, _worker_model.predict_proba(shard)[:, 1]
+
+
+class ParallelScorer:
+    """Model yang menskor batch besar memakai ``n_jobs`` proses.
+
+    Batch yang lebih kecil dari ``min_rows`` diskor langsung di proses induk
+    karena biaya mengirim data ke worker lebih besar dari waktu skoringnya.
+    """
+
+    def __init__(self, model_name=scoring.DEFAULT_MODEL, n_jobs=None, engine='compiled',
+                 shards_per_job=4, min_rows=20000, start_method=None):
+        self.model_name = model_name
+        self.engine = engine
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.shards_per_job = shards_per_job
+        self.min_rows = min_rows
+        self.model = _load(model_name, engine)
+
+        available = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            start_method = 'fork' if 'fork' in available else available[0]
+        self.start_method = start_method
+        self._pool = None
+
+    @property
+    def feature_names_in_(self):
+        return self.model.feature_names_in_
+
+    def _get_pool(self):
+        global _worker_model
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == 'fork':
+                # Worker mewarisi model ini tanpa unpickle
+                _worker_model = self.model
+            self._pool = context.Pool(self.n_jobs, initializer=_init_worker,
+                                      initargs=(self.model_name, self.engine))
+        return self._pool
+
+    def predict_proba(self, X):
+        n_rows = len(X)
+        if self.n_jobs == 1 or n_rows < self.min_rows:
+            return self.model.predict_proba(X)
+
+        n_shards = min(self.n_jobs * self.shards_per_job, n_rows)
+        bounds = np.linspace(0, n_rows, n_shards + 1).astype(int)
+        tasks = ((i, X.iloc[start:stop] if hasattr(X, 'iloc') else X[start:stop])
+                 for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])))
+
+        # Hasil datang tanpa urutan, lalu ditempatkan kembali berdasarkan indeks shard
+        probabilities = np.empty(n_rows, dtype=float)
+        for index, proba in self._get_pool().imap_unordered(_score_shard, tasks):
+            probabilities[bounds[index]:bounds[index + 1]] = proba
+        return np.column_stack([1.0 - probabilities, probabilities])
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
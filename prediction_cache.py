@@ -0,0 +1,172 @@
+"""Cache hasil prediksi berbasis LRU dengan persistensi SQLite opsional.
+
+Kunci cache adalah hash dari dict fitur yang dinormalisasi ditambah sidik jari
+file model (.joblib). Jika file model berubah, sidik jarinya ikut berubah
+sehingga entri lama otomatis tidak terpakai dan dibuang.
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Sidik jari file dihitung ulang hanya jika ukuran/mtime berubah
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+
+# Fungsi untuk menghitung sidik jari isi file model
+def file_fingerprint(path):
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    with _fingerprint_lock:
+        cached = _fingerprints.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    fingerprint = digest.hexdigest()[:16]
+
+    with _fingerprint_lock:
+        _fingerprints[path] = (signature, fingerprint)
+    return fingerprint
+
+
+def _normalize_value(value):
+    if isinstance(value, (np.generic,)):
+        value = value.item()
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        value = float(value)
+        if math.isnan(value):
+            return None
+        # 1 dan 1.0 menghasilkan kunci yang sama
+        return int(value) if value.is_integer() else round(value, 10)
+    return value
+
+
+# Fungsi untuk membuat kunci cache dari dict fitur dan sidik jari model
+def feature_key(features, fingerprint, namespace='predict'):
+    normalized = {str(k): _normalize_value(v) for k, v in features.items()}
+    payload = json.dumps([namespace, fingerprint, normalized], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """Cache LRU berukuran tetap untuk hasil prediksi.
+
+    Jika ``path`` diberikan, entri juga ditulis ke file SQLite sehingga tetap
+    tersedia setelah aplikasi di-restart.
+    """
+
+    def __init__(self, maxsize=2048, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (model_path, fingerprint, value)
+        self._fingerprints = {}  # model_path -> fingerprint terakhir yang terlihat
+        self._lock = threading.RLock()
+        self._db = None
+
+        if path:
+            self._open_db()
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, model_path TEXT, fingerprint TEXT, "
+            "value TEXT, last_used REAL)"
+        )
+        rows = self._db.execute(
+            "SELECT key, model_path, fingerprint, value FROM predictions "
+            "ORDER BY last_used DESC LIMIT ?", (self.maxsize,)
+        ).fetchall()
+        for key, model_path, fingerprint, value in reversed(rows):
+            self._entries[key] = (model_path, fingerprint, json.loads(value))
+        self._db.commit()
+
+    # Buang entri milik model yang sidik jarinya sudah berubah
+    def _check_model(self, model_path, fingerprint):
+        previous = self._fingerprints.get(model_path)
+        self._fingerprints[model_path] = fingerprint
+        if previous == fingerprint:
+            return
+
+        stale = [key for key, (path, fp, _) in self._entries.items()
+                 if path == model_path and fp != fingerprint]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        if self._db is not None:
+            self._db.execute("DELETE FROM predictions WHERE model_path = ? AND fingerprint != ?",
+                             (model_path, fingerprint))
+            self._db.commit()
+
+    def get(self, model_path, features, namespace='predict'):
+        fingerprint = file_fingerprint(model_path)
+        key = feature_key(features, fingerprint, namespace)
+        with self._lock:
+            self._check_model(model_path, fingerprint)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, model_path, features, value, namespace='predict'):
+        fingerprint = file_fingerprint(model_path)
+        key = feature_key(features, fingerprint, namespace)
+        with self._lock:
+            self._check_model(model_path, fingerprint)
+            self._entries[key] = (model_path, fingerprint, value)
+            self._entries.move_to_end(key)
+
+            evicted = []
+            while len(self._entries) > self.maxsize:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self.evictions += len(evicted)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                    (key, model_path, fingerprint, json.dumps(value), time.time())
+                )
+                self._db.executemany("DELETE FROM predictions WHERE key = ?", [(k,) for k in evicted])
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'persistent': self._db is not None
+            }
@@ -1,13 +1,48 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-from PIL import Image
-import plotly.express as px
-import plotly.graph_objects as go
+import metrics
+import charts
+import scoring
+from analytics import DIMENSIONS as ANALYTICS_DIMENSIONS, AnalyticsStore
+from cohort import ScoredCohort
+from counterfactual import search as counterfactual_search
+from explain import TreeExplainer, top_contributions
+from jobs import JobQueue, ensure_workers
+from model_store import ModelRegistry
+from prediction_cache import PredictionCache, file_fingerprint
+from recommendations import (
+    INTERVENTIONS,
+    assign_interventions,
+    get_recommendations,
+    intervention_counts,
+    intervention_labels
+)
+from scoring import (
+    DROPOUT_THRESHOLD,
+    labels_from_proba,
+    predict_proba_batch,
+    read_cohort,
+    score_cohort
+)
+from whatif import (
+    DEFAULT_WHATIF_FIELDS,
+    MAX_SCENARIOS,
+    WHATIF_FIELDS,
+    default_grid,
+    response_curves,
+    sweep
+)
+
+# Batas waktu pencarian counterfactual untuk satu mahasiswa (detik)
+COUNTERFACTUAL_BUDGET = 2.0
+
+# Plotly hanya diimpor saat grafik pertama kali dibuat (lihat _plotly).
+# Skoring tanpa UI (cron, CLI) cukup memakai modul scoring.
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -17,266 +52,447 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Fungsi untuk memuat model
+# Fungsi untuk memuat model. Model utama (Gradient Boosting) dimuat lebih dulu,
+# model pembanding dimuat di background agar prediksi pertama tidak menunggu
+# artefak terbesar (Random Forest).
 @st.cache_resource
 def load_models():
+    # Artefak yang hilang/rusak menghentikan aplikasi, bukan diganti model dummy
     try:
-        models = {
-            'Decision Tree': joblib.load('models/decision_tree_model.joblib'),
-            'Random Forest': joblib.load('models/random_forest_model.joblib'),
-            'Gradient Boosting': joblib.load('models/gradient_boosting_model.joblib')
-        }
+        models = ModelRegistry(primary=scoring.DEFAULT_MODEL)
+        models.preload(background=True)
         return models
     except Exception as e:
         st.error(f"Error loading models: {str(e)}")
-        # Return dummy models for demonstration
-        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-        from sklearn.tree import DecisionTreeClassifier
-        
-        dummy_models = {
-            'Decision Tree': DecisionTreeClassifier(),
-            'Random Forest': RandomForestClassifier(),
-            'Gradient Boosting': GradientBoostingClassifier()
-        }
-        return dummy_models
+        st.info("Periksa artefak dengan `python -m model_store verify`.")
+        st.stop()
 
-# Fungsi untuk memuat feature info
+# Fungsi untuk memuat feature info (importance dihitung saat pelatihan, lihat train.py)
 @st.cache_resource
 def load_feature_info():
     try:
-        return joblib.load('models/feature_info.joblib')
-    except:
-        # Return dummy feature info for demonstration
-        features = [
-            'Curricular_units_2nd_sem_approved',
-            'Tuition_fees_up_to_date',
-            'approval_ratio_2nd',
-            'Curricular_units_2nd_sem_enrolled',
-            'Age_at_enrollment',
-            'Curricular_units_1st_sem_approved',
-            'Curricular_units_1st_sem_grade',
-            'Previous_qualification_grade',
-            'Admission_grade',
-            'Scholarship_holder'
-        ]
-        importances = [0.45, 0.12, 0.10, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03, 0.03]
-        
-        return {
-            'features': features,
-            'importances': importances
-        }
+        return scoring.load_feature_info()
+    except Exception as e:
+        st.warning(f"Feature importance tidak dapat dimuat: {str(e)}")
+        return None
+
+# Fungsi untuk memuat cache prediksi (persisten jika PREDICTION_CACHE_PATH diset)
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(
+        maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 2048)),
+        path=os.environ.get('PREDICTION_CACHE_PATH')
+    )
+
+# Fungsi untuk memuat store agregat dashboard (SQLite, lokasi dari ANALYTICS_DB_PATH)
+@st.cache_resource
+def get_analytics_store():
+    return AnalyticsStore()
+
+# Fungsi untuk memuat antrian job latar belakang (SQLite, lokasi dari JOBS_DB_PATH)
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+# Fungsi untuk memuat cache grafik (figure dan spesifikasi ringkas, dipakai bersama semua sesi)
+@st.cache_resource
+def get_figure_cache():
+    return charts.FigureCache(maxsize=int(os.environ.get('FIGURE_CACHE_SIZE', 256)))
+
+# Fungsi untuk mengambil grafik dari cache berdasarkan isinya, atau membangunnya.
+# Mode ringan ikut menjadi bagian kunci karena hasil build berbeda.
+def cached_figure(key, build):
+    cache = get_figure_cache()
+    key = charts.content_key(is_lite_mode(), *key)
+    figure = cache.get(key)
+    metrics.increment('grafik.cache.hit' if figure is not None else 'grafik.cache.miss')
+    if figure is None:
+        figure = build()
+        cache.put(key, figure)
+    return figure
+
+# Mode ringan: grafik dikirim sebagai spesifikasi Vega-Lite ringkas, bukan figure Plotly
+# (aktif lewat sidebar, LITE_MODE=1 atau parameter URL ?lite=1)
+def is_lite_mode():
+    return bool(st.session_state.get('lite_mode', False))
+
+# Fungsi untuk menampilkan grafik dari cached_figure (spesifikasi dict atau figure Plotly)
+def render_chart(figure):
+    if isinstance(figure, dict):
+        st.vega_lite_chart(figure, use_container_width=True)
+    else:
+        st.plotly_chart(figure, use_container_width=True)
+
+# Fungsi untuk mengimpor plotly secara lazy
+def _plotly():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    return px, go
 
 # Fungsi untuk membuat prediksi
-def predict_dropout(model, features):
+def predict_dropout(model, features, model_name=None):
     try:
+        # Hasil untuk profil yang sama diambil dari cache (hanya jika nama model diketahui)
+        cache = get_prediction_cache() if model_name in scoring.ALL_MODEL_FILES else None
+        if cache is not None:
+            cached = cache.get(scoring.ALL_MODEL_FILES[model_name], features)
+            metrics.increment('cache.hit' if cached is not None else 'cache.miss')
+            if cached is not None:
+                return cached['prediction'], cached['probability']
+        
         # Reshape untuk satu sampel
         features_df = pd.DataFrame([features])
         
-        # Prediksi
-        prediction = model.predict(features_df)[0]
-        probability = model.predict_proba(features_df)[0, 1]
+        # Prediksi (label diturunkan dari probabilitas, cukup satu kali traversal)
+        probability = float(predict_proba_batch(model, features_df)[0])
+        prediction = int(labels_from_proba(probability))
+        
+        if cache is not None:
+            cache.put(scoring.ALL_MODEL_FILES[model_name], features,
+                      {'prediction': prediction, 'probability': probability})
         
         return prediction, probability
     except Exception as e:
+        # Jangan tampilkan prediksi palsu jika model gagal
         st.error(f"Error making prediction: {str(e)}")
-        # Return dummy prediction for demonstration
-        return 1, 0.75
+        st.stop()
 
-# Fungsi untuk menampilkan rekomendasi berdasarkan prediksi dan fitur
-def get_recommendations(prediction, probability, features):
-    recommendations = []
+# Fungsi untuk mengambil rekomendasi dari cache (kunci: fitur + model utama)
+def get_cached_recommendations(prediction, probability, features, model_name='Gradient Boosting'):
+    cache = get_prediction_cache()
+    model_path = scoring.ALL_MODEL_FILES[model_name]
+    recommendations = cache.get(model_path, features, namespace='recommendations')
+    if recommendations is None:
+        recommendations = get_recommendations(prediction, probability, features)
+        cache.put(model_path, features, recommendations, namespace='recommendations')
+    return recommendations
+
+# Fungsi untuk menampilkan statistik cache prediksi di sidebar
+def display_cache_stats():
+    stats = get_prediction_cache().stats()
+    with st.sidebar.expander("Statistik Cache Prediksi"):
+        st.markdown(f"""
+        - Entri: {stats['size']:,} / {stats['maxsize']:,}
+        - Hit: {stats['hits']:,} | Miss: {stats['misses']:,} ({stats['hit_rate']:.1%} hit rate)
+        - Eviction: {stats['evictions']:,} | Invalidasi: {stats['invalidations']:,}
+        - Persisten: {'Ya' if stats['persistent'] else 'Tidak'}
+        """)
+        figures = get_figure_cache().stats()
+        st.markdown(f"""
+        **Cache grafik**
+        - Entri: {figures['size']:,} / {figures['maxsize']:,}
+        - Hit: {figures['hits']:,} | Miss: {figures['misses']:,} ({figures['hit_rate']:.1%} hit rate)
+        """)
+
+# Fungsi untuk menampilkan metrik performa di sidebar (mode debug: METRICS_DEBUG=1 atau ?debug=1)
+def display_metrics_panel():
+    if os.environ.get('METRICS_DEBUG') != '1' and st.query_params.get('debug') != '1':
+        return
     
-    if prediction == 1:  # Jika diprediksi dropout
-        risk_level = "Tinggi" if probability > 0.75 else "Sedang"
-        
-        recommendations.append(f"**Tingkat Risiko Dropout: {risk_level} ({probability:.2%})**")
-        recommendations.append("---")
+    snapshot = metrics.snapshot()
+    with st.sidebar.expander("Metrik Performa (Debug)", expanded=True):
+        for name, request in snapshot['last_requests'].items():
+            st.markdown(f"**Permintaan terakhir '{name}'**: {request['total'] * 1000:.1f} ms")
+            stages = pd.DataFrame({
+                'Tahap': list(request['stages']),
+                'ms': [seconds * 1000 for seconds in request['stages'].values()]
+            }).sort_values('ms', ascending=False)
+            stages['%'] = stages['ms'] / (request['total'] * 1000) * 100
+            st.dataframe(stages.round(1), use_container_width=True, hide_index=True)
         
-        # Rekomendasi berdasarkan fitur akademik
-        if features.get('Curricular_units_2nd_sem_approved', 0) < 3:
-            recommendations.append("🎯 **Intervensi Akademik:**")
-            recommendations.append("- Berikan dukungan akademik tambahan untuk meningkatkan jumlah unit kurikuler yang disetujui")
-            recommendations.append("- Jadwalkan sesi tutoring khusus untuk mata kuliah yang sulit")
-            recommendations.append("- Pertimbangkan untuk mengurangi beban akademik di semester berikutnya")
+        if snapshot['timers']:
+            st.markdown("**Semua permintaan (ms)**")
+            timers = pd.DataFrame(snapshot['timers']).T[['count', 'mean', 'p50', 'p95', 'max']]
+            timers[['mean', 'p50', 'p95', 'max']] *= 1000
+            st.dataframe(timers.round(1), use_container_width=True)
         
-        # Rekomendasi berdasarkan status pembayaran
-        if features.get('Tuition_fees_up_to_date', 0) == 0:
-            recommendations.append("💰 **Dukungan Keuangan:**")
-            recommendations.append("- Tawarkan opsi pembayaran yang lebih fleksibel")
-            recommendations.append("- Informasikan tentang program beasiswa dan bantuan keuangan yang tersedia")
-            recommendations.append("- Sediakan konseling keuangan untuk membantu perencanaan anggaran")
+        if snapshot['counters']:
+            st.markdown("**Counter**")
+            st.markdown('\n'.join(f"- {name}: {value:,}" for name, value in sorted(snapshot['counters'].items())))
         
-        # Rekomendasi berdasarkan usia
-        if features.get('Age_at_enrollment', 0) > 25:
-            recommendations.append("👥 **Dukungan Demografis:**")
-            recommendations.append("- Hubungkan dengan komunitas mahasiswa dewasa")
-            recommendations.append("- Tawarkan jadwal kuliah yang lebih fleksibel")
-            recommendations.append("- Berikan dukungan untuk menyeimbangkan studi dengan tanggung jawab lain")
+        st.markdown("**Pemuatan model**")
+        st.markdown('\n'.join(f"- {name}: {seconds * 1000:.0f} ms"
+                               for name, seconds in snapshot['model_load_seconds'].items()))
         
-        # Rekomendasi umum
-        recommendations.append("🔄 **Tindak Lanjut Reguler:**")
-        recommendations.append("- Jadwalkan pertemuan rutin dengan penasihat akademik")
-        recommendations.append("- Pantau kemajuan akademik secara berkala")
-        recommendations.append("- Berikan dukungan psikologis jika diperlukan")
-    
-    else:  # Jika diprediksi tidak dropout
-        recommendations.append(f"**Tingkat Risiko Dropout: Rendah ({probability:.2%})**")
-        recommendations.append("---")
-        recommendations.append("✅ **Mahasiswa ini diprediksi akan menyelesaikan studi dengan baik.**")
-        
-        # Tetap berikan beberapa rekomendasi untuk meningkatkan keberhasilan
-        recommendations.append("🌟 **Rekomendasi untuk Meningkatkan Keberhasilan:**")
-        recommendations.append("- Dorong partisipasi dalam kegiatan ekstrakurikuler untuk meningkatkan keterlibatan")
-        recommendations.append("- Tawarkan kesempatan untuk menjadi mentor bagi mahasiswa lain")
-        recommendations.append("- Informasikan tentang program pengembangan karir dan magang")
-    
-    return recommendations
+        st.download_button(
+            "Unduh Metrik (JSON)",
+            data=json.dumps(snapshot, indent=2, sort_keys=True),
+            file_name="metrics.json",
+            mime="application/json"
+        )
 
-# Fungsi untuk menampilkan visualisasi fitur penting
-def plot_feature_importance(feature_info, user_features):
+# Fungsi untuk menampilkan visualisasi fitur penting (permutation dan impurity
+# importance yang tersimpan di feature_info, tanpa perhitungan saat runtime).
+# Grafik sama untuk semua mahasiswa, sehingga dibangun sekali per versi model.
+def plot_feature_importance(feature_info, model_name='Gradient Boosting', top=10):
     if feature_info is None:
-        st.warning("Informasi fitur penting tidak tersedia.")
+        st.warning("Informasi fitur penting tidak tersedia. Jalankan `python -m train --importances`.")
         return
     
+    version = file_fingerprint(scoring.ALL_MODEL_FILES[model_name])
+    col1, col2 = st.columns(2)
+    kinds = [
+        (col1, 'permutation', 'Permutation Importance (penurunan F1)'),
+        (col2, 'impurity', 'Impurity Importance')
+    ]
+    for col, kind, title in kinds:
+        with col:
+            try:
+                figure = cached_figure(
+                    ('importance', model_name, version, kind, top),
+                    lambda: build_importance_chart(feature_info, model_name, kind, title, top)
+                )
+            except KeyError as e:
+                st.info(str(e).strip("'"))
+                continue
+            render_chart(figure)
+
+def build_importance_chart(feature_info, model_name, kind, title, top):
+    importances = scoring.feature_importances(feature_info, model_name, kind).head(top)
+    labels = {'Importance': 'Tingkat Kepentingan', 'Feature': 'Fitur'}
+    if is_lite_mode():
+        return charts.bar_spec(importances, x='Importance', y='Feature', horizontal=True, color='Importance',
+                               title=f'{top} Fitur Terpenting: {title}', labels=labels, height=400)
+    
+    px, _ = _plotly()
+    fig = px.bar(
+        importances.iloc[::-1],
+        x='Importance',
+        y='Feature',
+        orientation='h',
+        error_x='Std' if 'Std' in importances.columns else None,
+        title=f'{top} Fitur Terpenting: {title}',
+        labels=labels,
+        color='Importance',
+        color_continuous_scale='Viridis'
+    )
+    
+    fig.update_layout(
+        height=500,
+        xaxis_title="Tingkat Kepentingan",
+        yaxis_title="Fitur",
+        font=dict(size=14)
+    )
+    return fig
+
+# Fungsi untuk memuat explainer TreeSHAP (tabel kontribusi dihitung sekali per model)
+@st.cache_resource
+def load_explainer(model_name):
+    return TreeExplainer(load_models()[model_name])
+
+# Fungsi untuk menampilkan kontribusi fitur (TreeSHAP) untuk satu mahasiswa.
+# Grafik di-cache per (versi model, fitur), sehingga TreeSHAP tidak dihitung ulang saat rerun.
+def plot_feature_contributions(explainer, features, top=10, model_name='Gradient Boosting'):
+    st.subheader("Kontribusi Fitur untuk Mahasiswa Ini")
+    satuan = 'probabilitas' if explainer.output == 'probability' else 'log-odds'
+    version = file_fingerprint(scoring.ALL_MODEL_FILES[model_name])
+    figure = cached_figure(
+        ('kontribusi', model_name, version, features, top),
+        lambda: build_contributions_chart(explainer, features, top, satuan)
+    )
+    render_chart(figure)
+    st.caption(
+        f"Nilai dasar model {explainer.expected_value:.3f} ({satuan}); nilai dasar ditambah seluruh "
+        "kontribusi fitur sama dengan keluaran model untuk mahasiswa ini (TreeSHAP eksak)."
+    )
+
+def build_contributions_chart(explainer, features, top, satuan):
+    with metrics.timer('grafik.kontribusi.shap'):
+        contributions = top_contributions(explainer, features, top=top)
+    contributions['Arah'] = ['Menaikkan risiko' if c > 0 else 'Menurunkan risiko' for c in contributions['Kontribusi']]
+    colors = {'Menaikkan risiko': 'crimson', 'Menurunkan risiko': 'seagreen'}
+    title = f'{top} Fitur dengan Kontribusi Terbesar terhadap Prediksi'
+    labels = {'Kontribusi': f'Kontribusi ({satuan})', 'Fitur': 'Fitur'}
+    if is_lite_mode():
+        return charts.bar_spec(contributions, x='Kontribusi', y='Fitur', horizontal=True, color='Arah',
+                               color_map=colors, title=title, labels=labels, height=400)
+    
+    px, _ = _plotly()
+    fig = px.bar(
+        contributions.iloc[::-1],
+        x='Kontribusi',
+        y='Fitur',
+        orientation='h',
+        color='Arah',
+        color_discrete_map=colors,
+        hover_data=['Nilai'],
+        title=title,
+        labels=labels
+    )
+    
+    fig.update_layout(
+        height=500,
+        xaxis_title=f"Kontribusi ({satuan})",
+        yaxis_title="Fitur",
+        font=dict(size=14)
+    )
+    return fig
+
+# Fungsi untuk menampilkan analisis what-if: semua skenario diskor dalam satu panggilan
+def display_whatif_panel(model, features):
+    st.header("Analisis What-If")
+    fields = st.multiselect(
+        "Field yang divariasikan",
+        options=list(WHATIF_FIELDS),
+        default=DEFAULT_WHATIF_FIELDS,
+        format_func=lambda field: WHATIF_FIELDS[field]['label'],
+        help="Setiap field divariasikan sendiri, field lain tetap seperti input"
+    )
+    combine = st.checkbox(
+        "Kombinasikan semua field (grid)",
+        help=f"Semua kombinasi nilai field, maksimal {MAX_SCENARIOS:,} skenario"
+    )
+    if not fields:
+        st.info("Pilih minimal satu field untuk analisis what-if.")
+        return
+
+    mode = 'grid' if combine else 'oneway'
+    start = time.perf_counter()
     try:
-        # Coba akses feature_importances
-        if 'feature_importances' in feature_info:
-            # Gunakan format yang diharapkan
-            top_features = pd.DataFrame(feature_info['feature_importances'])
-        elif isinstance(feature_info, dict) and 'features' in feature_info and 'importances' in feature_info:
-            # Format alternatif
-            top_features = pd.DataFrame({
-                'Feature': feature_info['features'],
-                'Importance': feature_info['importances']
-            })
-        elif isinstance(feature_info, pd.DataFrame) and 'Feature' in feature_info.columns and 'Importance' in feature_info.columns:
-            # Jika feature_info sudah berupa DataFrame
-            top_features = feature_info
-        else:
-            # Jika format tidak dikenali, buat data dummy untuk contoh
-            st.warning("Format informasi fitur tidak dikenali. Menampilkan contoh visualisasi.")
-            example_features = [
-                'Curricular_units_2nd_sem_approved',
-                'Tuition_fees_up_to_date',
-                'approval_ratio_2nd',
-                'Curricular_units_2nd_sem_enrolled',
-                'Age_at_enrollment',
-                'Curricular_units_1st_sem_approved',
-                'Curricular_units_1st_sem_grade',
-                'Previous_qualification_grade',
-                'Admission_grade',
-                'Scholarship_holder'
-            ]
-            example_importances = [0.45, 0.12, 0.10, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03, 0.03]
-            top_features = pd.DataFrame({
-                'Feature': example_features,
-                'Importance': example_importances
-            })
-        
-        # Ambil 10 fitur terpenting
-        top_features = top_features.sort_values('Importance', ascending=False).head(10)
-        
-        # Buat visualisasi
-        fig = px.bar(
-            top_features, 
-            x='Importance', 
-            y='Feature', 
-            orientation='h',
-            title='10 Fitur Terpenting dalam Prediksi Dropout',
-            labels={'Importance': 'Tingkat Kepentingan', 'Feature': 'Fitur'},
-            color='Importance',
-            color_continuous_scale='Viridis'
-        )
-        
-        fig.update_layout(
-            height=500,
-            xaxis_title="Tingkat Kepentingan",
-            yaxis_title="Fitur",
-            font=dict(size=14)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Tampilkan nilai fitur pengguna untuk fitur penting
-        st.subheader("Nilai Fitur Penting untuk Mahasiswa Ini")
-        
-        user_important_features = {}
-        for feature in top_features['Feature']:
-            # Hapus prefix jika ada
-            clean_feature = feature.replace('num__', '')
-            if clean_feature in user_features:
-                user_important_features[clean_feature] = user_features[clean_feature]
-        
-        # Buat DataFrame dan tampilkan
-        user_features_df = pd.DataFrame(user_important_features.items(), columns=['Fitur', 'Nilai'])
-        
-        # Buat visualisasi nilai fitur pengguna
-        fig = px.bar(
-            user_features_df,
-            x='Nilai',
-            y='Fitur',
-            orientation='h',
-            title='Nilai Fitur Penting untuk Mahasiswa Ini',
-            labels={'Nilai': 'Nilai', 'Fitur': 'Fitur'},
-            color='Nilai',
-            color_continuous_scale='Viridis'
-        )
-        
-        fig.update_layout(
-            height=500,
-            xaxis_title="Nilai",
-            yaxis_title="Fitur",
-            font=dict(size=14)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        result = sweep(model, features, default_grid(features, fields), mode=mode)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    elapsed = time.perf_counter() - start
+    baseline = result['dropout_probability'].iloc[0]
+
+    if mode == 'oneway':
+        curves = response_curves(result)
+        columns = st.columns(min(len(curves), 3))
+        for i, (field, curve) in enumerate(curves.items()):
+            current = features.get(field, 0)
+            figure = cached_figure(
+                ('whatif.kurva', field, current, curve),
+                lambda: build_response_curve_chart(field, curve, current)
+            )
+            with columns[i % len(columns)]:
+                render_chart(figure)
+    elif len(fields) == 2:
+        heatmap = result.iloc[1:].pivot_table(index=fields[0], columns=fields[1], values='dropout_probability')
+        render_chart(cached_figure(('whatif.heatmap', fields, heatmap), lambda: build_whatif_heatmap(fields, heatmap)))
+    else:
+        st.subheader("Skenario dengan Risiko Terendah")
+        lowest = result.iloc[1:].nsmallest(10, 'dropout_probability').drop(columns='field')
+        st.dataframe(lowest.rename(columns={field: WHATIF_FIELDS[field]['label'] for field in fields}))
+
+    st.caption(
+        f"Probabilitas saat ini {baseline:.1%}. {len(result):,} skenario diskor dalam satu "
+        f"panggilan model ({elapsed * 1000:.0f} ms)."
+    )
+
+# Fungsi untuk membuat grafik kurva respons satu field what-if
+def build_response_curve_chart(field, curve, current):
+    label = WHATIF_FIELDS[field]['label']
+    labels = {field: label, 'dropout_probability': 'Probabilitas Dropout'}
+    if is_lite_mode():
+        return charts.line_spec(curve, x=field, y='dropout_probability', title=label, labels=labels,
+                                rule_x=current, rule_y=DROPOUT_THRESHOLD, y_domain=(0, 1))
     
-    except Exception as e:
-        st.error(f"Error saat menampilkan visualisasi fitur penting: {str(e)}")
-        st.info("Menampilkan contoh visualisasi fitur penting sebagai gantinya.")
-        
-        # Tampilkan contoh visualisasi jika terjadi error
-        example_features = [
-            'Curricular_units_2nd_sem_approved',
-            'Tuition_fees_up_to_date',
-            'approval_ratio_2nd',
-            'Curricular_units_2nd_sem_enrolled',
-            'Age_at_enrollment',
-            'Curricular_units_1st_sem_approved',
-            'Curricular_units_1st_sem_grade',
-            'Previous_qualification_grade',
-            'Admission_grade',
-            'Scholarship_holder'
-        ]
-        example_importances = [0.45, 0.12, 0.10, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03, 0.03]
-        
-        example_df = pd.DataFrame({
-            'Feature': example_features,
-            'Importance': example_importances
-        })
-        
-        fig = px.bar(
-            example_df, 
-            x='Importance', 
-            y='Feature', 
-            orientation='h',
-            title='10 Fitur Terpenting dalam Prediksi Dropout (Contoh)',
-            labels={'Importance': 'Tingkat Kepentingan', 'Feature': 'Fitur'},
-            color='Importance',
-            color_continuous_scale='Viridis'
-        )
-        
-        fig.update_layout(
-            height=500,
-            xaxis_title="Tingkat Kepentingan",
-            yaxis_title="Fitur",
-            font=dict(size=14)
+    px, _ = _plotly()
+    fig = px.line(
+        curve,
+        x=field,
+        y='dropout_probability',
+        markers=True,
+        title=label,
+        labels=labels
+    )
+    fig.add_vline(x=current, line_dash='dash', line_color='gray')
+    fig.add_hline(y=DROPOUT_THRESHOLD, line_dash='dot', line_color='red')
+    fig.update_layout(height=350, yaxis_range=[0, 1])
+    return fig
+
+# Fungsi untuk membuat heatmap probabilitas dropout untuk grid dua field
+def build_whatif_heatmap(fields, heatmap):
+    y_label = WHATIF_FIELDS[fields[0]]['label']
+    x_label = WHATIF_FIELDS[fields[1]]['label']
+    if is_lite_mode():
+        return charts.heatmap_spec(heatmap, x_title=x_label, y_title=y_label,
+                                   value_title='Probabilitas Dropout', domain=(0, 1))
+    
+    px, _ = _plotly()
+    fig = px.imshow(
+        heatmap,
+        color_continuous_scale='RdYlGn_r',
+        zmin=0,
+        zmax=1,
+        aspect='auto',
+        labels={'y': y_label, 'x': x_label, 'color': 'Probabilitas Dropout'}
+    )
+    fig.update_layout(height=450)
+    return fig
+
+# Fungsi untuk menampilkan perubahan minimal (counterfactual) untuk satu mahasiswa berisiko.
+# Hasil disimpan di session_state per (versi model, fitur) agar pencarian tidak diulang saat rerun.
+def display_counterfactual(model, features, probability, model_name='Gradient Boosting'):
+    st.subheader("Perubahan Minimal yang Disarankan")
+    version = file_fingerprint(scoring.ALL_MODEL_FILES[model_name])
+    key = charts.content_key('counterfactual', model_name, version, features, COUNTERFACTUAL_BUDGET)
+    cached = st.session_state.get('counterfactual')
+    if cached is not None and cached[0] == key:
+        row = cached[1]
+    else:
+        result, _ = counterfactual_search(
+            model, pd.DataFrame([features]), budget=COUNTERFACTUAL_BUDGET, probabilities=[probability]
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        row = result.iloc[0].to_dict()
+        st.session_state['counterfactual'] = (key, row)
+
+    if row['status'] == 'ditemukan':
+        st.markdown(f"Risiko dropout turun ke **{row['counterfactual_probability']:.1%}** jika:")
+        for change in row['changes'].split('; '):
+            st.markdown(f"- {change}")
+        st.caption(f"Biaya perubahan {row['cost']:g} (kombinasi termurah dari fitur yang dapat diintervensi).")
+    elif row['status'] == 'waktu_habis':
+        st.info(f"Pencarian perubahan minimal belum selesai dalam batas waktu {COUNTERFACTUAL_BUDGET:g} detik. "
+                "Gunakan halaman Prediksi Batch dengan batas waktu lebih lama untuk mahasiswa ini.")
+    else:
+        st.info("Tidak ada kombinasi perubahan pada fitur yang dapat diintervensi yang menurunkan "
+                "risiko di bawah ambang dropout. Diperlukan pendampingan intensif.")
+
+# Fungsi untuk mencari perubahan minimal bagi seluruh mahasiswa berisiko di kohort
+def display_batch_counterfactual(model, cohort, ranked):
+    st.subheader("Perubahan Minimal per Mahasiswa Berisiko")
+    if not st.checkbox("Cari perubahan minimal (counterfactual) untuk mahasiswa yang diprediksi dropout"):
+        return
+
+    col1, col2 = st.columns(2)
+    target = col1.slider("Target probabilitas dropout", 0.05, DROPOUT_THRESHOLD, DROPOUT_THRESHOLD, 0.05)
+    budget = col2.number_input("Batas waktu (detik)", min_value=1.0, max_value=120.0, value=10.0, step=1.0)
+
+    probabilities = np.empty(len(ranked))
+    probabilities[ranked['row'].to_numpy()] = ranked['dropout_probability'].to_numpy()
+    with metrics.timer('batch.counterfactual'):
+        result, summary = counterfactual_search(model, cohort, target=target, budget=budget,
+                                                probabilities=probabilities)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Ditemukan", f"{summary['found']:,}")
+    col2.metric("Tidak Ditemukan", f"{summary['not_found']:,}")
+    col3.metric("Waktu Habis", f"{summary['timeout']:,}")
+    st.caption(f"{summary['candidates_scored']:,} kandidat diskor dalam {summary['batches']} batch "
+               f"({summary['seconds']:.2f} detik).")
+    st.dataframe(result.head(500), use_container_width=True, hide_index=True)
+    st.download_button(
+        "Unduh Perubahan Minimal (CSV)",
+        data=result.to_csv(sep=';', index=False).encode('utf-8'),
+        file_name="counterfactual_dropout.csv",
+        mime="text/csv"
+    )
 
 # Fungsi untuk menampilkan gauge chart probabilitas dropout
 def plot_dropout_gauge(probability):
+    # Mode ringan: angka dan progress bar, tanpa grafik
+    if is_lite_mode():
+        st.metric("Probabilitas Dropout", f"{probability:.1%}")
+        st.progress(min(max(probability, 0.0), 1.0))
+        return
+    
+    render_chart(cached_figure(('gauge', probability), lambda: build_dropout_gauge(probability)))
+
+def build_dropout_gauge(probability):
+    _, go = _plotly()
+    
     fig = go.Figure(go.Indicator(
         mode="gauge+number+delta",
         value=probability * 100,
@@ -306,32 +522,59 @@ def plot_dropout_gauge(probability):
         margin=dict(l=20, r=20, t=50, b=20),
         font=dict(size=16)
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 # Fungsi untuk menampilkan perbandingan model
-def plot_model_comparison(models, features):
-    model_names = []
-    probabilities = []
+def plot_model_comparison(models, features, known_probabilities=None):
+    # Probabilitas yang sudah ada di cache tidak dihitung ulang
+    cache = get_prediction_cache()
+    known = dict(known_probabilities or {})
+    for name in models:
+        if name not in known and name in scoring.ALL_MODEL_FILES:
+            cached = cache.get(scoring.ALL_MODEL_FILES[name], features)
+            if cached is not None:
+                known[name] = cached['probability']
+    
+    # Satu kali preprocessing untuk semua model, hasil model utama dipakai ulang
+    try:
+        with metrics.timer('perbandingan_model.skoring'):
+            probabilities = scoring.score_models(models, pd.DataFrame([features]), known=known)
+    except Exception as e:
+        st.error(f"Error making prediction: {str(e)}")
+        return
     
-    for name, model in models.items():
-        _, prob = predict_dropout(model, features)
-        model_names.append(name)
-        probabilities.append(prob)
+    for name, prob in probabilities.items():
+        if name not in known and name in scoring.ALL_MODEL_FILES:
+            probability = float(prob[0])
+            cache.put(scoring.ALL_MODEL_FILES[name], features,
+                      {'prediction': int(labels_from_proba(probability)), 'probability': probability})
     
     # Buat DataFrame
     comparison_df = pd.DataFrame({
-        'Model': model_names,
-        'Probabilitas Dropout': probabilities
+        'Model': list(probabilities.keys()),
+        'Probabilitas Dropout': [float(prob[0]) for prob in probabilities.values()]
     })
     
+    # Grafik hanya bergantung pada probabilitas tiap model
+    figure = cached_figure(('perbandingan_model', comparison_df),
+                           lambda: build_model_comparison_chart(comparison_df))
+    render_chart(figure)
+
+def build_model_comparison_chart(comparison_df):
+    title = 'Perbandingan Probabilitas Dropout antar Model'
+    labels = {'Probabilitas Dropout': 'Probabilitas', 'Model': 'Model'}
+    if is_lite_mode():
+        return charts.bar_spec(comparison_df, x='Model', y='Probabilitas Dropout', color='Probabilitas Dropout',
+                               title=title, labels=labels, value_format='.0%')
+    
     # Buat visualisasi
+    px, _ = _plotly()
     fig = px.bar(
         comparison_df,
         x='Model',
         y='Probabilitas Dropout',
-        title='Perbandingan Probabilitas Dropout antar Model',
-        labels={'Probabilitas Dropout': 'Probabilitas', 'Model': 'Model'},
+        title=title,
+        labels=labels,
         color='Probabilitas Dropout',
         color_continuous_scale='Viridis',
         text_auto='.2%'
@@ -343,8 +586,338 @@ def plot_model_comparison(models, features):
             yaxis_title="Probabilitas Dropout",
         font=dict(size=14)
     )
+    return fig
+
+# Fungsi untuk menampilkan halaman prediksi batch
+def display_batch_page(models):
+    st.header("Prediksi Risiko Dropout secara Batch")
+    st.markdown("""
+    Unggah file kohort mahasiswa (CSV dengan pemisah titik koma, format sama dengan 
+    `students_performance.csv`). Seluruh baris diskor sekaligus dan diurutkan dari risiko tertinggi.
+    """)
+    
+    uploaded_file = st.file_uploader("File Kohort (CSV)", type=["csv"])
+    model_name = st.selectbox(
+        "Model",
+        options=list(models.keys()),
+        index=list(models.keys()).index('Gradient Boosting')
+    )
+    
+    if uploaded_file is None:
+        return
+    
+    try:
+        with metrics.timer('batch.baca'):
+            cohort = read_cohort(uploaded_file)
+        with metrics.timer('batch.skoring'):
+            ranked = score_cohort(models[model_name], cohort)
+        metrics.increment('batch.baris', len(cohort))
+    except Exception as e:
+        st.error(f"Error saat melakukan prediksi batch: {str(e)}")
+        return
+    
+    n_students = len(ranked)
+    n_dropout = int((ranked['prediction'] == 1).sum())
+    n_high = int((ranked['risk_level'] == 'Tinggi').sum())
+    
+    # Kode intervensi dihitung sekaligus untuk seluruh kohort (urutan sesuai peringkat)
+    with metrics.timer('batch.intervensi'):
+        masks = assign_interventions(cohort.iloc[ranked['row'].to_numpy()], ranked['prediction'].to_numpy())
+        ranked['intervensi'] = intervention_labels(masks)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Jumlah Mahasiswa", f"{n_students:,}")
+    col2.metric("Diprediksi Dropout", f"{n_dropout:,}", f"{n_dropout / max(n_students, 1):.1%}", delta_color="off")
+    col3.metric("Risiko Tinggi", f"{n_high:,}")
+    
+    st.subheader("Ringkasan Intervensi")
+    counts = intervention_counts(masks)
+    st.dataframe(pd.DataFrame({
+        'Kode': list(counts),
+        'Intervensi': [INTERVENTIONS[code]['name'] for code in counts],
+        'Jumlah Mahasiswa': list(counts.values())
+    }), use_container_width=True, hide_index=True)
+    
+    display_batch_counterfactual(models[model_name], cohort, ranked)
+    
+    st.subheader("Tabel Peringkat Risiko")
+    st.dataframe(ranked.head(500), use_container_width=True, hide_index=True)
+    
+    st.download_button(
+        "Unduh Tabel Risiko (CSV)",
+        data=ranked.to_csv(sep=';', index=False).encode('utf-8'),
+        file_name="peringkat_risiko_dropout.csv",
+        mime="text/csv"
+    )
+    
+    # Hasil skoring dapat ditambahkan ke dashboard analitik sebagai satu sumber;
+    # sumber diberi nama dari isi file sehingga upload ulang tidak dihitung dua kali
+    if st.button("Tambahkan ke Dashboard Analitik"):
+        probabilities = np.empty(n_students)
+        probabilities[ranked['row'].to_numpy()] = ranked['dropout_probability'].to_numpy()
+        source = f"upload:{uploaded_file.name}:{hashlib.sha256(uploaded_file.getvalue()).hexdigest()[:16]}"
+        with metrics.timer('batch.analitik'):
+            get_analytics_store().add_scored(source, cohort, probabilities, model_name)
+        st.success(f"{n_students:,} mahasiswa ditambahkan ke dashboard analitik ({model_name}).")
+
+# Fungsi untuk memuat tabel kohort terskor (dihitung sekali per file dan model,
+# disimpan sebagai Parquet oleh modul cohort). mtime_ns ikut menjadi kunci cache.
+@st.cache_resource
+def load_scored_cohort(path, model_name, mtime_ns):
+    return ScoredCohort.load(path, model_name, model=load_models()[model_name])
+
+# Batas ukuran hasil job yang dapat diunduh langsung dari halaman (byte)
+JOB_DOWNLOAD_LIMIT = 200 * 2**20
+
+# Filter ya/tidak di halaman kohort: kolom -> (label, teks untuk 1, teks untuk 0)
+COHORT_FLAG_FILTERS = {
+    'Debtor': ("Memiliki Hutang", "Ya", "Tidak"),
+    'Scholarship_holder': ("Penerima Beasiswa", "Ya", "Tidak"),
+    'Tuition_fees_up_to_date': ("Biaya Kuliah Lunas", "Ya", "Tidak"),
+    'Gender': ("Jenis Kelamin", "Laki-laki", "Perempuan"),
+    'Displaced': ("Pindahan", "Ya", "Tidak"),
+    'International': ("Mahasiswa Internasional", "Ya", "Tidak")
+}
+
+# Fungsi untuk menampilkan halaman kohort: top-K mahasiswa berisiko dengan filter
+def display_cohort_page(models):
+    st.header("Kohort Mahasiswa Berisiko")
+    st.markdown("""
+    Seluruh kohort diskor sekali dan disimpan sebagai tabel. Pilih filter untuk menampilkan
+    mahasiswa dengan risiko dropout tertinggi, mis. 200 mahasiswa berisiko tertinggi di satu program studi
+    yang memiliki hutang.
+    """)
+    
+    path = os.environ.get('COHORT_PATH', 'Data/students_performance.csv')
+    model_name = st.selectbox(
+        "Model",
+        options=list(models.keys()),
+        index=list(models.keys()).index('Gradient Boosting'),
+        key='cohort_model'
+    )
+    try:
+        with metrics.timer('kohort.muat'):
+            scored = load_scored_cohort(path, model_name, os.stat(path).st_mtime_ns)
+    except Exception as e:
+        st.error(f"Error saat memuat kohort {path}: {str(e)}")
+        return
+    
+    filters = {'Course': st.multiselect("Program Studi (kode Course)", options=scored.values('Course'))}
+    columns = st.columns(3)
+    for i, (column, (label, yes, no)) in enumerate(COHORT_FLAG_FILTERS.items()):
+        choice = columns[i % 3].selectbox(label, options=["Semua", yes, no], key=f'cohort_{column}')
+        if choice != "Semua":
+            filters[column] = [1 if choice == yes else 0]
+    
+    col1, col2 = st.columns(2)
+    k = col1.number_input("Jumlah mahasiswa (K)", min_value=1, max_value=10000, value=200, step=50)
+    min_probability = col2.slider("Probabilitas dropout minimum", 0.0, 1.0, 0.0, 0.05)
+    
+    start = time.perf_counter()
+    with metrics.timer('kohort.kueri'):
+        top = scored.top_k(int(k), filters, min_probability)
+        summary = scored.summary(filters, min_probability)
+    elapsed = time.perf_counter() - start
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Sesuai Filter", f"{summary['students']:,}", f"dari {len(scored):,}", delta_color="off")
+    col2.metric("Diprediksi Dropout", f"{summary['dropout']:,}")
+    col3.metric("Risiko Tinggi", f"{summary['high_risk']:,}")
+    
+    st.subheader(f"{len(top):,} Mahasiswa dengan Risiko Tertinggi")
+    st.dataframe(top, use_container_width=True, hide_index=True)
+    st.caption(f"Kueri {elapsed * 1000:.1f} ms atas {len(scored):,} mahasiswa ({path}, {model_name}).")
+    
+    st.download_button(
+        "Unduh Daftar (CSV)",
+        data=top.to_csv(sep=';', index=False).encode('utf-8'),
+        file_name="kohort_berisiko.csv",
+        mime="text/csv"
+    )
+
+# Fungsi untuk menampilkan dashboard analitik dari store agregat (pengganti Metabase)
+def display_analytics_page(models):
+    st.header("Dashboard Analitik Dropout")
+    st.markdown("""
+    Ringkasan tingkat dropout per kelompok mahasiswa dan distribusi risiko dari model. Agregat
+    disimpan di SQLite dan diperbarui secara inkremental: hanya baris baru pada file kohort yang
+    diskor ulang.
+    """)
+    
+    path = os.environ.get('COHORT_PATH', 'Data/students_performance.csv')
+    model_name = st.selectbox(
+        "Model",
+        options=list(models.keys()),
+        index=list(models.keys()).index('Gradient Boosting'),
+        key='analytics_model'
+    )
+    store = get_analytics_store()
+    try:
+        # Tanpa perubahan file, refresh hanya memeriksa ukuran/mtime
+        with metrics.timer('analitik.refresh'):
+            refreshed = store.refresh(path, model_name, model=models[model_name])
+    except Exception as e:
+        st.error(f"Error saat memperbarui agregat dari {path}: {str(e)}")
+        return
+    if refreshed['rows_added']:
+        st.info(f"{refreshed['rows_added']:,} baris baru dari {path} diagregasi "
+                f"dalam {refreshed['seconds']:.2f} s.")
     
-    st.plotly_chart(fig, use_container_width=True)
+    start = time.perf_counter()
+    with metrics.timer('analitik.kueri'):
+        overview = store.overview(model_name)
+        tables = {name: store.dimension(name, model_name) for name in ANALYTICS_DIMENSIONS}
+        distribution = store.risk_distribution(model_name)
+    elapsed = time.perf_counter() - start
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Jumlah Mahasiswa", f"{overview['students']:,}")
+    col2.metric("Tingkat Dropout Aktual",
+                f"{overview['dropout_rate']:.1%}" if overview['dropout_rate'] is not None else "-")
+    col3.metric("Diprediksi Dropout",
+                f"{overview['predicted_rate']:.1%}" if overview['predicted_rate'] is not None else "-")
+    col4.metric("Risiko Tinggi", f"{overview['high_risk']:,}")
+    
+    px, go = _plotly()
+    with metrics.timer('analitik.grafik'):
+        names = list(ANALYTICS_DIMENSIONS)
+        for i in range(0, len(names), 2):
+            columns = st.columns(2)
+            for column, name in zip(columns, names[i:i + 2]):
+                title = ANALYTICS_DIMENSIONS[name][0]
+                table = tables[name].rename(columns={'dropout_rate': 'Aktual', 'predicted_rate': 'Prediksi'})
+                if table.empty:
+                    continue
+                fig = px.bar(
+                    table, x='label', y=['Aktual', 'Prediksi'], barmode='group',
+                    hover_data={'students': True}, title=f"Tingkat Dropout per {title}",
+                    labels={'label': title, 'value': 'Tingkat Dropout', 'variable': '', 'students': 'Mahasiswa'}
+                )
+                fig.update_layout(height=350, yaxis_tickformat='.0%', xaxis_type='category')
+                column.plotly_chart(fig, use_container_width=True)
+        
+        distribution['Probabilitas'] = [f"{lo:.2f}-{hi:.2f}" for lo, hi in
+                                        zip(distribution['lower'], distribution['upper'])]
+        fig = px.bar(distribution, x='Probabilitas', y='students', title="Distribusi Probabilitas Dropout",
+                     labels={'students': 'Jumlah Mahasiswa'})
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.caption(f"Kueri agregat {elapsed * 1000:.1f} ms dari {store.path} ({model_name}).")
+    with st.expander("Sumber Data"):
+        st.dataframe(store.sources(model_name), use_container_width=True, hide_index=True)
+
+# Fungsi untuk menampilkan halaman job latar belakang: skoring kohort dan pelatihan
+# ulang dijalankan oleh proses worker, halaman hanya menambahkan job dan membaca statusnya
+def display_jobs_page(models):
+    st.header("Job Latar Belakang")
+    st.markdown("""
+    Skoring kohort besar dan pelatihan ulang model dijalankan oleh worker di proses terpisah,
+    sehingga halaman tidak perlu menunggu. Job tetap tersimpan walaupun aplikasi di-restart, dan
+    job skoring yang terputus dilanjutkan dari baris terakhir yang sudah diskor.
+    """)
+    
+    queue = get_job_queue()
+    try:
+        started = ensure_workers(int(os.environ.get('JOBS_WORKERS', 1)), queue.path)
+    except Exception as e:
+        st.error(f"Worker tidak dapat dijalankan: {str(e)}. Jalankan manual dengan `python -m jobs worker`.")
+        started = []
+    if started:
+        st.info(f"{len(started)} worker dijalankan (pid {', '.join(map(str, started))}).")
+    
+    tab1, tab2 = st.tabs(["Skoring Kohort", "Latih Ulang Model"])
+    with tab1:
+        with st.form("job_scoring"):
+            uploaded_file = st.file_uploader("File Kohort (CSV)", type=["csv"])
+            path = st.text_input("Atau path file di server",
+                                 value=os.environ.get('COHORT_PATH', 'Data/students_performance.csv'))
+            model_name = st.selectbox("Model", options=list(models.keys()),
+                                      index=list(models.keys()).index('Gradient Boosting'))
+            submitted = st.form_submit_button("Tambahkan Job Skoring")
+        if submitted:
+            if uploaded_file is not None:
+                # File upload disimpan di direktori antrian agar dapat dibaca worker
+                data = uploaded_file.getvalue()
+                path = os.path.join(queue.jobs_dir, 'uploads', f"{hashlib.sha256(data).hexdigest()[:16]}.csv")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+            if not os.path.exists(path):
+                st.error(f"File {path} tidak ditemukan.")
+            else:
+                job_id = queue.submit('skoring', {'input': os.path.abspath(path), 'model': model_name})
+                st.success(f"Job #{job_id} (skoring {os.path.basename(path)}) ditambahkan ke antrian.")
+    
+    with tab2:
+        with st.form("job_training"):
+            names = st.multiselect("Model", options=list(scoring.MODEL_FILES), default=list(scoring.MODEL_FILES))
+            search = st.selectbox("Pencarian Hyperparameter", options=['halving', 'random', 'grid'])
+            data_path = st.text_input("Data Latih", value='Data/students_performance.csv')
+            submitted = st.form_submit_button("Tambahkan Job Pelatihan")
+        st.caption("Model hasil pelatihan disimpan di direktori job dan tidak menggantikan `models/` secara otomatis.")
+        if submitted:
+            job_id = queue.submit('latih', {'models': names or None, 'search': search,
+                                            'data': os.path.abspath(data_path)})
+            st.success(f"Job #{job_id} (pelatihan {search}) ditambahkan ke antrian.")
+    
+    display_job_status(queue)
+
+# Fungsi untuk menampilkan status job; diperbarui sendiri setiap 2 detik tanpa menjalankan ulang halaman
+@st.fragment(run_every=2)
+def display_job_status(queue):
+    st.subheader("Status Job")
+    job_list = queue.list(limit=20)
+    st.caption(f"{len(queue.live_workers())} worker aktif; status diperbarui otomatis setiap 2 detik.")
+    if not job_list:
+        st.info("Belum ada job.")
+        return
+    
+    now = time.time()
+    st.dataframe(pd.DataFrame({
+        'Job': [job['id'] for job in job_list],
+        'Jenis': [job['kind'] for job in job_list],
+        'Status': [job['status'] for job in job_list],
+        'Progres': [job['progress'] * 100 for job in job_list],
+        'Durasi (s)': [round((job['finished_at'] or now) - job['started_at'], 1) if job['started_at'] else None
+                       for job in job_list],
+        'Pesan': [job['message'] or '' for job in job_list]
+    }), column_config={
+        'Progres': st.column_config.ProgressColumn("Progres", min_value=0, max_value=100, format="%.0f%%")
+    }, use_container_width=True, hide_index=True)
+    
+    job_id = st.selectbox("Rincian Job", options=[job['id'] for job in job_list], format_func=lambda i: f"#{i}")
+    job = next(job for job in job_list if job['id'] == job_id)
+    st.progress(min(job['progress'], 1.0), text=job['message'] or job['status'])
+    
+    summary = (job['partial'] or {}).get('summary')
+    if summary:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Diskor", f"{summary['students']:,}")
+        col2.metric("Diprediksi Dropout", f"{summary['dropout']:,}")
+        col3.metric("Risiko Tinggi", f"{summary['high_risk']:,}")
+    if (job['partial'] or {}).get('top'):
+        label = "Risiko Tertinggi" if job['status'] == 'selesai' else "Risiko Tertinggi Sejauh Ini"
+        st.markdown(f"**{label}**")
+        st.dataframe(pd.DataFrame(job['partial']['top']), use_container_width=True, hide_index=True)
+    
+    if job['status'] in ('antri', 'berjalan') and st.button("Batalkan Job", key=f"cancel_job_{job_id}"):
+        queue.cancel(job_id)
+        st.rerun(scope='fragment')
+    if job['error']:
+        st.error(job['error'])
+    if job['status'] == 'selesai' and job['kind'] == 'latih':
+        st.markdown(f"Model disimpan di `{job['result']['output_dir']}`.")
+        st.dataframe(pd.DataFrame({name: report['test'] for name, report in
+                                   job['result']['report'].get('models', {}).items()
+                                   if 'test' in report}).T, use_container_width=True)
+    if job['status'] == 'selesai' and job['kind'] == 'skoring':
+        output = job['result']['output']
+        st.markdown(f"Hasil skoring: `{output}`")
+        if os.path.exists(output) and os.path.getsize(output) <= JOB_DOWNLOAD_LIMIT:
+            with open(output, 'rb') as f:
+                st.download_button("Unduh Hasil Skoring (CSV)", data=f.read(),
+                                   file_name=f"hasil_skoring_job_{job_id}.csv", mime="text/csv")
 
 # Fungsi untuk menampilkan header
 def display_header():
@@ -375,7 +948,17 @@ def main():
     
     # Sidebar
     st.sidebar.title("Navigasi")
-    page = st.sidebar.radio("Pilih Halaman", ["Prediksi Dropout", "Tentang Sistem"])
+    page = st.sidebar.radio(
+        "Pilih Halaman",
+        ["Prediksi Dropout", "Prediksi Batch", "Kohort Berisiko", "Dashboard Analitik", "Job Latar Belakang",
+         "Tentang Sistem"]
+    )
+    st.sidebar.checkbox(
+        "Mode ringan (koneksi lambat)",
+        value=os.environ.get('LITE_MODE') == '1' or st.query_params.get('lite') == '1',
+        key='lite_mode',
+        help="Grafik hasil prediksi dikirim sebagai spesifikasi ringkas tanpa Plotly"
+    )
     
     # Memuat model dan feature info
     models = load_models()
@@ -841,124 +1424,162 @@ def main():
             # Tombol submit
             submitted = st.form_submit_button("Prediksi Risiko Dropout")
         
-        # Jika form disubmit
-        if submitted:
-            # Menghitung fitur tambahan
-            if curricular_units_1st_sem_enrolled > 0:
-                approval_ratio_1st = curricular_units_1st_sem_approved / curricular_units_1st_sem_enrolled
-            else:
-                approval_ratio_1st = 0
+        # Jika form disubmit (setiap tahap diukur, lihat metrics.py)
+        with metrics.request('prediksi'):
+            if submitted:
+                with metrics.timer('fitur'):
+                    # Menghitung fitur tambahan
+                    if curricular_units_1st_sem_enrolled > 0:
+                        approval_ratio_1st = curricular_units_1st_sem_approved / curricular_units_1st_sem_enrolled
+                    else:
+                        approval_ratio_1st = 0
                 
-            if curricular_units_2nd_sem_enrolled > 0:
-                approval_ratio_2nd = curricular_units_2nd_sem_approved / curricular_units_2nd_sem_enrolled
-            else:
-                approval_ratio_2nd = 0
+                    if curricular_units_2nd_sem_enrolled > 0:
+                        approval_ratio_2nd = curricular_units_2nd_sem_approved / curricular_units_2nd_sem_enrolled
+                    else:
+                        approval_ratio_2nd = 0
                 
-            # Menghitung unit tanpa evaluasi
-            curricular_units_1st_sem_without_evaluations = curricular_units_1st_sem_enrolled - curricular_units_1st_sem_evaluations
-            curricular_units_2nd_sem_without_evaluations = curricular_units_2nd_sem_enrolled - curricular_units_2nd_sem_evaluations
+                    # Menghitung unit tanpa evaluasi
+                    curricular_units_1st_sem_without_evaluations = curricular_units_1st_sem_enrolled - curricular_units_1st_sem_evaluations
+                    curricular_units_2nd_sem_without_evaluations = curricular_units_2nd_sem_enrolled - curricular_units_2nd_sem_evaluations
             
-            # Kumpulkan semua fitur
-            features = {
-                'Marital_status': marital_status,
-                'Application_mode': application_mode,
-                'Application_order': application_order,
-                'Course': course,
-                'Daytime_evening_attendance': daytime_evening_attendance,
-                'Previous_qualification': previous_qualification,
-                'Nationality': nationality,
-                'Nacionality': nationality,  # Duplikasi untuk mengatasi perbedaan nama kolom
-                'Mothers_qualification': mothers_qualification,
-                'Fathers_qualification': fathers_qualification,
-                'Mothers_occupation': mothers_occupation,
-                'Fathers_occupation': fathers_occupation,
-                'Displaced': displaced,
-                'Educational_special_needs': educational_special_needs,
-                'Debtor': debtor,
-                'Tuition_fees_up_to_date': tuition_fees_up_to_date,
-                'Gender': gender,
-                'Scholarship_holder': scholarship_holder,
-                'Age_at_enrollment': age_at_enrollment,
-                'International': international,
-                'Admission_grade': admission_grade,
-                'Previous_qualification_grade': previous_qualification_grade,
-                'Curricular_units_1st_sem_credited': curricular_units_1st_sem_credited,
-                'Curricular_units_1st_sem_enrolled': curricular_units_1st_sem_enrolled,
-                'Curricular_units_1st_sem_evaluations': curricular_units_1st_sem_evaluations,
-                'Curricular_units_1st_sem_approved': curricular_units_1st_sem_approved,
-                'Curricular_units_1st_sem_grade': curricular_units_1st_sem_grade,
-                'Curricular_units_1st_sem_without_evaluations': curricular_units_1st_sem_without_evaluations,
-                'Curricular_units_2nd_sem_credited': curricular_units_2nd_sem_credited,
-                'Curricular_units_2nd_sem_enrolled': curricular_units_2nd_sem_enrolled,
-                'Curricular_units_2nd_sem_evaluations': curricular_units_2nd_sem_evaluations,
-                'Curricular_units_2nd_sem_approved': curricular_units_2nd_sem_approved,
-                'Curricular_units_2nd_sem_grade': curricular_units_2nd_sem_grade,
-                'Curricular_units_2nd_sem_without_evaluations': curricular_units_2nd_sem_without_evaluations,
-                'Unemployment_rate': unemployment_rate,
-                'Inflation_rate': inflation_rate,
-                'GDP': gdp,
-                'approval_ratio_1st': approval_ratio_1st,
-                'approval_ratio_2nd': approval_ratio_2nd
-            }
+                    # Kumpulkan semua fitur
+                    features = {
+                        'Marital_status': marital_status,
+                        'Application_mode': application_mode,
+                        'Application_order': application_order,
+                        'Course': course,
+                        'Daytime_evening_attendance': daytime_evening_attendance,
+                        'Previous_qualification': previous_qualification,
+                        'Nationality': nationality,
+                        'Nacionality': nationality,  # Duplikasi untuk mengatasi perbedaan nama kolom
+                        'Mothers_qualification': mothers_qualification,
+                        'Fathers_qualification': fathers_qualification,
+                        'Mothers_occupation': mothers_occupation,
+                        'Fathers_occupation': fathers_occupation,
+                        'Displaced': displaced,
+                        'Educational_special_needs': educational_special_needs,
+                        'Debtor': debtor,
+                        'Tuition_fees_up_to_date': tuition_fees_up_to_date,
+                        'Gender': gender,
+                        'Scholarship_holder': scholarship_holder,
+                        'Age_at_enrollment': age_at_enrollment,
+                        'International': international,
+                        'Admission_grade': admission_grade,
+                        'Previous_qualification_grade': previous_qualification_grade,
+                        'Curricular_units_1st_sem_credited': curricular_units_1st_sem_credited,
+                        'Curricular_units_1st_sem_enrolled': curricular_units_1st_sem_enrolled,
+                        'Curricular_units_1st_sem_evaluations': curricular_units_1st_sem_evaluations,
+                        'Curricular_units_1st_sem_approved': curricular_units_1st_sem_approved,
+                        'Curricular_units_1st_sem_grade': curricular_units_1st_sem_grade,
+                        'Curricular_units_1st_sem_without_evaluations': curricular_units_1st_sem_without_evaluations,
+                        'Curricular_units_2nd_sem_credited': curricular_units_2nd_sem_credited,
+                        'Curricular_units_2nd_sem_enrolled': curricular_units_2nd_sem_enrolled,
+                        'Curricular_units_2nd_sem_evaluations': curricular_units_2nd_sem_evaluations,
+                        'Curricular_units_2nd_sem_approved': curricular_units_2nd_sem_approved,
+                        'Curricular_units_2nd_sem_grade': curricular_units_2nd_sem_grade,
+                        'Curricular_units_2nd_sem_without_evaluations': curricular_units_2nd_sem_without_evaluations,
+                        'Unemployment_rate': unemployment_rate,
+                        'Inflation_rate': inflation_rate,
+                        'GDP': gdp,
+                        'approval_ratio_1st': approval_ratio_1st,
+                        'approval_ratio_2nd': approval_ratio_2nd
+                    }
             
-            # Gunakan model Gradient Boosting (model terbaik)
-            best_model = models['Gradient Boosting']
-            prediction, probability = predict_dropout(best_model, features)
+                # Simpan fitur agar hasil tetap tampil saat panel what-if diubah
+                st.session_state['features'] = features
+        
+            features = st.session_state.get('features')
+            if features is not None:
+                # Gunakan model Gradient Boosting (model terbaik)
+                best_model = models['Gradient Boosting']
+                with metrics.timer('prediksi_utama'):
+                    prediction, probability = predict_dropout(best_model, features, 'Gradient Boosting')
             
-            # Tampilkan hasil
-            st.header("Hasil Prediksi")
+                # Tampilkan hasil
+                st.header("Hasil Prediksi")
             
-            col1, col2 = st.columns([1, 2])
+                col1, col2 = st.columns([1, 2])
             
-            with col1:
-                # Tampilkan gauge chart
-                plot_dropout_gauge(probability)
+                with col1:
+                    # Tampilkan gauge chart
+                    with metrics.timer('grafik.gauge'):
+                        plot_dropout_gauge(probability)
                 
-                # Tampilkan hasil prediksi
-                if prediction == 1:
-                    st.error("⚠️ **Mahasiswa ini diprediksi AKAN DROPOUT**")
-                else:
-                    st.success("✅ **Mahasiswa ini diprediksi TIDAK AKAN DROPOUT**")
+                    # Tampilkan hasil prediksi
+                    if prediction == 1:
+                        st.error("⚠️ **Mahasiswa ini diprediksi AKAN DROPOUT**")
+                    else:
+                        st.success("✅ **Mahasiswa ini diprediksi TIDAK AKAN DROPOUT**")
                 
-                # Tampilkan perbandingan model
-                st.subheader("Perbandingan Antar Model")
-                plot_model_comparison(models, features)
+                    # Tampilkan perbandingan model
+                    st.subheader("Perbandingan Antar Model")
+                    with metrics.timer('perbandingan_model'):
+                        plot_model_comparison(models, features, {'Gradient Boosting': probability})
             
-            with col2:
-                # Tampilkan rekomendasi
-                st.subheader("Rekomendasi")
-                recommendations = get_recommendations(prediction, probability, features)
-                for rec in recommendations:
-                    st.markdown(rec)
+                with col2:
+                    # Tampilkan rekomendasi
+                    st.subheader("Rekomendasi")
+                    with metrics.timer('rekomendasi'):
+                        recommendations = get_cached_recommendations(prediction, probability, features)
+                    for rec in recommendations:
+                        st.markdown(rec)
+                
+                    # Perubahan minimal menurut model (bukan ambang tetap)
+                    if prediction == 1:
+                        with metrics.timer('counterfactual'):
+                            display_counterfactual(best_model, features, probability)
             
-            # Tampilkan analisis fitur penting
-            st.header("Analisis Fitur Penting")
-            plot_feature_importance(feature_info, features)
+                # Tampilkan analisis fitur penting
+                st.header("Analisis Fitur Penting")
+                with metrics.timer('grafik.importance'):
+                    plot_feature_importance(feature_info)
+                with metrics.timer('grafik.kontribusi'):
+                    plot_feature_contributions(load_explainer('Gradient Boosting'), features)
             
-            # Tampilkan penjelasan tambahan
-            st.header("Penjelasan Hasil")
-            st.markdown("""
-            ### Interpretasi Hasil
+                # Tampilkan analisis what-if
+                with metrics.timer('whatif'):
+                    display_whatif_panel(best_model, features)
             
-            Model prediksi dropout menggunakan algoritma Gradient Boosting yang telah dilatih dengan data historis mahasiswa. 
-            Hasil prediksi didasarkan pada berbagai faktor akademik, demografis, dan sosial-ekonomi.
+                # Tampilkan penjelasan tambahan
+                st.header("Penjelasan Hasil")
+                st.markdown("""
+                ### Interpretasi Hasil
             
-            **Catatan Penting:**
-            - Prediksi ini adalah alat bantu dan tidak menggantikan penilaian profesional
-            - Intervensi dini dapat secara signifikan mengurangi risiko dropout
-            - Faktor-faktor yang tidak tercakup dalam model (seperti motivasi personal, kesehatan mental, dll.) juga dapat mempengaruhi risiko dropout
+                Model prediksi dropout menggunakan algoritma Gradient Boosting yang telah dilatih dengan data historis mahasiswa. 
+                Hasil prediksi didasarkan pada berbagai faktor akademik, demografis, dan sosial-ekonomi.
             
-            ### Fitur Penting dalam Prediksi
+                **Catatan Penting:**
+                - Prediksi ini adalah alat bantu dan tidak menggantikan penilaian profesional
+                - Intervensi dini dapat secara signifikan mengurangi risiko dropout
+                - Faktor-faktor yang tidak tercakup dalam model (seperti motivasi personal, kesehatan mental, dll.) juga dapat mempengaruhi risiko dropout
             
-            Berdasarkan analisis model, beberapa faktor yang paling berpengaruh dalam prediksi dropout adalah:
-            1. Jumlah unit kurikuler yang disetujui di semester kedua
-            2. Status pembayaran biaya kuliah
-            3. Rasio kelulusan di semester kedua
-            4. Jumlah unit kurikuler yang terdaftar di semester kedua
-            5. Usia saat pendaftaran
+                ### Fitur Penting dalam Prediksi
             
-            Intervensi yang ditargetkan pada faktor-faktor ini dapat memberikan dampak terbesar dalam mengurangi risiko dropout.
-            """)
+                Berdasarkan analisis model, beberapa faktor yang paling berpengaruh dalam prediksi dropout adalah:
+                1. Jumlah unit kurikuler yang disetujui di semester kedua
+                2. Status pembayaran biaya kuliah
+                3. Rasio kelulusan di semester kedua
+                4. Jumlah unit kurikuler yang terdaftar di semester kedua
+                5. Usia saat pendaftaran
+            
+                Intervensi yang ditargetkan pada faktor-faktor ini dapat memberikan dampak terbesar dalam mengurangi risiko dropout.
+                """)
+    
+    elif page == "Prediksi Batch":
+        with metrics.request('batch'):
+            display_batch_page(models)
+    
+    elif page == "Kohort Berisiko":
+        with metrics.request('kohort'):
+            display_cohort_page(models)
+    
+    elif page == "Dashboard Analitik":
+        with metrics.request('analitik'):
+            display_analytics_page(models)
+    
+    elif page == "Job Latar Belakang":
+        display_jobs_page(models)
     
     elif page == "Tentang Sistem":
         st.header("Tentang Sistem Prediksi Dropout Mahasiswa")
@@ -1046,6 +1667,9 @@ def main():
         4. Baker, R. S., & Inventado, P. S. (2014). Educational data mining and learning analytics. In Learning analytics (pp. 61-75). Springer, New York, NY.
         """)
     
+    display_cache_stats()
+    display_metrics_panel()
+    
     # Tampilkan footer
     display_footer()
 
@@ -0,0 +1,152 @@
+"""Rekomendasi intervensi berdasarkan hasil prediksi dropout.
+
+Dipisahkan dari prediksi.py agar bisa dipakai tanpa Streamlit (service, CLI).
+
+Aturan intervensi ditulis sebagai tabel (RULES) dan dievaluasi dengan mask
+NumPy untuk seluruh kohort sekaligus. Setiap mahasiswa mendapat satu bitmask
+kode intervensi (uint8); teks Markdown baru dibuat saat ditampilkan.
+"""
+import numpy as np
+import pandas as pd
+
+# Kode intervensi: nama singkat, bit, judul dan isi rekomendasi
+INTERVENTIONS = {
+    'AKD': {
+        'name': 'Intervensi Akademik',
+        'bit': 1 << 0,
+        'title': "🎯 **Intervensi Akademik:**",
+        'items': [
+            "- Berikan dukungan akademik tambahan untuk meningkatkan jumlah unit kurikuler yang disetujui",
+            "- Jadwalkan sesi tutoring khusus untuk mata kuliah yang sulit",
+            "- Pertimbangkan untuk mengurangi beban akademik di semester berikutnya"
+        ]
+    },
+    'KEU': {
+        'name': 'Dukungan Keuangan',
+        'bit': 1 << 1,
+        'title': "💰 **Dukungan Keuangan:**",
+        'items': [
+            "- Tawarkan opsi pembayaran yang lebih fleksibel",
+            "- Informasikan tentang program beasiswa dan bantuan keuangan yang tersedia",
+            "- Sediakan konseling keuangan untuk membantu perencanaan anggaran"
+        ]
+    },
+    'DEM': {
+        'name': 'Dukungan Demografis',
+        'bit': 1 << 2,
+        'title': "👥 **Dukungan Demografis:**",
+        'items': [
+            "- Hubungkan dengan komunitas mahasiswa dewasa",
+            "- Tawarkan jadwal kuliah yang lebih fleksibel",
+            "- Berikan dukungan untuk menyeimbangkan studi dengan tanggung jawab lain"
+        ]
+    },
+    'TLJ': {
+        'name': 'Tindak Lanjut Reguler',
+        'bit': 1 << 3,
+        'title': "🔄 **Tindak Lanjut Reguler:**",
+        'items': [
+            "- Jadwalkan pertemuan rutin dengan penasihat akademik",
+            "- Pantau kemajuan akademik secara berkala",
+            "- Berikan dukungan psikologis jika diperlukan"
+        ]
+    },
+    'PGB': {
+        'name': 'Peningkatan Keberhasilan',
+        'bit': 1 << 4,
+        'title': "🌟 **Rekomendasi untuk Meningkatkan Keberhasilan:**",
+        'items': [
+            "- Dorong partisipasi dalam kegiatan ekstrakurikuler untuk meningkatkan keterlibatan",
+            "- Tawarkan kesempatan untuk menjadi mentor bagi mahasiswa lain",
+            "- Informasikan tentang program pengembangan karir dan magang"
+        ]
+    }
+}
+
+_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+# Tabel aturan: (kelompok prediksi, fitur, operator, ambang, kode intervensi).
+# Fitur yang tidak ada dianggap 0. Fitur None berarti aturan selalu berlaku.
+RULES = [
+    ('dropout', 'Curricular_units_2nd_sem_approved', '<', 3, 'AKD'),
+    ('dropout', 'Tuition_fees_up_to_date', '==', 0, 'KEU'),
+    ('dropout', 'Age_at_enrollment', '>', 25, 'DEM'),
+    ('dropout', None, None, None, 'TLJ'),
+    ('lulus', None, None, None, 'PGB')
+]
+
+
+def _feature_values(features, feature, n):
+    if isinstance(features, pd.DataFrame):
+        if feature in features.columns:
+            return features[feature].to_numpy()
+        return np.zeros(n)
+    return np.full(n, features.get(feature, 0))
+
+
+# Fungsi untuk menghitung bitmask intervensi per mahasiswa. `features` berupa
+# DataFrame (satu baris per mahasiswa) atau dict satu mahasiswa.
+def assign_interventions(features, predictions):
+    predictions = np.atleast_1d(np.asarray(predictions))
+    n = len(predictions)
+    groups = {'dropout': predictions == 1, 'lulus': predictions != 1}
+    masks = np.zeros(n, dtype=np.uint8)
+
+    for group, feature, op, threshold, code in RULES:
+        applies = groups[group]
+        if feature is not None:
+            applies = applies & _OPERATORS[op](_feature_values(features, feature, n), threshold)
+        masks |= np.where(applies, INTERVENTIONS[code]['bit'], 0).astype(np.uint8)
+    return masks
+
+
+# Fungsi untuk mengubah bitmask menjadi daftar kode, mis. ['AKD', 'TLJ']
+def decode_interventions(mask):
+    return [code for code, info in INTERVENTIONS.items() if int(mask) & info['bit']]
+
+
+# Kode intervensi sebagai teks ringkas untuk tabel, mis. 'AKD,TLJ'
+def intervention_labels(masks):
+    masks = np.asarray(masks)
+    unique, inverse = np.unique(masks, return_inverse=True)
+    labels = np.array([','.join(decode_interventions(m)) for m in unique], dtype=object)
+    return labels[inverse]
+
+
+# Jumlah mahasiswa per kode intervensi
+def intervention_counts(masks):
+    masks = np.asarray(masks)
+    return {code: int(np.count_nonzero(masks & info['bit'])) for code, info in INTERVENTIONS.items()}
+
+
+# Fungsi untuk membuat teks rekomendasi Markdown dari bitmask
+def render_recommendations(prediction, probability, mask):
+    recommendations = []
+
+    if prediction == 1:
+        risk_level = "Tinggi" if probability > 0.75 else "Sedang"
+        recommendations.append(f"**Tingkat Risiko Dropout: {risk_level} ({probability:.2%})**")
+        recommendations.append("---")
+    else:
+        recommendations.append(f"**Tingkat Risiko Dropout: Rendah ({probability:.2%})**")
+        recommendations.append("---")
+        recommendations.append("✅ **Mahasiswa ini diprediksi akan menyelesaikan studi dengan baik.**")
+
+    for code in decode_interventions(mask):
+        recommendations.append(INTERVENTIONS[code]['title'])
+        recommendations.extend(INTERVENTIONS[code]['items'])
+
+    return recommendations
+
+
+# Fungsi untuk menampilkan rekomendasi berdasarkan prediksi dan fitur
+def get_recommendations(prediction, probability, features):
+    mask = assign_interventions(features, [prediction])[0]
+    return render_recommendations(prediction, probability, mask)
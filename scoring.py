@@ -0,0 +1,380 @@
+"""Skoring batch risiko dropout untuk satu kohort mahasiswa.
+
+Modul ini tidak bergantung pada Streamlit sehingga bisa dipakai oleh aplikasi
+maupun dari command line, misalnya:
+
+    python -m scoring Data/students_performance.csv -o hasil_risiko.csv
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import weakref
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import ingest
+
+# Lokasi artefak model hasil notebook
+MODEL_FILES = {
+    'Decision Tree': 'models/decision_tree_model.joblib',
+    'Random Forest': 'models/random_forest_model.joblib',
+    'Gradient Boosting': 'models/gradient_boosting_model.joblib'
+}
+DEFAULT_MODEL = 'Gradient Boosting'
+
+# Model opsional hasil `python -m train` (tidak dilatih di notebook). Dipakai
+# hanya jika file artefaknya ada.
+OPTIONAL_MODEL_FILES = {
+    'Hist Gradient Boosting': 'models/hist_gradient_boosting_model.joblib'
+}
+ALL_MODEL_FILES = {**MODEL_FILES, **OPTIONAL_MODEL_FILES}
+
+# Ambang yang sama dengan predict() (kelas 1 jika probabilitas > 0.5)
+# dan dengan batas risiko "Tinggi" pada get_recommendations
+DROPOUT_THRESHOLD = 0.5
+HIGH_RISK_THRESHOLD = 0.75
+
+FEATURE_INFO_FILE = 'models/feature_info.joblib'
+# Versi skema feature_info (importance per model, dikunci nama keluaran
+# ColumnTransformer seperti 'num__Age_at_enrollment'); ditulis oleh train.py
+FEATURE_INFO_VERSION = 2
+
+RANKED_COLUMNS = ['rank', 'row', 'dropout_probability', 'prediction', 'risk_level']
+STREAM_COLUMNS = ['row', 'dropout_probability', 'prediction', 'risk_level']
+DEFAULT_CHUNKSIZE = 100000
+
+
+# Fungsi untuk memuat satu model tanpa dependensi UI. Artefak divalidasi
+# terhadap models/manifest.json; ModelStoreError jika tidak cocok.
+def load_model(name):
+    if name not in ALL_MODEL_FILES:
+        raise KeyError(f"Model tidak dikenal: {name}")
+    import model_store
+    return model_store.load_model(name)
+
+
+# Nama model yang tersedia: tiga model notebook ditambah model opsional yang
+# file artefaknya sudah ada
+def available_models():
+    return list(MODEL_FILES) + [name for name, path in OPTIONAL_MODEL_FILES.items()
+                                if os.path.exists(path)]
+
+
+# Fungsi untuk memuat beberapa model sekaligus (default: semua model yang tersedia)
+def load_models(names=None):
+    names = available_models() if names is None else names
+    return {name: load_model(name) for name in names}
+
+
+def load_feature_info():
+    import model_store
+    return model_store.load_feature_info()
+
+
+# Importance satu model dari feature_info sebagai DataFrame (Feature,
+# Importance, dan Std untuk permutation), urut dari yang terpenting.
+# kind: 'permutation' atau 'impurity'.
+def feature_importances(feature_info, model_name=DEFAULT_MODEL, kind='permutation'):
+    entry = feature_info['models'].get(model_name)
+    if entry is None or entry.get(kind) is None:
+        raise KeyError(f"Importance '{kind}' untuk model '{model_name}' belum dihitung")
+    values = entry[kind]['mean'] if kind == 'permutation' else entry[kind]
+    frame = pd.DataFrame({'Feature': list(values), 'Importance': list(values.values())})
+    if kind == 'permutation':
+        frame['Std'] = [entry[kind]['std'][name] for name in frame['Feature']]
+    return frame.sort_values('Importance', ascending=False, kind='stable').reset_index(drop=True)
+
+
+# Skema fitur masukan sebuah pipeline (nama kolom dan kelompoknya)
+def feature_schema(model):
+    schema = {'columns': list(model.feature_names_in_)}
+    preprocessor = getattr(model, 'named_steps', {}).get('preprocessor')
+    for name, _, columns in getattr(preprocessor, 'transformers_', []):
+        if name in ('num', 'cat'):
+            key = 'numeric_features' if name == 'num' else 'categorical_features'
+            schema[key] = list(columns)
+    return schema
+
+
+# Fungsi untuk membaca kohort dengan skema tipe data ingest. Path file dilayani
+# dari cache Parquet; file upload dibaca langsung dari CSV.
+def read_cohort(source):
+    if isinstance(source, (str, os.PathLike)):
+        return ingest.load_cohort(os.fspath(source))
+    return ingest.read_csv(source)
+
+
+# Fungsi untuk menambahkan fitur turunan seperti pada form di main()
+def add_derived_features(df):
+    df = df.copy()
+
+    for sem in ('1st', '2nd'):
+        enrolled = df[f'Curricular_units_{sem}_sem_enrolled']
+        approved = df[f'Curricular_units_{sem}_sem_approved']
+        evaluations = df[f'Curricular_units_{sem}_sem_evaluations']
+
+        ratio = approved / enrolled.where(enrolled > 0)
+        df[f'approval_ratio_{sem}'] = ratio.fillna(0)
+
+        without_col = f'Curricular_units_{sem}_sem_without_evaluations'
+        if without_col not in df.columns:
+            df[without_col] = enrolled - evaluations
+
+    # Nama kolom pada dataset asli adalah 'Nacionality'
+    if 'Nacionality' not in df.columns and 'Nationality' in df.columns:
+        df['Nacionality'] = df['Nationality']
+
+    return df
+
+
+# Kolom yang dihitung oleh add_derived_features beserta kolom sumbernya
+DERIVED_FEATURES = {
+    'approval_ratio_1st': ['Curricular_units_1st_sem_approved', 'Curricular_units_1st_sem_enrolled'],
+    'approval_ratio_2nd': ['Curricular_units_2nd_sem_approved', 'Curricular_units_2nd_sem_enrolled'],
+    'Curricular_units_1st_sem_without_evaluations': ['Curricular_units_1st_sem_enrolled',
+                                                     'Curricular_units_1st_sem_evaluations'],
+    'Curricular_units_2nd_sem_without_evaluations': ['Curricular_units_2nd_sem_enrolled',
+                                                     'Curricular_units_2nd_sem_evaluations']
+}
+
+
+# Fungsi untuk mencari kolom masukan yang belum tersedia (sebelum fitur turunan dihitung)
+def missing_input_columns(model, columns):
+    columns = set(columns)
+    if 'Nationality' in columns:
+        columns.add('Nacionality')
+
+    missing = []
+    for col in model.feature_names_in_:
+        if col in columns:
+            continue
+        sources = DERIVED_FEATURES.get(col)
+        if sources is None:
+            missing.append(col)
+        else:
+            missing.extend(src for src in sources if src not in columns and src not in missing)
+    return missing
+
+
+# Fungsi untuk memilih kolom sesuai urutan yang dipakai saat pelatihan
+def select_model_features(model, df):
+    columns = list(getattr(model, 'feature_names_in_', df.columns))
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom berikut tidak ditemukan pada data: {', '.join(missing)}")
+    return df[columns]
+
+
+# Fungsi untuk menghitung probabilitas dropout seluruh baris sekaligus
+def predict_proba_batch(model, df):
+    return model.predict_proba(select_model_features(model, df))[:, 1]
+
+
+# Sidik jari preprocessor per pipeline (disimpan agar hash tidak dihitung ulang)
+_preprocessor_keys = weakref.WeakKeyDictionary()
+
+
+def preprocessor_key(model):
+    steps = getattr(model, 'named_steps', None)
+    if not steps or 'preprocessor' not in steps or 'classifier' not in steps:
+        return None
+    try:
+        return _preprocessor_keys[model]
+    except KeyError:
+        key = joblib.hash(steps['preprocessor'])
+        _preprocessor_keys[model] = key
+        return key
+
+
+# Fungsi untuk menskor beberapa model sekaligus. Pipeline dengan preprocessor
+# identik (sidik jari sama) berbagi satu hasil transform, sehingga N model cukup
+# satu kali preprocessing per kelompok ditambah N evaluasi estimator. Probabilitas
+# yang sudah dihitung (mis. model utama di main()) dapat diberikan lewat `known`.
+def score_models(models, df, known=None):
+    known = known or {}
+    transformed = {}
+    results = {}
+
+    # Model hanya diambil jika belum diketahui (registry lazy tidak perlu memuatnya)
+    for name in models:
+        if name in known:
+            results[name] = np.atleast_1d(np.asarray(known[name], dtype=float))
+            continue
+
+        model = models[name]
+        key = preprocessor_key(model)
+        if key is None:
+            results[name] = predict_proba_batch(model, df)
+            continue
+
+        if key not in transformed:
+            preprocessor = model.named_steps['preprocessor']
+            transformed[key] = preprocessor.transform(select_model_features(model, df))
+        results[name] = model.named_steps['classifier'].predict_proba(transformed[key])[:, 1]
+
+    return results
+
+
+# Label diturunkan dari probabilitas agar tree tidak ditelusuri dua kali
+def labels_from_proba(probabilities):
+    return (np.asarray(probabilities) > DROPOUT_THRESHOLD).astype(np.int8)
+
+
+def risk_levels_from_proba(probabilities):
+    probabilities = np.asarray(probabilities)
+    return np.select(
+        [probabilities > HIGH_RISK_THRESHOLD, probabilities > DROPOUT_THRESHOLD],
+        ['Tinggi', 'Sedang'],
+        default='Rendah'
+    )
+
+
+# Fungsi untuk membuat tabel risiko yang diurutkan dari probabilitas tertinggi
+def rank_risk(probabilities):
+    probabilities = np.asarray(probabilities, dtype=float)
+    order = np.argsort(-probabilities, kind='stable')
+    ranked = probabilities[order]
+
+    return pd.DataFrame({
+        'rank': np.arange(1, len(order) + 1),
+        'row': order,
+        'dropout_probability': ranked,
+        'prediction': labels_from_proba(ranked),
+        'risk_level': risk_levels_from_proba(ranked)
+    })
+
+
+# Fungsi utama skoring batch: satu kali predict_proba per model
+def score_cohort(model, df):
+    features = add_derived_features(df)
+    probabilities = predict_proba_batch(model, features)
+    return rank_risk(probabilities)
+
+
+# Fungsi untuk menggabungkan kandidat top-N dengan urutan yang sama seperti
+# rank_risk (probabilitas menurun, nomor baris menaik untuk nilai yang sama)
+def _merge_top(rows, probabilities, top):
+    order = np.lexsort((rows, -probabilities))[:top]
+    return rows[order], probabilities[order]
+
+
+# Fungsi skoring streaming untuk file yang lebih besar dari RAM. CSV dibaca per
+# chunk, setiap chunk diskor lalu langsung ditulis ke `output`, sehingga memori
+# puncak bergantung pada chunksize, bukan ukuran file. Tanpa `top`, keluaran
+# mengikuti urutan baris masukan (STREAM_COLUMNS); dengan `top`, hanya N baris
+# berisiko tertinggi yang disimpan dan ditulis sebagai tabel peringkat.
+#
+# `progress(summary, rows, probabilities)` dipanggil setelah setiap chunk ditulis.
+# `resume` (ringkasan dari progress terakhir) melanjutkan skoring tanpa `top`:
+# baris yang sudah diskor dilewati dan header tidak ditulis ulang.
+def score_stream(model, source, output, chunksize=DEFAULT_CHUNKSIZE, top=None, progress=None, resume=None):
+    if resume is not None and top is not None:
+        raise ValueError("resume hanya didukung tanpa top")
+    summary = dict(resume) if resume else {'students': 0, 'dropout': 0, 'high_risk': 0, 'chunks': 0}
+    top_rows = np.empty(0, dtype=np.int64)
+    top_probabilities = np.empty(0, dtype=float)
+
+    skip = {'skiprows': range(1, summary['students'] + 1)} if summary['students'] else {}
+    for chunk in ingest.iter_csv(source, chunksize, **skip):
+        probabilities = predict_proba_batch(model, add_derived_features(chunk))
+        rows = np.arange(summary['students'], summary['students'] + len(chunk))
+        labels = labels_from_proba(probabilities)
+
+        if top is None:
+            pd.DataFrame({
+                'row': rows,
+                'dropout_probability': probabilities,
+                'prediction': labels,
+                'risk_level': risk_levels_from_proba(probabilities)
+            }).to_csv(output, sep=';', index=False, header=summary['chunks'] == 0)
+        else:
+            top_rows, top_probabilities = _merge_top(
+                np.concatenate([top_rows, rows]),
+                np.concatenate([top_probabilities, probabilities]),
+                top
+            )
+
+        summary['students'] += len(chunk)
+        summary['dropout'] += int(labels.sum())
+        summary['high_risk'] += int((probabilities > HIGH_RISK_THRESHOLD).sum())
+        summary['chunks'] += 1
+        if progress is not None:
+            progress(summary, rows, probabilities)
+
+    if top is not None:
+        ranked = rank_risk(top_probabilities)
+        ranked['row'] = top_rows[ranked['row'].to_numpy()]
+        ranked.to_csv(output, sep=';', index=False)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m scoring',
+        description='Skoring batch risiko dropout untuk file kohort (CSV, pemisah ;).'
+    )
+    parser.add_argument('input', help='File CSV kohort mahasiswa')
+    parser.add_argument('-o', '--output', default='-',
+                        help="File tujuan tabel risiko (default '-' = stdout)")
+    parser.add_argument('-m', '--model', default=DEFAULT_MODEL, choices=list(ALL_MODEL_FILES),
+                        help='Model yang digunakan (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=None,
+                        help='Hanya tulis N mahasiswa dengan risiko tertinggi')
+    parser.add_argument('--engine', default='sklearn', choices=['sklearn', 'compiled'],
+                        help="'compiled' memakai mesin tree NumPy dari tree_engine (default: %(default)s)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Skor file per N baris dan tulis hasil secara bertahap (untuk file besar)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Jumlah proses worker untuk skoring paralel (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.jobs > 1:
+        from parallel_scoring import ParallelScorer
+        model = ParallelScorer(args.model, n_jobs=args.jobs, engine=args.engine)
+    elif args.engine == 'compiled':
+        from model_store import load_compiled
+        model = load_compiled(args.model)
+    else:
+        model = load_model(args.model)
+    try:
+        return _score_file(args, model, start)
+    finally:
+        if args.jobs > 1:
+            model.close()
+
+
+# Bagian CLI setelah model dimuat: mode streaming atau skoring penuh
+def _score_file(args, model, start):
+    output = sys.stdout if args.output == '-' else args.output
+    if args.chunksize is not None:
+        opened = open(output, 'w', newline='') if isinstance(output, str) else contextlib.nullcontext(output)
+        with opened as out:
+            summary = score_stream(model, args.input, out, chunksize=args.chunksize, top=args.top)
+        elapsed = time.perf_counter() - start
+        print(f"{summary['students']} mahasiswa diskor dengan {args.model} dalam {elapsed:.2f} detik "
+              f"({summary['chunks']} chunk, {summary['dropout']} diprediksi dropout, "
+              f"{summary['high_risk']} risiko tinggi)", file=sys.stderr)
+        return 0
+
+    cohort = read_cohort(args.input)
+    ranked = score_cohort(model, cohort)
+    elapsed = time.perf_counter() - start
+
+    if args.top is not None:
+        ranked = ranked.head(args.top)
+
+    ranked.to_csv(output, sep=';', index=False)
+
+    n_dropout = int((ranked['prediction'] == 1).sum())
+    print(f"{len(cohort)} mahasiswa diskor dengan {args.model} dalam {elapsed:.2f} detik "
+          f"({n_dropout} diprediksi dropout pada tabel keluaran)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Layanan HTTP lokal untuk prediksi dropout dengan micro-batching.
+
+Permintaan yang datang bersamaan dikumpulkan menjadi batch kecil dan diskor
+dengan satu kali predict_proba per batch. Contoh menjalankan:
+
+    python -m service --port 8000
+
+Contoh permintaan:
+
+    curl -X POST localhost:8000/predict -d '{"students": [{...fitur...}]}'
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import scoring
+from recommendations import get_recommendations
+
+
+# Fungsi untuk mengonversi nilai fitur satu mahasiswa menjadi numerik. Nilai yang
+# tidak dapat dikonversi menimbulkan ValueError dengan nama kolomnya.
+def coerce_student(model, student):
+    inputs = set(model.feature_names_in_) | {'Nationality'}
+    for sources in scoring.DERIVED_FEATURES.values():
+        inputs.update(sources)
+
+    coerced = dict(student)
+    for col, value in student.items():
+        if col not in inputs:
+            continue
+        try:
+            number = pd.to_numeric(value, errors='raise')
+        except (ValueError, TypeError):
+            number = None
+        if number is None or np.ndim(number) != 0:
+            raise ValueError(f"Nilai kolom {col} bukan angka: {value!r}")
+        coerced[col] = number
+    return coerced
+
+
+class MicroBatcher:
+    """Mengumpulkan permintaan skoring dan menjalankannya per batch.
+
+    Batch dikirim ke model jika sudah berisi ``max_batch_size`` mahasiswa atau
+    ``max_wait_ms`` milidetik telah berlalu sejak permintaan pertama masuk.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self.n_batches = 0
+        self.n_students = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    # Mengirim daftar fitur mahasiswa, hasilnya berupa Future berisi probabilitas.
+    # Kolom dan tipe nilai divalidasi di sini agar satu permintaan rusak tidak
+    # menggagalkan batch; baris yang sudah dikonversi tersedia di `future.students`
+    def submit(self, students):
+        future = Future()
+        future.students = []
+        missing = set()
+        for student in students:
+            missing.update(scoring.missing_input_columns(self.model, student))
+
+        if missing:
+            future.set_exception(ValueError(
+                f"Kolom berikut tidak ditemukan pada data: {', '.join(sorted(missing))}"))
+            return future
+        try:
+            students = [coerce_student(self.model, student) for student in students]
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+
+        future.students = students
+        if not students:
+            future.set_result([])
+        else:
+            self._queue.put((students, future))
+        return future
+
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        pending = [first]
+        size = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self):
+        while not self._stopped.is_set():
+            pending = self._collect()
+            if not pending:
+                continue
+
+            rows = [student for students, _ in pending for student in students]
+            try:
+                probabilities = self._score(rows)
+            except Exception:
+                # Batch gagal: skor ulang per permintaan agar hanya permintaan
+                # yang bermasalah yang menerima exception
+                for students, future in pending:
+                    try:
+                        future.set_result(self._score(students).tolist())
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+
+            self.n_batches += 1
+            self.n_students += len(rows)
+
+            offset = 0
+            for students, future in pending:
+                future.set_result(probabilities[offset:offset + len(students)].tolist())
+                offset += len(students)
+
+    def _score(self, rows):
+        features = scoring.add_derived_features(pd.DataFrame(rows))
+        return scoring.predict_proba_batch(self.model, features)
+
+
+# Fungsi untuk menyusun hasil per mahasiswa beserta rekomendasinya
+def build_results(students, probabilities):
+    predictions = scoring.labels_from_proba(probabilities)
+    risk_levels = scoring.risk_levels_from_proba(probabilities)
+
+    results = []
+    for student, probability, prediction, risk_level in zip(students, probabilities, predictions, risk_levels):
+        results.append({
+            'dropout_probability': probability,
+            'prediction': int(prediction),
+            'risk_level': str(risk_level),
+            'recommendations': get_recommendations(prediction, probability, student)
+        })
+    return results
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    # Diisi oleh make_server
+    batcher = None
+    model_name = None
+    request_timeout = 30.0
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'Endpoint tidak ditemukan'})
+            return
+        self._send_json(200, {
+            'status': 'ok',
+            'model': self.model_name,
+            'batches': self.batcher.n_batches,
+            'students': self.batcher.n_students
+        })
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'Endpoint tidak ditemukan'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {'error': 'Body harus berupa JSON'})
+            return
+
+        # Terima {"students": [...]} atau satu objek fitur mahasiswa
+        students = payload.get('students', [payload]) if isinstance(payload, dict) else payload
+        if not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+            self._send_json(400, {'error': "Format tidak valid, gunakan {\"students\": [{...}]}"})
+            return
+
+        try:
+            future = self.batcher.submit(students)
+            probabilities = future.result(timeout=self.request_timeout)
+        except (KeyError, ValueError) as e:
+            self._send_json(422, {'error': f"Fitur tidak lengkap atau tidak valid: {str(e)}"})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"Error making prediction: {str(e)}"})
+            return
+
+        # Rekomendasi dibuat dari baris yang sudah dikonversi (mis. "2" -> 2)
+        try:
+            results = build_results(future.students, probabilities)
+        except Exception as e:
+            self._send_json(500, {'error': f"Error making recommendations: {str(e)}"})
+            return
+        self._send_json(200, {'model': self.model_name, 'results': results})
+
+    def log_message(self, format, *args):
+        # Log per permintaan dimatikan agar tidak membebani hot path
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog default (5) membuat koneksi bersamaan tertahan oleh retry SYN
+    request_queue_size = 128
+
+
+def make_server(host='127.0.0.1', port=8000, model_name=scoring.DEFAULT_MODEL,
+                max_batch_size=64, max_wait_ms=5.0):
+    model = scoring.load_model(model_name)
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms).start()
+
+    handler = type('BoundPredictionHandler', (PredictionHandler,), {
+        'batcher': batcher,
+        'model_name': model_name
+    })
+    return PredictionServer((host, port), handler), batcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m service', description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('-m', '--model', default=scoring.DEFAULT_MODEL, choices=list(scoring.ALL_MODEL_FILES))
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    server, batcher = make_server(args.host, args.port, args.model,
+                                  args.max_batch_size, args.max_wait_ms)
+    print(f"Melayani {args.model} di http://{args.host}:{args.port} (POST /predict, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
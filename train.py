@@ -0,0 +1,481 @@
+"""Pelatihan ulang model prediksi dropout dari command line.
+
+Menggantikan sel pelatihan di notebook.ipynb dengan pipeline dan grid parameter
+yang sama, tetapi:
+- fitur turunan dihitung dengan scoring.add_derived_features (sama dengan
+  aplikasi), bukan approved/evaluations seperti di notebook;
+- hasil fit preprocessor per fold di-cache (Pipeline memory=) sehingga tidak
+  diulang untuk setiap kombinasi parameter;
+- selain grid penuh tersedia successive halving dan randomized search;
+- impurity dan permutation importance setiap model dihitung sekali di sini
+  dan disimpan ke models/feature_info.joblib (aplikasi hanya membacanya).
+
+    python -m train --search halving
+    python -m train --search grid --models "Decision Tree" --output-dir /tmp/models
+
+Mode inkremental (--incremental) menambah tree Random Forest dan stage
+Gradient Boosting yang dilatih hanya pada data semester baru (warm_start),
+dengan preprocessor lama dibekukan. Model baru hanya menggantikan model lama
+jika F1 pada potongan holdout data baru tidak turun:
+
+    python -m train --incremental Data/semester_baru.csv --add-estimators 20
+
+Importance model yang sudah ada dapat dihitung ulang tanpa pelatihan:
+
+    python -m train --importances
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import (GradientBoostingClassifier, HistGradientBoostingClassifier,
+                              RandomForestClassifier)
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import (GridSearchCV, HalvingGridSearchCV,
+                                     RandomizedSearchCV, train_test_split)
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+import ingest
+import model_store
+import scoring
+
+DATA_FILE = 'Data/students_performance.csv'
+REPORT_FILE = 'training_report.json'
+INCREMENTAL_REPORT_FILE = 'incremental_report.json'
+RANDOM_STATE = 42
+# Jumlah pengacakan per kolom untuk permutation importance
+IMPORTANCE_REPEATS = 10
+
+# Grid parameter dari notebook
+PARAM_GRIDS = {
+    'Decision Tree': {
+        'classifier__max_depth': [5, 10, 15, 20, None],
+        'classifier__min_samples_split': [2, 5, 10],
+        'classifier__min_samples_leaf': [1, 2, 4],
+        'classifier__criterion': ['gini', 'entropy']
+    },
+    'Random Forest': {
+        'classifier__n_estimators': [50, 100, 200],
+        'classifier__max_depth': [10, 20, None],
+        'classifier__min_samples_split': [2, 5, 10],
+        'classifier__min_samples_leaf': [1, 2, 4]
+    },
+    'Gradient Boosting': {
+        'classifier__n_estimators': [50, 100],
+        'classifier__learning_rate': [0.1],
+        'classifier__max_depth': [3, 5]
+    },
+    'Hist Gradient Boosting': {
+        'classifier__max_iter': [100, 200],
+        'classifier__learning_rate': [0.05, 0.1],
+        'classifier__max_leaf_nodes': [15, 31],
+        'classifier__l2_regularization': [0.0, 1.0]
+    }
+}
+
+SEARCHES = ['grid', 'halving', 'random']
+
+# Model yang mendukung warm_start (Decision Tree harus dilatih ulang penuh)
+INCREMENTAL_MODELS = ['Random Forest', 'Gradient Boosting']
+
+
+# Fungsi untuk memuat data latih: fitur (dengan fitur turunan) dan target biner
+def load_training_data(path=DATA_FILE):
+    df = scoring.add_derived_features(ingest.load_cohort(path))
+    y = (df['Status'] == 'Dropout').astype(int)
+    X = df.drop(columns=['Status'])
+    return X, y
+
+
+# Fungsi untuk membuat pipeline dengan struktur yang sama seperti di notebook.
+# Hist Gradient Boosting menangani nilai hilang sendiri dan tidak butuh skala,
+# sehingga preprocessor-nya hanya passthrough (nama langkah tetap 'preprocessor').
+def build_pipeline(name, numeric_features, categorical_features=(), memory=None):
+    categorical_features = list(categorical_features)
+    if name == 'Hist Gradient Boosting':
+        preprocessor = ColumnTransformer(transformers=[
+            ('num', 'passthrough', numeric_features + categorical_features)
+        ])
+        classifier = HistGradientBoostingClassifier(random_state=RANDOM_STATE)
+    elif name == 'Gradient Boosting':
+        preprocessor = ColumnTransformer(transformers=[
+            ('num', Pipeline([
+                ('imputer', SimpleImputer(strategy='mean')),
+                ('scaler', StandardScaler())
+            ]), numeric_features),
+            ('cat', Pipeline([
+                ('imputer', SimpleImputer(strategy='most_frequent')),
+                ('encoder', OneHotEncoder(handle_unknown='ignore'))
+            ]), categorical_features)
+        ])
+        classifier = GradientBoostingClassifier(random_state=RANDOM_STATE)
+    else:
+        preprocessor = ColumnTransformer(transformers=[
+            ('num', StandardScaler(), numeric_features),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+        ])
+        if name == 'Decision Tree':
+            classifier = DecisionTreeClassifier(random_state=RANDOM_STATE)
+        elif name == 'Random Forest':
+            classifier = RandomForestClassifier(random_state=RANDOM_STATE)
+        else:
+            raise KeyError(f"Model tidak dikenal: {name}")
+
+    return Pipeline([('preprocessor', preprocessor), ('classifier', classifier)], memory=memory)
+
+
+# Fungsi untuk membuat objek pencarian hyperparameter
+def build_search(pipeline, param_grid, search='grid', n_iter=20, cv=5, n_jobs=-1):
+    common = {'cv': cv, 'scoring': 'f1', 'n_jobs': n_jobs}
+    if search == 'grid':
+        return GridSearchCV(pipeline, param_grid, **common)
+    if search == 'halving':
+        return HalvingGridSearchCV(pipeline, param_grid, factor=3, random_state=RANDOM_STATE, **common)
+    if search == 'random':
+        return RandomizedSearchCV(pipeline, param_grid, n_iter=n_iter,
+                                  random_state=RANDOM_STATE, **common)
+    raise ValueError(f"Metode pencarian tidak dikenal: {search}")
+
+
+def evaluate(model, X_test, y_test):
+    probabilities = scoring.predict_proba_batch(model, X_test)
+    predictions = scoring.labels_from_proba(probabilities)
+    return {
+        'f1': f1_score(y_test, predictions),
+        'accuracy': accuracy_score(y_test, predictions),
+        'roc_auc': roc_auc_score(y_test, probabilities)
+    }
+
+
+# Nama keluaran ColumnTransformer ('num__<kolom>') untuk setiap kolom masukan.
+# Sama dengan get_feature_names_out untuk transformer 1:1 (semua model saat ini).
+def output_feature_names(model):
+    names = {}
+    for name, transformer, columns in model.named_steps['preprocessor'].transformers_:
+        if name == 'remainder' or len(columns) == 0:
+            continue
+        names.update({column: f'{name}__{column}' for column in columns})
+    return names
+
+
+def _f1(model, X, y):
+    return f1_score(y, scoring.labels_from_proba(scoring.predict_proba_batch(model, X)))
+
+
+# F1 untuk setiap ulangan pengacakan satu kolom (satu seed per ulangan)
+def _permuted_f1(model, X, y, column, seeds):
+    X_permuted = X.copy()
+    values = X[column].to_numpy()
+    scores = []
+    for seed in seeds:
+        X_permuted[column] = np.random.RandomState(seed).permutation(values)
+        scores.append(_f1(model, X_permuted, y))
+    return scores
+
+
+# Permutation importance: penurunan F1 saat satu kolom diacak. Setiap kolom
+# adalah satu tugas joblib yang menjalankan semua ulangannya, sehingga model
+# dan data hanya dikirim ke worker sekali per kolom. Seed ditentukan di awal
+# agar hasil tidak bergantung pada urutan eksekusi.
+def permutation_importances(model, X, y, n_repeats=IMPORTANCE_REPEATS, n_jobs=-1,
+                            random_state=RANDOM_STATE):
+    baseline = _f1(model, X, y)
+    columns = list(model.feature_names_in_)
+    seeds = np.random.RandomState(random_state).randint(0, 2**31 - 1, size=(len(columns), n_repeats))
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permuted_f1)(model, X, y, column, seeds[i]) for i, column in enumerate(columns)
+    )
+    drops = baseline - np.asarray(scores)
+    names = output_feature_names(model)
+    return {
+        'baseline_f1': float(baseline),
+        'mean': {names[column]: float(drop) for column, drop in zip(columns, drops.mean(axis=1))},
+        'std': {names[column]: float(drop) for column, drop in zip(columns, drops.std(axis=1))}
+    }
+
+
+# Impurity importance (feature_importances_) per nama keluaran preprocessor;
+# None untuk model tanpa atribut ini (Hist Gradient Boosting)
+def impurity_importances(model):
+    classifier = model.named_steps['classifier']
+    if not hasattr(classifier, 'feature_importances_'):
+        return None
+    names = model.named_steps['preprocessor'].get_feature_names_out()
+    return {name: float(value) for name, value in zip(names, classifier.feature_importances_)}
+
+
+# Fungsi untuk menghitung importance model lalu menyimpannya ke feature_info
+# (skema scoring.FEATURE_INFO_VERSION). Entri model lain di file yang sama
+# dipertahankan; setiap entri mencatat checksum artefak modelnya.
+def update_feature_info(output_dir, models, X_eval, y_eval, n_repeats=IMPORTANCE_REPEATS, n_jobs=-1):
+    path = os.path.join(output_dir, os.path.basename(scoring.FEATURE_INFO_FILE))
+    feature_info = joblib.load(path) if os.path.exists(path) else {}
+    if feature_info.get('schema_version') != scoring.FEATURE_INFO_VERSION:
+        feature_info = {'schema_version': scoring.FEATURE_INFO_VERSION, 'models': {}}
+
+    for name, model in models.items():
+        model_path = os.path.join(output_dir, os.path.basename(scoring.ALL_MODEL_FILES[name]))
+        start = time.perf_counter()
+        permutation = permutation_importances(model, X_eval, y_eval, n_repeats, n_jobs)
+        feature_info['models'][name] = {
+            'model_sha256': model_store.file_sha256(model_path),
+            'feature_names': list(model.named_steps['preprocessor'].get_feature_names_out()),
+            'impurity': impurity_importances(model),
+            'permutation': {
+                'mean': permutation['mean'],
+                'std': permutation['std'],
+                'baseline_f1': permutation['baseline_f1'],
+                'n_repeats': n_repeats,
+                'rows': len(X_eval)
+            },
+            'seconds': round(time.perf_counter() - start, 2)
+        }
+
+    joblib.dump(feature_info, path)
+    return feature_info
+
+
+# Fungsi untuk menghitung ulang importance model yang sudah ada di output_dir
+# (split uji sama dengan train) tanpa melatih ulang
+def compute_importances(names=None, data_path=DATA_FILE, output_dir='models',
+                        n_repeats=IMPORTANCE_REPEATS, n_jobs=-1):
+    manifest = model_store.read_manifest(_manifest_path(output_dir))
+    names = [name for name in scoring.ALL_MODEL_FILES if name in manifest['models']] if names is None else names
+    X, y = load_training_data(data_path)
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y)
+
+    models = {name: model_store.load_model(name, manifest=manifest) for name in names}
+    feature_info = update_feature_info(output_dir, models, X_test, y_test, n_repeats, n_jobs)
+    write_manifest(output_dir)
+    return feature_info
+
+
+# Fungsi utama pelatihan: cari hyperparameter, simpan model, laporan dan manifest
+# `progress(selesai, total, tahap)` dipanggil sebelum setiap model dan sebelum importance.
+def train(names=None, search='grid', data_path=DATA_FILE, output_dir='models',
+          cache_dir=None, n_iter=20, cv=5, n_jobs=-1, importance_repeats=IMPORTANCE_REPEATS, progress=None):
+    names = list(scoring.MODEL_FILES) if names is None else names
+    X, y = load_training_data(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+    numeric_features = list(X.columns)
+
+    os.makedirs(output_dir, exist_ok=True)
+    report = {
+        'search': search,
+        'data': data_path,
+        'rows': {'train': len(X_train), 'test': len(X_test)},
+        'models': {}
+    }
+    model_files = {}
+    best_models = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = joblib.Memory(cache_dir or tmp, verbose=0)
+        for i, name in enumerate(names):
+            if progress is not None:
+                progress(i, len(names), name)
+            pipeline = build_pipeline(name, numeric_features, memory=memory)
+            searcher = build_search(pipeline, PARAM_GRIDS[name], search, n_iter=n_iter, cv=cv, n_jobs=n_jobs)
+
+            start = time.perf_counter()
+            searcher.fit(X_train, y_train)
+            elapsed = time.perf_counter() - start
+
+            # Cache hanya dipakai selama pencarian, tidak ikut disimpan
+            best = searcher.best_estimator_.set_params(memory=None)
+            best_models[name] = best
+            model_files[name] = os.path.join(output_dir, os.path.basename(scoring.ALL_MODEL_FILES[name]))
+            joblib.dump(best, model_files[name])
+
+            report['models'][name] = {
+                'path': model_files[name],
+                'seconds': round(elapsed, 2),
+                'candidates': len(searcher.cv_results_['params']),
+                'best_params': {k.replace('classifier__', ''): v for k, v in searcher.best_params_.items()},
+                'cv_f1': float(searcher.best_score_),
+                'test': {k: float(v) for k, v in evaluate(best, X_test, y_test).items()}
+            }
+
+    # Importance dihitung sekali di sini; aplikasi hanya membacanya
+    if progress is not None:
+        progress(len(names), len(names), 'importance')
+    feature_info = update_feature_info(output_dir, best_models, X_test, y_test, importance_repeats, n_jobs)
+    for name in best_models:
+        report['models'][name]['importance_seconds'] = feature_info['models'][name]['seconds']
+
+    report['total_seconds'] = round(sum(m['seconds'] for m in report['models'].values()), 2)
+    with open(os.path.join(output_dir, REPORT_FILE), 'w') as f:
+        json.dump(report, f, indent=2, default=_json_default)
+
+    write_manifest(output_dir)
+    return report
+
+
+def _manifest_path(output_dir):
+    return os.path.join(output_dir, os.path.basename(model_store.MANIFEST_FILE))
+
+
+# Fungsi untuk memperbarui manifest dengan semua model di direktori keluaran
+def write_manifest(output_dir):
+    model_files = {name: os.path.join(output_dir, os.path.basename(path))
+                   for name, path in scoring.ALL_MODEL_FILES.items()}
+    model_files = {name: path for name, path in model_files.items() if os.path.exists(path)}
+    feature_info_file = os.path.join(output_dir, os.path.basename(scoring.FEATURE_INFO_FILE))
+    if not os.path.exists(feature_info_file):
+        feature_info_file = scoring.FEATURE_INFO_FILE
+    return model_store.build_manifest(_manifest_path(output_dir), model_files, feature_info_file)
+
+
+# Fungsi untuk menambah tree/stage baru pada salinan model yang sudah ada.
+# Preprocessor tidak di-fit ulang sehingga skala fitur tree lama tetap berlaku.
+def warm_start_model(model, X_new, y_new, add_estimators):
+    candidate = copy.deepcopy(model)
+    classifier = candidate.named_steps['classifier']
+    X_transformed = candidate.named_steps['preprocessor'].transform(X_new)
+    classifier.set_params(warm_start=True, n_estimators=classifier.n_estimators + add_estimators)
+    classifier.fit(X_transformed, y_new)
+    classifier.set_params(warm_start=False)
+    return candidate
+
+
+def _save_model(model, path):
+    tmp = path + '.tmp'
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+
+
+# Fungsi pelatihan inkremental: biaya sebanding dengan jumlah baris baru,
+# bukan seluruh riwayat data
+def retrain_incremental(new_data_path, names=None, add_estimators=20, holdout_size=0.2,
+                        output_dir='models', tolerance=0.0):
+    names = INCREMENTAL_MODELS if names is None else names
+    unsupported = [name for name in names if name not in INCREMENTAL_MODELS]
+    if unsupported:
+        raise ValueError(f"Model tidak mendukung warm_start: {', '.join(unsupported)}")
+
+    X, y = load_training_data(new_data_path)
+    if y.nunique() < 2:
+        raise ValueError("Data baru harus memuat mahasiswa dropout dan non-dropout")
+    X_fit, X_holdout, y_fit, y_holdout = train_test_split(
+        X, y, test_size=holdout_size, random_state=RANDOM_STATE, stratify=y
+    )
+
+    report = {
+        'data': new_data_path,
+        'rows': {'fit': len(X_fit), 'holdout': len(X_holdout)},
+        'models': {}
+    }
+    # Model lama diambil dari direktori yang sama dan divalidasi terhadap manifestnya
+    manifest = model_store.read_manifest(_manifest_path(output_dir))
+    promoted_models = {}
+    for name in names:
+        current = model_store.load_model(name, manifest=manifest)
+        start = time.perf_counter()
+        candidate = warm_start_model(current, X_fit, y_fit, add_estimators)
+        elapsed = time.perf_counter() - start
+
+        current_f1 = float(evaluate(current, X_holdout, y_holdout)['f1'])
+        candidate_f1 = float(evaluate(candidate, X_holdout, y_holdout)['f1'])
+        promoted = candidate_f1 >= current_f1 - tolerance
+        path = os.path.join(output_dir, os.path.basename(scoring.MODEL_FILES[name]))
+        if promoted:
+            _save_model(candidate, path)
+            promoted_models[name] = candidate
+
+        report['models'][name] = {
+            'path': path,
+            'seconds': round(elapsed, 2),
+            'estimators': [current.named_steps['classifier'].n_estimators,
+                           candidate.named_steps['classifier'].n_estimators],
+            'holdout_f1': {'current': current_f1, 'candidate': candidate_f1},
+            'promoted': bool(promoted)
+        }
+
+    with open(os.path.join(output_dir, INCREMENTAL_REPORT_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if promoted_models:
+        # Importance model yang berubah dihitung ulang pada holdout data baru
+        update_feature_info(output_dir, promoted_models, X_holdout, y_holdout)
+        write_manifest(output_dir)
+    return report
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m train', description=__doc__.splitlines()[0])
+    parser.add_argument('--search', default='grid', choices=SEARCHES,
+                        help='Metode pencarian hyperparameter (default: %(default)s)')
+    parser.add_argument('--models', nargs='+', default=None, choices=list(scoring.ALL_MODEL_FILES),
+                        help='Model yang dilatih (default: tiga model notebook)')
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--output-dir', default='models')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Direktori cache preprocessing (default: direktori sementara)')
+    parser.add_argument('--n-iter', type=int, default=20, help='Jumlah kandidat untuk --search random')
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('-j', '--jobs', type=int, default=-1)
+    parser.add_argument('--incremental', metavar='CSV', default=None,
+                        help='Tambah tree/stage dari data semester baru (warm_start) alih-alih pelatihan penuh')
+    parser.add_argument('--add-estimators', type=int, default=20,
+                        help='Jumlah tree/stage baru per model pada mode inkremental (default: %(default)s)')
+    parser.add_argument('--holdout-size', type=float, default=0.2,
+                        help='Porsi data baru untuk validasi promosi model (default: %(default)s)')
+    parser.add_argument('--importances', action='store_true',
+                        help='Hanya hitung ulang feature importance model yang sudah ada (tanpa pelatihan)')
+    parser.add_argument('--importance-repeats', type=int, default=IMPORTANCE_REPEATS,
+                        help='Jumlah pengacakan per kolom untuk permutation importance (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.importances:
+        feature_info = compute_importances(args.models, args.data, args.output_dir,
+                                           args.importance_repeats, args.jobs)
+        print(f"{'Model':<24} {'durasi':>8}  fitur terpenting (permutation)")
+        for name, entry in feature_info['models'].items():
+            top = max(entry['permutation']['mean'], key=entry['permutation']['mean'].get)
+            print(f"{name:<24} {entry['seconds']:>6.1f} s  {top}")
+        return 0
+
+    if args.incremental is not None:
+        report = retrain_incremental(args.incremental, args.models, args.add_estimators,
+                                     args.holdout_size, args.output_dir)
+        print(f"{'Model':<18} {'estimator':>10} {'durasi':>8} {'F1 lama':>8} {'F1 baru':>8}  status")
+        for name, result in report['models'].items():
+            status = 'dipromosikan' if result['promoted'] else 'ditolak (F1 turun)'
+            print(f"{name:<18} {result['estimators'][0]:>4} -> {result['estimators'][1]:<4} "
+                  f"{result['seconds']:>6.1f} s {result['holdout_f1']['current']:>8.3f} "
+                  f"{result['holdout_f1']['candidate']:>8.3f}  {status}")
+        return 0
+
+    report = train(args.models, args.search, args.data, args.output_dir,
+                   args.cache_dir, args.n_iter, args.cv, args.jobs, args.importance_repeats)
+
+    print(f"{'Model':<18} {'kandidat':>8} {'durasi':>9} {'F1 CV':>7} {'F1 uji':>7} {'AUC uji':>8}")
+    for name, result in report['models'].items():
+        print(f"{name:<18} {result['candidates']:>8} {result['seconds']:>7.1f} s "
+              f"{result['cv_f1']:>7.3f} {result['test']['f1']:>7.3f} {result['test']['roc_auc']:>8.3f}")
+    print(f"Laporan: {os.path.join(args.output_dir, REPORT_FILE)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""Mesin inferensi tree berbasis array NumPy datar.
+
+Pipeline sklearn (ColumnTransformer -> SimpleImputer -> StandardScaler ->
+estimator) dikompilasi menjadi array node datar. Skala StandardScaler dilipat
+ke threshold split, sehingga data mentah dapat langsung dibandingkan tanpa
+transformasi per baris. Ekspor artefak:
+
+    python -m tree_engine export
+
+Artefak disimpan sebagai file .npy mentah sehingga dapat dimuat dengan
+mmap_mode (lihat model_store.load_compiled).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import scoring
+from model_store import file_sha256
+
+COMPILED_DIR = 'models/compiled'
+
+_ARRAY_FIELDS = ('impute', 'roots', 'feature', 'threshold', 'left', 'right',
+                 'missing_left', 'leaf_value')
+
+# Jumlah pasangan (baris, tree) yang dievaluasi per potongan agar tetap di cache
+_CHUNK_PAIRS = 1 << 16
+
+# Tree dengan kedalaman sampai batas ini disusun ulang sebagai pohon biner
+# lengkap sehingga traversal cukup berupa aritmetika indeks per level
+COMPLETE_MAX_DEPTH = 10
+
+
+class CompiledTreeModel:
+    """Ensemble tree dalam bentuk array node datar.
+
+    ``kind`` bernilai ``'mean'`` (Decision Tree/Random Forest: rata-rata
+    probabilitas daun) atau ``'boosting'`` (Gradient Boosting: jumlah nilai daun
+    ditambah ``init_raw``, lalu fungsi sigmoid).
+    """
+
+    def __init__(self, columns, impute, kind, init_raw, roots, feature, threshold,
+                 left, right, missing_left, leaf_value):
+        self.columns = list(columns)
+        self.impute = np.asarray(impute, dtype=np.float64)
+        self.kind = kind
+        self.init_raw = float(init_raw)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float64)
+        self.metadata = {}
+        self.is_leaf = self.left == np.arange(len(self.left))
+        self.depth = self._node_depths()
+        self.max_depth = int(self.depth.max()) if len(self.depth) else 0
+        self._complete = self._build_complete() if self.max_depth <= COMPLETE_MAX_DEPTH else None
+
+    # Kedalaman setiap node (akar = 0)
+    def _node_depths(self):
+        depth = np.zeros(len(self.left), dtype=np.intp)
+        frontier = self.roots
+        level = 0
+        while len(frontier):
+            depth[frontier] = level
+            internal = frontier[~self.is_leaf[frontier]]
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+            level += 1
+        return depth
+
+    # Susunan pohon biner lengkap: node i punya anak 2i+1 dan 2i+2. Daun yang
+    # lebih dangkal diteruskan ke kiri (threshold +inf) sampai level terdalam.
+    def _build_complete(self):
+        depth = self.max_depth
+        n_internal = (1 << depth) - 1
+        n_trees = self.n_trees
+        feature = np.zeros((n_trees, max(n_internal, 1)), dtype=np.intp)
+        threshold = np.full((n_trees, max(n_internal, 1)), np.inf)
+        missing_left = np.ones((n_trees, max(n_internal, 1)), dtype=bool)
+        leaf_value = np.zeros((n_trees, 1 << depth))
+
+        for t, root in enumerate(self.roots):
+            stack = [(root, 0, 0)]
+            while stack:
+                node, pos, level = stack.pop()
+                if self.is_leaf[node]:
+                    # Daun paling kiri di bawah posisi ini pada level terdalam
+                    span = depth - level
+                    leaf_pos = ((pos + 1) << span) - 1
+                    leaf_value[t, leaf_pos - n_internal] = self.leaf_value[node]
+                    continue
+                feature[t, pos] = self.feature[node]
+                threshold[t, pos] = self.threshold[node]
+                missing_left[t, pos] = self.missing_left[node]
+                stack.append((self.left[node], 2 * pos + 1, level + 1))
+                stack.append((self.right[node], 2 * pos + 2, level + 1))
+
+        return {
+            'n_internal': n_internal,
+            'feature': feature.ravel(),
+            'threshold': threshold.ravel(),
+            'missing_left': missing_left.ravel(),
+            'leaf_value': leaf_value.ravel()
+        }
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    # Fungsi untuk mengubah masukan (DataFrame, dict, atau array) ke matriks float64
+    def to_matrix(self, X):
+        if isinstance(X, dict):
+            X = np.array([[X[col] for col in self.columns]], dtype=np.float64)
+        elif hasattr(X, 'columns'):
+            X = scoring.select_model_features(self, X).to_numpy(dtype=np.float64)
+        else:
+            X = np.asarray(X, dtype=np.float64)
+            if X.ndim == 1:
+                X = X[None, :]
+
+        # Nilai hilang diisi seperti SimpleImputer (kolom tanpa imputer bernilai NaN)
+        nan_rows, nan_cols = np.nonzero(np.isnan(X))
+        if len(nan_rows):
+            X = X.copy()
+            X[nan_rows, nan_cols] = self.impute[nan_cols]
+        return X
+
+    def _chunks(self, X):
+        rows_per_chunk = max(1, _CHUNK_PAIRS // self.n_trees)
+        for start in range(0, len(X), rows_per_chunk):
+            yield start, X[start:start + rows_per_chunk]
+
+    # Fungsi untuk mencari indeks daun (pada array node datar) setiap pasangan (baris, tree)
+    def apply(self, X):
+        X = self.to_matrix(X)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.intp)
+        has_nan = bool(np.isnan(X).any())
+
+        for start, X_chunk in self._chunks(X):
+            n_chunk, n_cols = X_chunk.shape
+            X_flat = X_chunk.ravel()
+            nodes = np.broadcast_to(self.roots, (n_chunk, self.n_trees)).ravel().copy()
+            row_offset = np.repeat(np.arange(n_chunk) * n_cols, self.n_trees)
+
+            # Hanya pasangan yang belum mencapai daun yang ditelusuri lagi
+            active = np.flatnonzero(~self.is_leaf.take(nodes))
+            while len(active):
+                node = nodes.take(active)
+                value = X_flat.take(row_offset.take(active) + self.feature.take(node))
+                go_left = value <= self.threshold.take(node)
+                if has_nan:
+                    missing = np.isnan(value)
+                    go_left[missing] = self.missing_left[node[missing]]
+                node = np.where(go_left, self.left.take(node), self.right.take(node))
+                nodes[active] = node
+                active = active[~self.is_leaf.take(node)]
+
+            leaves[start:start + n_chunk] = nodes.reshape(n_chunk, self.n_trees)
+        return leaves
+
+    # Nilai daun setiap pasangan (baris, tree), lewat susunan pohon lengkap jika ada
+    def leaf_values(self, X):
+        if self._complete is None:
+            return self.leaf_value.take(self.apply(X))
+
+        X = self.to_matrix(X)
+        complete = self._complete
+        n_internal = complete['n_internal']
+        tree_offset = np.arange(self.n_trees) * n_internal
+        leaf_offset = np.arange(self.n_trees) << self.max_depth
+        has_nan = bool(np.isnan(X).any())
+        values = np.empty((len(X), self.n_trees))
+
+        for start, X_chunk in self._chunks(X):
+            n_chunk, n_cols = X_chunk.shape
+            X_flat = X_chunk.ravel()
+            row_offset = (np.arange(n_chunk) * n_cols)[:, None]
+            pos = np.zeros((n_chunk, self.n_trees), dtype=np.intp)
+
+            for _ in range(self.max_depth):
+                idx = pos + tree_offset
+                value = X_flat.take(row_offset + complete['feature'].take(idx))
+                go_right = value > complete['threshold'].take(idx)
+                if has_nan:
+                    missing = np.isnan(value)
+                    go_right[missing] = ~complete['missing_left'].take(idx[missing])
+                pos = 2 * pos + 1 + go_right
+
+            values[start:start + n_chunk] = complete['leaf_value'].take(pos - n_internal + leaf_offset)
+        return values
+
+    # Probabilitas dropout (kelas 1) untuk setiap baris
+    def predict_dropout_proba(self, X):
+        values = self.leaf_values(X)
+        if self.kind == 'mean':
+            return values.mean(axis=1)
+        raw = self.init_raw + values.sum(axis=1)
+        return 1.0 / (1.0 + np.exp(-raw))
+
+    # Antarmuka yang sama dengan predict_proba sklearn
+    def predict_proba(self, X):
+        proba = self.predict_dropout_proba(X)
+        return np.column_stack([1.0 - proba, proba])
+
+    @property
+    def feature_names_in_(self):
+        return np.asarray(self.columns, dtype=object)
+
+    # Disimpan sebagai direktori berisi file .npy mentah agar dapat di-memory-map
+    def save(self, path, metadata=None):
+        os.makedirs(path, exist_ok=True)
+        for array_name in _ARRAY_FIELDS:
+            np.save(os.path.join(path, f'{array_name}.npy'), getattr(self, array_name))
+        meta = dict(metadata or {})
+        meta.update({'columns': self.columns, 'kind': self.kind, 'init_raw': self.init_raw})
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    # mmap_mode='r' membuat beberapa proses berbagi satu salinan array di page cache
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            array_name: np.load(os.path.join(path, f'{array_name}.npy'), mmap_mode=mmap_mode)
+            for array_name in _ARRAY_FIELDS
+        }
+        model = cls(columns=meta['columns'], kind=meta['kind'], init_raw=meta['init_raw'], **arrays)
+        model.metadata = meta
+        return model
+
+
+# Fungsi untuk mengambil parameter imputer dan scaler per kolom masukan
+def _numeric_transform(pipeline):
+    preprocessor = pipeline.named_steps['preprocessor']
+    columns = list(pipeline.feature_names_in_)
+    n = len(columns)
+    mean = np.zeros(n)
+    scale = np.ones(n)
+    impute = np.full(n, np.nan)
+    output_columns = []
+
+    for name, transformer, cols in preprocessor.transformers_:
+        if name == 'remainder' or len(cols) == 0:
+            continue
+        if name != 'num':
+            raise ValueError(f"Transformer '{name}' belum didukung oleh tree_engine")
+
+        steps = getattr(transformer, 'steps', [(None, transformer)])
+        idx = [columns.index(col) for col in cols]
+        for _, step in steps:
+            step_name = type(step).__name__
+            # 'passthrough' disimpan sebagai FunctionTransformer identitas setelah fit
+            if step_name == 'FunctionTransformer' and step.func is None:
+                continue
+            if step_name == 'SimpleImputer':
+                impute[idx] = step.statistics_
+            elif step_name == 'StandardScaler':
+                if step.mean_ is not None:
+                    mean[idx] = step.mean_
+                if step.scale_ is not None:
+                    scale[idx] = step.scale_
+            else:
+                raise ValueError(f"Langkah '{step_name}' belum didukung oleh tree_engine")
+        output_columns.extend(idx)
+
+    return columns, np.asarray(output_columns), mean, scale, impute
+
+
+# Fungsi untuk melipat skala StandardScaler ke threshold split.
+# sklearn membandingkan float32((x - mean) / scale) <= t. Nilai float32 tersebut
+# <= t jika dan hanya jika hasil skala (float64) lebih kecil dari titik tengah
+# antara float32 terbesar yang <= t dan float32 berikutnya, sehingga batas pada
+# data mentah adalah x < titik_tengah * scale + mean (scale selalu positif).
+def _fold_threshold(threshold, scale, mean):
+    t32 = threshold.astype(np.float32)
+    t32 = np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+    upper = np.nextafter(t32, np.float32(np.inf))
+    midpoint = (t32.astype(np.float64) + upper.astype(np.float64)) / 2
+    boundary = midpoint * scale + mean
+    # x < boundary  <=>  x <= float64 sebelum boundary
+    return np.nextafter(boundary, -np.inf)
+
+
+# Fungsi untuk mengompilasi pipeline tree sklearn yang sudah dilatih
+def compile_pipeline(pipeline):
+    columns, output_columns, mean, scale, impute = _numeric_transform(pipeline)
+    classifier = pipeline.named_steps['classifier']
+    classifier_name = type(classifier).__name__
+
+    if classifier_name == 'DecisionTreeClassifier':
+        estimators, kind = [classifier], 'mean'
+    elif classifier_name == 'RandomForestClassifier':
+        estimators, kind = list(classifier.estimators_), 'mean'
+    elif classifier_name == 'GradientBoostingClassifier':
+        estimators, kind = list(classifier.estimators_[:, 0]), 'boosting'
+    elif classifier_name == 'HistGradientBoostingClassifier':
+        return _compile_hist_gradient_boosting(classifier, columns, output_columns, impute)
+    else:
+        raise ValueError(f"Model '{classifier_name}' belum didukung oleh tree_engine")
+
+    init_raw = 0.0
+    if kind == 'boosting':
+        if classifier.init_ == 'zero':
+            init_raw = 0.0
+        elif type(classifier.init_).__name__ == 'DummyClassifier':
+            prior = classifier.init_.class_prior_[1]
+            init_raw = np.log(prior / (1 - prior))
+        else:
+            raise ValueError("Estimator init Gradient Boosting belum didukung oleh tree_engine")
+
+    roots, feature, threshold, left, right, missing_left, leaf_value = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+
+        # Indeks fitur keluaran preprocessor -> indeks kolom mentah
+        raw_feature = output_columns[np.where(is_leaf, 0, tree.feature)]
+        folded = _fold_threshold(tree.threshold, scale[raw_feature], mean[raw_feature])
+
+        if kind == 'mean':
+            value = tree.value[:, 0, :]
+            node_value = value[:, 1] / value.sum(axis=1)
+        else:
+            node_value = tree.value[:, 0, 0] * classifier.learning_rate
+
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, raw_feature))
+        threshold.append(np.where(is_leaf, np.inf, folded))
+        # Daun menunjuk ke dirinya sendiri
+        left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        missing_left.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool))
+        leaf_value.append(node_value)
+        offset += tree.node_count
+
+    return CompiledTreeModel(
+        columns=columns, impute=impute, kind=kind, init_raw=init_raw,
+        roots=np.asarray(roots), feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold), left=np.concatenate(left),
+        right=np.concatenate(right), missing_left=np.concatenate(missing_left),
+        leaf_value=np.concatenate(leaf_value)
+    )
+
+
+# HistGradientBoosting membandingkan x (float64, tanpa skala) <= num_threshold,
+# jadi threshold dipakai langsung tanpa dilipat. Nilai daun sudah termasuk
+# learning rate; NaN mengikuti missing_go_to_left setiap node.
+def _compile_hist_gradient_boosting(classifier, columns, output_columns, impute):
+    if classifier.n_trees_per_iteration_ != 1:
+        raise ValueError("tree_engine hanya mendukung Hist Gradient Boosting biner")
+    if getattr(classifier, 'is_categorical_', None) is not None:
+        raise ValueError("Fitur kategorikal Hist Gradient Boosting belum didukung oleh tree_engine")
+    if np.any(np.asarray(output_columns) != np.arange(len(output_columns))):
+        raise ValueError("Urutan kolom preprocessor harus sama dengan kolom masukan")
+
+    roots, feature, threshold, left, right, missing_left, leaf_value = [], [], [], [], [], [], []
+    offset = 0
+    for (predictor,) in classifier._predictors:
+        nodes = predictor.nodes
+        node_ids = np.arange(len(nodes))
+        is_leaf = nodes['is_leaf'].astype(bool)
+
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, nodes['feature_idx']))
+        threshold.append(np.where(is_leaf, np.inf, nodes['num_threshold']))
+        left.append(np.where(is_leaf, node_ids, nodes['left']) + offset)
+        right.append(np.where(is_leaf, node_ids, nodes['right']) + offset)
+        missing_left.append(nodes['missing_go_to_left'].astype(bool))
+        leaf_value.append(nodes['value'])
+        offset += len(nodes)
+
+    return CompiledTreeModel(
+        columns=columns, impute=impute, kind='boosting',
+        init_raw=float(np.ravel(classifier._baseline_prediction)[0]),
+        roots=np.asarray(roots), feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold), left=np.concatenate(left),
+        right=np.concatenate(right), missing_left=np.concatenate(missing_left),
+        leaf_value=np.concatenate(leaf_value)
+    )
+
+
+def compiled_path(name):
+    filename = os.path.basename(scoring.ALL_MODEL_FILES[name]).replace('.joblib', '')
+    return os.path.join(COMPILED_DIR, filename)
+
+
+# Fungsi untuk membandingkan hasil kompilasi dengan predict_proba sklearn
+def verify(pipeline, compiled, df):
+    expected = scoring.predict_proba_batch(pipeline, df)
+    actual = compiled.predict_dropout_proba(df)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export(names=None, data_path='Data/students_performance.csv', atol=1e-9):
+    names = scoring.available_models() if names is None else names
+    df = scoring.add_derived_features(scoring.read_cohort(data_path))
+
+    for name in names:
+        pipeline = scoring.load_model(name)
+        start = time.perf_counter()
+        compiled = compile_pipeline(pipeline)
+        elapsed = time.perf_counter() - start
+
+        max_diff = verify(pipeline, compiled, df)
+        if max_diff > atol:
+            raise AssertionError(f"{name}: selisih maksimum {max_diff:.2e} melebihi toleransi {atol:.0e}")
+
+        path = compiled_path(name)
+        compiled.save(path, metadata={
+            'model': name,
+            'source_sha256': file_sha256(scoring.ALL_MODEL_FILES[name])
+        })
+        print(f"{name}: {compiled.n_trees} tree, {len(compiled.left)} node, "
+              f"kompilasi {elapsed:.2f} detik, selisih maks {max_diff:.1e} -> {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tree_engine', description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Kompilasi model dan simpan ke models/compiled')
+    export_parser.add_argument('-m', '--model', action='append', choices=list(scoring.ALL_MODEL_FILES),
+                               help='Model yang diekspor (default: semua)')
+    export_parser.add_argument('--data', default='Data/students_performance.csv',
+                               help='Data untuk verifikasi terhadap sklearn')
+    export_parser.add_argument('--atol', type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        export(args.model, args.data, args.atol)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
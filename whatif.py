@@ -0,0 +1,115 @@
+"""Analisis what-if: sensitivitas risiko dropout terhadap perubahan fitur.
+
+Dari satu profil mahasiswa (dict fitur seperti di form aplikasi) dibuat
+banyak skenario dengan mengubah beberapa field, fitur turunan dihitung ulang
+dengan scoring.add_derived_features, lalu semua skenario diskor dengan satu
+kali predict_proba. Ratusan skenario selesai dalam satu interaksi.
+
+Dua bentuk sweep:
+- 'oneway': setiap field divariasikan sendiri, field lain tetap (kurva respons);
+- 'grid': kombinasi (produk kartesius) semua nilai field yang dipilih.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import scoring
+
+# Field yang dapat divariasikan. kind:
+# - 'units': jumlah unit disetujui, 0 sampai jumlah unit yang diambil (enrolled_field)
+# - 'binary': 0/1
+# - 'range': nilai kontinu dari low sampai high sebanyak steps
+WHATIF_FIELDS = {
+    'Curricular_units_2nd_sem_approved': {
+        'label': 'Unit Disetujui Semester 2', 'kind': 'units',
+        'enrolled_field': 'Curricular_units_2nd_sem_enrolled'
+    },
+    'Curricular_units_1st_sem_approved': {
+        'label': 'Unit Disetujui Semester 1', 'kind': 'units',
+        'enrolled_field': 'Curricular_units_1st_sem_enrolled'
+    },
+    'Tuition_fees_up_to_date': {'label': 'Biaya Kuliah Lunas', 'kind': 'binary'},
+    'Debtor': {'label': 'Memiliki Hutang', 'kind': 'binary'},
+    'Scholarship_holder': {'label': 'Penerima Beasiswa', 'kind': 'binary'},
+    'Admission_grade': {'label': 'Nilai Penerimaan', 'kind': 'range', 'low': 95.0, 'high': 190.0, 'steps': 20},
+    'Curricular_units_2nd_sem_grade': {
+        'label': 'Nilai Rata-rata Semester 2', 'kind': 'range', 'low': 0.0, 'high': 20.0, 'steps': 21
+    },
+    'Age_at_enrollment': {'label': 'Usia saat Pendaftaran', 'kind': 'range', 'low': 17, 'high': 60, 'steps': 44}
+}
+
+DEFAULT_WHATIF_FIELDS = ['Curricular_units_2nd_sem_approved', 'Tuition_fees_up_to_date', 'Admission_grade']
+
+# Batas jumlah skenario mode 'grid' agar tetap satu interaksi
+MAX_SCENARIOS = 5000
+
+
+# Fungsi untuk membuat nilai default setiap field berdasarkan profil mahasiswa
+def default_grid(features, fields=None):
+    fields = DEFAULT_WHATIF_FIELDS if fields is None else fields
+    grid = {}
+    for field in fields:
+        spec = WHATIF_FIELDS[field]
+        if spec['kind'] == 'units':
+            upper = max(int(features.get(spec['enrolled_field'], 0)), int(features.get(field, 0)), 1)
+            values = np.arange(upper + 1)
+        elif spec['kind'] == 'binary':
+            values = np.array([0, 1])
+        else:
+            values = np.linspace(spec['low'], spec['high'], spec['steps'])
+            if isinstance(spec['low'], int):
+                values = np.unique(values.round().astype(int))
+        grid[field] = values
+    return grid
+
+
+# Fungsi untuk membuat DataFrame skenario. Baris pertama adalah profil asli
+# (field '__baseline__'); kolom 'field' mencatat field yang divariasikan.
+def build_scenarios(features, grid, mode='oneway'):
+    fields = list(grid)
+    # Fitur turunan yang sumbernya diubah dihitung ulang, sisanya dipertahankan
+    stale = {derived for derived, sources in scoring.DERIVED_FEATURES.items() if set(sources) & set(fields)}
+    base = {key: value for key, value in features.items() if key not in stale}
+
+    if mode == 'oneway':
+        blocks = [pd.DataFrame([base]).assign(field='__baseline__')]
+        for field, values in grid.items():
+            block = pd.DataFrame([base] * len(values))
+            block[field] = np.asarray(values)
+            blocks.append(block.assign(field=field))
+        scenarios = pd.concat(blocks, ignore_index=True)
+    elif mode == 'grid':
+        n_scenarios = int(np.prod([len(values) for values in grid.values()]))
+        if n_scenarios > MAX_SCENARIOS:
+            raise ValueError(f"{n_scenarios:,} skenario melebihi batas {MAX_SCENARIOS:,}; kurangi field atau nilainya")
+        combinations = np.array(list(itertools.product(*grid.values())), dtype=float)
+        scenarios = pd.DataFrame([base] * (len(combinations) + 1))
+        for i, field in enumerate(fields):
+            scenarios[field] = np.r_[base[field], combinations[:, i]]
+        scenarios['field'] = ['__baseline__'] + ['grid'] * len(combinations)
+    else:
+        raise ValueError(f"Mode what-if tidak dikenal: {mode}")
+
+    return scoring.add_derived_features(scenarios)
+
+
+# Fungsi utama: semua skenario diskor dengan satu kali predict_proba.
+# Menambahkan kolom dropout_probability dan delta (selisih terhadap profil asli).
+def sweep(model, features, grid=None, mode='oneway'):
+    grid = default_grid(features) if grid is None else grid
+    scenarios = build_scenarios(features, grid, mode)
+    probabilities = scoring.predict_proba_batch(model, scenarios)
+
+    result = scenarios[['field'] + list(grid)].copy()
+    result['dropout_probability'] = probabilities
+    result['delta'] = probabilities - probabilities[0]
+    return result
+
+
+# Kurva respons per field dari hasil sweep 'oneway'
+def response_curves(result):
+    return {
+        field: group[[field, 'dropout_probability', 'delta']].reset_index(drop=True)
+        for field, group in result[result['field'] != '__baseline__'].groupby('field', sort=False)
+    }